@@ -10,16 +10,25 @@ import (
 	"time"
 
 	"github.com/gorilla/websocket"
+	"github.com/vmihailenco/msgpack/v5"
 )
 
 type Client struct {
 	ServerURL string
 	TableID   string
 	PlayerID  string
+	Encoding  string // WebSocket encoding: "json" (default) or "msgpack"
 	ws        *websocket.Conn
+	aliases   map[int64]string // MessagePack player alias -> player ID
 	OnMessage func(interface{})
 }
 
+// Fields that hold a player ID, or a list of them, in table messages
+var (
+	idFields     = map[string]bool{"id": true, "player_id": true, "current_player_id": true}
+	idListFields = map[string]bool{"player_order": true, "players_removed": true}
+)
+
 type TableState struct {
 	TableID         string   `json:"table_id"`
 	Pot             int      `json:"pot"`
@@ -195,6 +204,10 @@ func (c *Client) ConnectWebSocket() error {
 	wsURL := c.ServerURL
 	wsURL = "ws" + wsURL[4:] // Replace http with ws
 	wsURL = fmt.Sprintf("%s/ws/%s/%s", wsURL, c.TableID, c.PlayerID)
+	if c.Encoding != "" {
+		wsURL += "?encoding=" + url.QueryEscape(c.Encoding)
+	}
+	c.aliases = make(map[int64]string)
 
 	var err error
 	c.ws, _, err = websocket.DefaultDialer.Dial(wsURL, nil)
@@ -216,13 +229,12 @@ func (c *Client) ConnectWebSocket() error {
 	// Start reading messages
 	go func() {
 		for {
-			_, message, err := c.ws.ReadMessage()
+			messageType, message, err := c.ws.ReadMessage()
 			if err != nil {
 				return
 			}
 
-			var msg interface{}
-			if err := json.Unmarshal(message, &msg); err == nil {
+			if msg, err := c.decodeMessage(messageType, message); err == nil {
 				if c.OnMessage != nil {
 					c.OnMessage(msg)
 				}
@@ -233,6 +245,112 @@ func (c *Client) ConnectWebSocket() error {
 	return nil
 }
 
+// decodeMessage turns a WebSocket frame of either encoding into the value
+// encoding/json would give for the JSON message, with aliases mapped back to IDs
+func (c *Client) decodeMessage(messageType int, data []byte) (interface{}, error) {
+	var msg interface{}
+	if messageType != websocket.BinaryMessage {
+		err := json.Unmarshal(data, &msg)
+		return msg, err
+	}
+
+	dec := msgpack.NewDecoder(bytes.NewReader(data))
+	// Delta player maps are keyed by alias, so maps can't assume string keys
+	dec.SetMapDecoder(func(d *msgpack.Decoder) (interface{}, error) {
+		return d.DecodeUntypedMap()
+	})
+	if err := dec.Decode(&msg); err != nil {
+		return nil, err
+	}
+
+	if m, ok := msg.(map[interface{}]interface{}); ok {
+		if m["type"] == "snapshot" {
+			c.aliases = make(map[int64]string)
+		}
+		// Snapshots list every alias, other messages the ones they introduce
+		if aliases, ok := m["aliases"].(map[interface{}]interface{}); ok {
+			for id, alias := range aliases {
+				if n, ok := toInt64(alias); ok {
+					c.aliases[n] = fmt.Sprint(id)
+				}
+			}
+		}
+	}
+	return c.resolve(msg), nil
+}
+
+func (c *Client) resolve(value interface{}) interface{} {
+	switch v := value.(type) {
+	case map[interface{}]interface{}:
+		out := make(map[string]interface{}, len(v))
+		for k, item := range v {
+			key := fmt.Sprint(c.playerID(k))
+			switch {
+			case key == "aliases":
+				continue
+			case idFields[key]:
+				out[key] = c.playerID(item)
+			case idListFields[key]:
+				ids, _ := item.([]interface{})
+				list := make([]interface{}, len(ids))
+				for i, id := range ids {
+					list[i] = c.playerID(id)
+				}
+				out[key] = list
+			default:
+				out[key] = c.resolve(item)
+			}
+		}
+		return out
+	case []interface{}:
+		out := make([]interface{}, len(v))
+		for i, item := range v {
+			out[i] = c.resolve(item)
+		}
+		return out
+	case float32:
+		return float64(v)
+	}
+	if n, ok := toInt64(value); ok {
+		return float64(n)
+	}
+	return value
+}
+
+// playerID maps an alias to its player ID; strings and nil pass through
+func (c *Client) playerID(value interface{}) interface{} {
+	n, ok := toInt64(value)
+	if !ok {
+		return value
+	}
+	if id, ok := c.aliases[n]; ok {
+		return id
+	}
+	return fmt.Sprint(n)
+}
+
+func toInt64(value interface{}) (int64, bool) {
+	switch v := value.(type) {
+	case int8:
+		return int64(v), true
+	case int16:
+		return int64(v), true
+	case int32:
+		return int64(v), true
+	case int64:
+		return v, true
+	case uint8:
+		return int64(v), true
+	case uint16:
+		return int64(v), true
+	case uint32:
+		return int64(v), true
+	case uint64:
+		return int64(v), true
+	}
+	return 0, false
+}
+
 func (c *Client) Close() {
 	if c.ws != nil {
 		c.ws.Close()
@@ -5,11 +5,13 @@ go 1.21
 require (
 	github.com/fatih/color v1.16.0
 	github.com/gorilla/websocket v1.5.1
+	github.com/vmihailenco/msgpack/v5 v5.4.1
 )
 
 require (
 	github.com/mattn/go-colorable v0.1.13 // indirect
 	github.com/mattn/go-isatty v0.0.20 // indirect
+	github.com/vmihailenco/tagparser/v2 v2.0.0 // indirect
 	golang.org/x/net v0.17.0 // indirect
 	golang.org/x/sys v0.14.0 // indirect
 )
@@ -15,11 +15,13 @@ func main() {
 	serverURL := flag.String("server", "http://localhost:8000", "Poker server URL")
 	playerName := flag.String("name", "GoPlayer", "Your player name")
 	tableID := flag.String("table", "", "Table ID to join (empty to create new)")
+	encoding := flag.String("encoding", "json", "WebSocket encoding: json or msgpack")
 	flag.Parse()
 
 	ui.PrintBanner()
 
 	c := client.NewClient(*serverURL)
+	c.Encoding = *encoding
 
 	// Setup WebSocket message handler
 	c.OnMessage = func(msg interface{}) {
@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+Bot Runner - many poker bots in one asyncio process
+Bots share one pooled HTTP session, follow their tables over WebSocket (JSON
+or MessagePack) and act as soon as a state update says it is their turn
+"""
+
+import argparse
+import asyncio
+import itertools
+import random
+import time
+from typing import Any, Dict, List, Optional
+
+import aiohttp
+import msgpack
+
+from poker_bot import PokerBot
+
+HEARTBEAT_INTERVAL = 30  # Seconds between "ping"s; the server drops sockets that stay silent
+RECONNECT_ATTEMPTS = 3  # Tries in a row to reopen a dropped socket before giving up
+RECONNECT_DELAY = 1.0
+
+# ===== State Tracking =====
+
+def apply_delta(state: Dict[str, Any], delta: Dict[str, Any]) -> Dict[str, Any]:
+    """Apply a server state delta to a table state (same rules as the web client)"""
+    state = dict(state)
+    for key, value in delta.items():
+        if key not in ("players", "players_added", "players_removed", "player_order", "community_cards_added"):
+            state[key] = value
+    if "community_cards_added" in delta:
+        state["community_cards"] = state["community_cards"] + delta["community_cards_added"]
+
+    players = {p["id"]: dict(p) for p in state["players"]}
+    for player in delta.get("players_added", ()):
+        players[player["id"]] = dict(player)
+    for pid in delta.get("players_removed", ()):
+        players.pop(pid, None)
+    for pid, fields in delta.get("players", {}).items():
+        if pid in players:
+            players[pid].update(fields)
+    order = delta.get("player_order", [p["id"] for p in state["players"]])
+    state["players"] = [players[pid] for pid in order if pid in players]
+    return state
+
+def with_own_cards(state: Dict[str, Any], player_id: str, cards: List[str]) -> Dict[str, Any]:
+    """Put our hole cards, sent only to us, into the public state"""
+    players = [dict(p, cards=cards) if p["id"] == player_id else p for p in state["players"]]
+    return dict(state, players=players)
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of unsorted samples (0 if empty)"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+class RunnerStats:
+    """Decision counts and latencies shared by every bot in the runner"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.decisions = 0
+        self.errors = 0
+        self.reaction_ms: List[float] = []   # Turn update received -> action sent
+        self.round_trip_ms: List[float] = []  # Action sent -> ack received
+
+    def report(self) -> Dict[str, float]:
+        elapsed = time.perf_counter() - self.started
+        return {
+            "decisions": self.decisions,
+            "decisions_per_sec": round(self.decisions / elapsed, 1) if elapsed > 0 else 0.0,
+            "errors": self.errors,
+            "reaction_p50_ms": round(percentile(self.reaction_ms, 50), 3),
+            "reaction_p99_ms": round(percentile(self.reaction_ms, 99), 3),
+            "ack_p50_ms": round(percentile(self.round_trip_ms, 50), 2),
+            "ack_p99_ms": round(percentile(self.round_trip_ms, 99), 2)
+        }
+
+    def reset_window(self):
+        """Keep the latency lists from growing without bound between reports"""
+        self.reaction_ms = self.reaction_ms[-10_000:]
+        self.round_trip_ms = self.round_trip_ms[-10_000:]
+
+# ===== Bots =====
+
+class AsyncBot:
+    """Drives one PokerBot strategy from its table's WebSocket updates"""
+
+    def __init__(
+        self,
+        strategy: PokerBot,
+        session: aiohttp.ClientSession,
+        stats: RunnerStats,
+        encoding: str = "json"
+    ):
+        self.strategy = strategy  # Its decide_action() picks the moves
+        self.session = session
+        self.stats = stats
+        self.encoding = encoding  # "json" or "msgpack"
+        self.me: Optional[str] = None  # Our ID as table messages give it (an alias over MessagePack)
+        self.ws: Optional[aiohttp.ClientWebSocketResponse] = None
+        self.state: Optional[Dict[str, Any]] = None
+        self.version: Optional[int] = None
+        self.seq: Optional[int] = None  # "seq" of the last table message, to resume after a reconnect
+        self.acted_version: Optional[int] = None  # Version we last acted on
+        self.pending: Dict[str, float] = {}  # request_id -> send time
+        self.request_ids = itertools.count()
+        self.retried = False
+
+    @property
+    def name(self) -> str:
+        return self.strategy.bot_name
+
+    async def join(self, table_id: str) -> bool:
+        """Take a seat over the shared HTTP session"""
+        url = f"{self.strategy.server_url}/api/tables/{table_id}/join"
+        async with self.session.post(url, params={"player_name": self.name, "is_bot": "true"}) as response:
+            if response.status != 200:
+                print(f"Error joining table: {response.status} {await response.text()}")
+                return False
+            data = await response.json()
+        self.strategy.table_id = table_id
+        self.strategy.player_id = self.me = data["player_id"]
+        self.state = data["table_state"]
+        return True
+
+    async def run(self):
+        """Follow the table and act on our turns, reopening the socket if it drops"""
+        failures = 0
+        while failures < RECONNECT_ATTEMPTS:
+            try:
+                if await self.follow():
+                    failures = 0
+            except aiohttp.ClientError:
+                pass
+            failures += 1
+            await asyncio.sleep(RECONNECT_DELAY)
+
+    async def follow(self) -> bool:
+        """Handle messages until the socket closes; False if nothing arrived"""
+        bot = self.strategy
+        url = f"{bot.server_url.replace('http', 'ws', 1)}/ws/{bot.table_id}/{bot.player_id}"
+        params = {"encoding": self.encoding, "updates": "delta"}
+        if self.seq is not None and self.version is not None:
+            params["resume_from"] = str(self.seq)  # The server replays what we missed, or sends a snapshot
+        received_any = False
+        async with self.session.ws_connect(url, params=params, heartbeat=HEARTBEAT_INTERVAL) as ws:
+            self.ws = ws
+            keepalive = asyncio.create_task(self.keepalive())
+            try:
+                async for message in ws:
+                    received = time.perf_counter()
+                    if message.type == aiohttp.WSMsgType.BINARY:
+                        data = msgpack.unpackb(message.data, strict_map_key=False)
+                    elif message.type == aiohttp.WSMsgType.TEXT:
+                        if message.data == "pong":
+                            received_any = True
+                            continue
+                        data = message.json()
+                    else:
+                        break
+                    received_any = True
+                    await self.handle(data, received)
+            finally:
+                keepalive.cancel()
+        return received_any
+
+    async def keepalive(self):
+        """Send the server's text heartbeat, so a bot waiting for opponents is not evicted"""
+        while True:
+            await asyncio.sleep(HEARTBEAT_INTERVAL)
+            await self.ws.send_str("ping")
+
+    async def handle(self, data: Dict[str, Any], received: float):
+        kind = data.get("type")
+        if "seq" in data:
+            self.seq = data["seq"]
+        if kind == "snapshot":
+            self.state = data["table_state"]
+            self.version = data["version"]
+            if "aliases" in data:
+                self.me = data["aliases"].get(self.strategy.player_id, self.strategy.player_id)
+        elif kind in ("ack", "error"):
+            sent = self.pending.pop(data.get("request_id"), None)
+            if sent is not None:
+                self.stats.round_trip_ms.append((received - sent) * 1000)
+            if kind == "error":
+                self.stats.errors += 1
+                await self.recover(data)
+            return
+        elif "delta" in data:
+            if self.version is None or data["base_version"] != self.version:
+                if data["version"] > (self.version or -1):
+                    await self.request_snapshot()
+                return
+            self.state = apply_delta(self.state, data["delta"])
+            self.version = data["version"]
+            if "private" in data:
+                self.state = with_own_cards(self.state, self.me, data["private"]["cards"])
+        else:
+            return
+
+        await self.maybe_act(received)
+
+    async def maybe_act(self, received: float):
+        """Act once per version on which it is our turn"""
+        state = self.state
+        if state is None or state.get("current_player_id") != self.me:
+            return
+        if self.acted_version == self.version:
+            return
+        self.acted_version = self.version
+        self.retried = False
+        action, amount = self.strategy.decide_action(state, self.me)
+        await self.send_action(action, amount, received)
+
+    async def send_action(self, action: str, amount: int, received: float):
+        request_id = f"{self.name}-{next(self.request_ids)}"
+        now = time.perf_counter()
+        self.pending[request_id] = now
+        self.stats.reaction_ms.append((now - received) * 1000)
+        self.stats.decisions += 1
+        await self.send({"type": "action", "request_id": request_id, "action": action, "amount": amount})
+
+    async def recover(self, error: Dict[str, Any]):
+        """An action was refused: fall back to check/call once, then resync"""
+        state = self.state
+        our_turn = state is not None and state.get("current_player_id") == self.me
+        if error.get("status") == 400 and our_turn and not self.retried:
+            self.retried = True
+            me = next(p for p in state["players"] if p["id"] == self.me)
+            action = "call" if me["current_bet"] < state["current_bet"] else "check"
+            await self.send_action(action, 0, time.perf_counter())
+        else:
+            await self.request_snapshot()
+
+    async def request_snapshot(self):
+        self.version = None
+        await self.send({"type": "snapshot"})
+
+    async def send(self, message: Dict[str, Any]):
+        """Send a request in our socket's encoding"""
+        if self.encoding == "msgpack":
+            await self.ws.send_bytes(msgpack.packb(message))
+        else:
+            await self.ws.send_json(message)
+
+# ===== Runner =====
+
+async def create_table(session: aiohttp.ClientSession, server_url: str, max_players: int, small_blind: int) -> str:
+    async with session.post(
+        f"{server_url}/api/tables",
+        params={"max_players": max_players, "small_blind": small_blind}
+    ) as response:
+        response.raise_for_status()
+        return (await response.json())["table_id"]
+
+async def run_bots(
+    server_url: str,
+    bots: int,
+    per_table: int = 6,
+    duration: Optional[float] = None,
+    table_id: Optional[str] = None,
+    max_connections: int = 100,
+    report_every: float = 5.0,
+    encoding: str = "json"
+) -> Dict[str, float]:
+    """Seat `bots` bots (filling new tables of `per_table`, or one given table) and play"""
+    stats = RunnerStats()
+    connector = aiohttp.TCPConnector(limit=max_connections)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        players: List[AsyncBot] = []
+        current_table = table_id
+        for i in range(bots):
+            if i % per_table == 0 and not (i == 0 and table_id):
+                current_table = await create_table(session, server_url, per_table, 5)
+            bot = AsyncBot(PokerBot(server_url, f"Bot{i + 1}"), session, stats, encoding)
+            if await bot.join(current_table):
+                players.append(bot)
+
+        print(f"🤖 {len(players)} bots seated, playing...")
+        tasks = [asyncio.create_task(bot.run()) for bot in players]
+
+        async def reporter():
+            while True:
+                await asyncio.sleep(report_every)
+                print(stats.report())
+                stats.reset_window()
+
+        report_task = asyncio.create_task(reporter())
+        try:
+            await asyncio.wait(tasks, timeout=duration)
+        finally:
+            report_task.cancel()
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    return stats.report()
+
+def main():
+    parser = argparse.ArgumentParser(description="Run many poker bots in one process")
+    parser.add_argument("--server", default="http://localhost:8000", help="Server URL")
+    parser.add_argument("--bots", type=int, default=60, help="Number of bots")
+    parser.add_argument("--per-table", type=int, default=6, help="Bots per table")
+    parser.add_argument("--table", help="Seat the first bots at this table instead of a new one")
+    parser.add_argument("--duration", type=float, help="Seconds to play (default: until interrupted)")
+    parser.add_argument("--connections", type=int, default=100, help="HTTP connection pool size")
+    parser.add_argument("--seed", type=int, help="Seed for the bots' random decisions")
+    parser.add_argument("--encoding", choices=["json", "msgpack"], default="json", help="WebSocket message encoding")
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    try:
+        result = asyncio.run(run_bots(
+            args.server, args.bots, args.per_table, args.duration, args.table, args.connections,
+            encoding=args.encoding
+        ))
+        print(result)
+    except KeyboardInterrupt:
+        print("\n🤖 Bots stopped by user")
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,9 @@ import random
 import sys
 from typing import Optional, Dict, Any
 
+# How long the server may hold a state request open while nothing changes
+LONG_POLL_TIMEOUT = 30
+
 class PokerBot:
     def __init__(self, server_url: str, bot_name: str):
         self.server_url = server_url
@@ -17,6 +20,8 @@ class PokerBot:
         self.table_id: Optional[str] = None
         self.player_id: Optional[str] = None
         self.api_token: Optional[str] = None
+        self.state: Optional[Dict[str, Any]] = None  # Last table state received
+        self.state_revision: Optional[int] = None
 
     def list_tables(self):
         """List all available tables"""
@@ -28,6 +33,19 @@ class PokerBot:
             print(f"Error listing tables: {e}")
             return []
 
+    def find_seat(self, small_blind: Optional[int] = None) -> Optional[str]:
+        """Ask the lobby for a table with an open seat"""
+        try:
+            params = {} if small_blind is None else {"small_blind": small_blind}
+            response = requests.get(f"{self.server_url}/api/lobby/find-seat", params=params)
+            if response.status_code == 404:
+                return None
+            response.raise_for_status()
+            return response.json()["table_id"]
+        except Exception as e:
+            print(f"Error finding a seat: {e}")
+            return None
+
     def create_table(self, max_players: int = 6, small_blind: int = 5) -> Optional[str]:
         """Create a new table"""
         try:
@@ -60,15 +78,34 @@ class PokerBot:
             print(f"Error joining table: {e}")
             return False
 
-    def get_table_state(self) -> Optional[Dict[str, Any]]:
-        """Get current table state"""
+    def get_table_state(self, wait: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Get current table state
+
+        With wait=True the server holds the request until the state changes
+        (or the long-poll timeout passes); unchanged state is not re-sent.
+        """
+        params = {"player_id": self.player_id}
+        headers = {}
+        if self.state is not None:
+            headers["If-None-Match"] = f'"{self.state_revision}"'
+            if wait:
+                params["wait_for_revision"] = self.state_revision
+                params["timeout"] = LONG_POLL_TIMEOUT
+
         try:
             response = requests.get(
                 f"{self.server_url}/api/tables/{self.table_id}",
-                params={"player_id": self.player_id}
+                params=params,
+                headers=headers,
+                timeout=LONG_POLL_TIMEOUT + 10
             )
+            if response.status_code == 304:
+                return self.state
             response.raise_for_status()
-            return response.json()
+            self.state = response.json()
+            self.state_revision = int(response.headers["X-Table-Revision"])
+            return self.state
         except Exception as e:
             print(f"Error getting table state: {e}")
             return None
@@ -98,15 +135,16 @@ class PokerBot:
             print(f"Error performing action: {e}")
             return False
 
-    def decide_action(self, state: Dict[str, Any]) -> tuple[str, int]:
+    def decide_action(self, state: Dict[str, Any], player_id: Optional[Any] = None) -> tuple[str, int]:
         """
         Decide what action to take based on simple AI strategy
-        Returns (action, amount)
+        Returns (action, amount); player_id is our ID in `state` if it is not self.player_id
         """
         # Find our player
+        me = self.player_id if player_id is None else player_id
         our_player = None
         for player in state["players"]:
-            if player["id"] == self.player_id:
+            if player["id"] == me:
                 our_player = player
                 break
 
@@ -162,8 +200,8 @@ class PokerBot:
 
         while consecutive_errors < max_consecutive_errors:
             try:
-                # Get current state
-                state = self.get_table_state()
+                # Get current state, waiting for it to change
+                state = self.get_table_state(wait=True)
                 if not state:
                     consecutive_errors += 1
                     time.sleep(2)
@@ -171,9 +209,8 @@ class PokerBot:
 
                 # Check if it's our turn
                 if state.get("current_player_id") != self.player_id:
-                    # Not our turn, wait
+                    # Not our turn, the next request waits for a change
                     consecutive_errors = 0  # Reset error counter
-                    time.sleep(1)
                     continue
 
                 # It's our turn - decide action
@@ -185,9 +222,8 @@ class PokerBot:
                     consecutive_errors = 0
                 else:
                     consecutive_errors += 1
-
-                # Wait a bit before next check
-                time.sleep(1)
+                    # Back off a little before trying again
+                    time.sleep(1)
 
             except KeyboardInterrupt:
                 print(f"\n🤖 Bot {self.bot_name} is leaving...")
@@ -206,7 +242,7 @@ def main():
     parser = argparse.ArgumentParser(description="Poker Bot")
     parser.add_argument("--server", default="http://localhost:8000", help="Server URL")
     parser.add_argument("--name", default=f"Bot{random.randint(1, 999)}", help="Bot name")
-    parser.add_argument("--table", help="Table ID to join (if not specified, will join first available or create)")
+    parser.add_argument("--table", help="Table ID to join (if not specified, will join an open seat or create)")
     args = parser.parse_args()
 
     bot = PokerBot(args.server, args.name)
@@ -214,15 +250,10 @@ def main():
     # Determine which table to join
     table_id = args.table
     if not table_id:
-        # List tables and join first available
-        tables = bot.list_tables()
-        if tables:
-            # Join first table with space
-            for table in tables:
-                if table["players"] < table["max_players"]:
-                    table_id = table["table_id"]
-                    print(f"Found available table: {table_id[:8]}...")
-                    break
+        # Join the lobby's pick of the tables with space
+        table_id = bot.find_seat()
+        if table_id:
+            print(f"Found available table: {table_id[:8]}...")
 
         if not table_id:
             # No available tables, create one
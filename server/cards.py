@@ -0,0 +1,73 @@
+"""
+Cards - compact integer card and deck representation
+Cards stay small ints inside the server and become strings only when serialized
+"""
+
+from typing import Iterable, List
+
+# ===== Card Encoding =====
+#
+# A card is a small int: rank * 4 + suit
+#   rank: 0 = "2" ... 12 = "A"
+#   suit: 0 = ♠, 1 = ♥, 2 = ♦, 3 = ♣
+
+RANKS = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A']
+SUITS = ['♠', '♥', '♦', '♣']
+
+DECK_SIZE = 52
+
+# Every card string is built once, so serializing a card is a tuple lookup
+CARD_STRINGS = tuple(RANKS[c >> 2] + SUITS[c & 3] for c in range(DECK_SIZE))
+_CARD_INDEX = {s: c for c, s in enumerate(CARD_STRINGS)}
+
+def card_rank(card: int) -> int:
+    """Get the rank of a card (0 = "2" ... 12 = "A")"""
+    return card >> 2
+
+def card_suit(card: int) -> int:
+    """Get the suit of a card (0 = ♠, 1 = ♥, 2 = ♦, 3 = ♣)"""
+    return card & 3
+
+def card_from_str(card: str) -> int:
+    """Parse a card string like "10♥" into its integer encoding"""
+    try:
+        return _CARD_INDEX[card]
+    except KeyError:
+        raise ValueError(f"Invalid card: {card!r}") from None
+
+def card_to_str(card: int) -> str:
+    """Format an integer card as a string like "10♥" """
+    return CARD_STRINGS[card]
+
+def cards_to_str(cards: Iterable[int]) -> List[str]:
+    """Format integer cards as strings"""
+    return [CARD_STRINGS[c] for c in cards]
+
+# ===== Deck =====
+
+class Deck:
+    """
+    A preallocated 52-card deck, refilled with a shuffled order for every hand
+
+    Shuffling happens ahead of time (see shuffler.py), so dealing is an index bump.
+    """
+
+    __slots__ = ("cards", "position")
+
+    def __init__(self):
+        self.cards = bytearray(range(DECK_SIZE))
+        self.position = DECK_SIZE  # Empty until the first shuffle
+
+    def shuffle(self, order: bytes):
+        """Load a shuffled deck order and rewind"""
+        self.cards[:] = order
+        self.position = 0
+
+    def deal(self) -> int:
+        """Deal the next card"""
+        card = self.cards[self.position]
+        self.position += 1
+        return card
+
+    def __len__(self) -> int:
+        return DECK_SIZE - self.position
@@ -0,0 +1,140 @@
+"""
+Codec - WebSocket message encodings
+Each socket picks JSON text (the default) or MessagePack binary frames when it
+connects. MessagePack frames carry small per-table integer aliases instead of
+player IDs. A broadcast is encoded at most once per encoding and the same
+frame is queued on every socket that uses it.
+"""
+
+from enum import Enum
+from typing import Any, Dict, Optional, Tuple, Union
+import json
+
+import msgpack
+
+Frame = Union[str, bytes]  # Text for JSON sockets, bytes for MessagePack ones
+
+class Encoding(str, Enum):
+    JSON = "json"
+    MSGPACK = "msgpack"
+
+# Fields holding a player ID, and fields holding a list of them
+ID_FIELDS = frozenset(("id", "player_id", "current_player_id"))
+ID_LIST_FIELDS = frozenset(("player_order", "players_removed"))
+
+PRIVATE_KEY = msgpack.packb("private")
+
+def encode_message(message: dict) -> str:
+    """Encode a message as JSON text (same format as send_json)"""
+    return json.dumps(message, separators=(",", ":"), ensure_ascii=False)
+
+def alias_ids(value: Any, aliases: Dict[str, int]) -> Any:
+    """Copy of a message with every player ID that has an alias replaced by it"""
+    if isinstance(value, dict):
+        aliased = {}
+        for key, item in value.items():
+            if key in ID_FIELDS:
+                item = aliases.get(item, item)
+            elif key in ID_LIST_FIELDS:
+                item = [aliases.get(pid, pid) for pid in item]
+            elif key == "players" and isinstance(item, dict):
+                # A delta's player ID -> changed fields
+                item = {aliases.get(pid, pid): alias_ids(fields, aliases) for pid, fields in item.items()}
+            else:
+                item = alias_ids(item, aliases)
+            aliased[key] = item
+        return aliased
+    if isinstance(value, list):
+        return [alias_ids(item, aliases) for item in value]
+    return value
+
+def pack_message(
+    message: dict,
+    aliases: Optional[Dict[str, int]] = None,
+    new_aliases: Optional[Dict[str, int]] = None
+) -> bytes:
+    """
+    Encode a message as MessagePack, with player IDs replaced by `aliases`
+
+    `new_aliases` (player ID -> alias) is sent along as the "aliases" field,
+    so clients can tell which alias is whose.
+    """
+    if aliases:
+        message = alias_ids(message, aliases)
+    if new_aliases:
+        message = {**message, "aliases": new_aliases}
+    return msgpack.packb(message)
+
+def encode_overlay(overlay: Dict[str, Any], encoding: Encoding) -> Frame:
+    return encode_message(overlay) if encoding == Encoding.JSON else msgpack.packb(overlay)
+
+def with_private(frame: Frame, overlay: Optional[Frame]) -> Frame:
+    """Splice an encoded overlay into an encoded message as its "private" field"""
+    if overlay is None:
+        return frame
+    if isinstance(frame, str):
+        return frame[:-1] + ',"private":' + overlay + '}'
+    # MessagePack maps start with their size: bump it and append the pair
+    head = frame[0]
+    if 0x80 <= head < 0x8f:
+        return bytes((head + 1,)) + frame[1:] + PRIVATE_KEY + overlay
+    if head == 0x8f:
+        return b"\xde\x00\x10" + frame[1:] + PRIVATE_KEY + overlay
+    if head == 0xde:
+        size = int.from_bytes(frame[1:3], "big") + 1
+        return b"\xde" + size.to_bytes(2, "big") + frame[3:] + PRIVATE_KEY + overlay
+    raise ValueError("Not a MessagePack map of fewer than 65535 fields")
+
+def decode_request(text: Optional[str], data: Optional[bytes]) -> Any:
+    """A client message from a text (JSON) or binary (MessagePack) frame, None if malformed"""
+    try:
+        return json.loads(text) if text is not None else msgpack.unpackb(data or b"")
+    except (ValueError, RecursionError):
+        # Deeply nested arrays exhaust the JSON parser's stack; treat them as malformed too
+        return None
+
+class Frames:
+    """One message for a group of sockets, encoded the first time a socket needs each form"""
+
+    __slots__ = ("message", "full_message", "private", "aliases", "new_aliases", "encoded")
+
+    def __init__(
+        self,
+        message: dict,
+        full_message: Optional[dict] = None,
+        private: Optional[Dict[str, Dict[str, Any]]] = None,
+        aliases: Optional[Dict[str, int]] = None,
+        new_aliases: Optional[Dict[str, int]] = None
+    ):
+        self.message = message
+        self.full_message = full_message  # Sent instead to sockets that want full state updates
+        self.private = private  # player_id -> overlay for that player's copy only
+        self.aliases = aliases  # player_id -> alias, for MessagePack frames
+        self.new_aliases = new_aliases  # Aliases first used by this message
+        self.encoded: Dict[Tuple[Encoding, bool], Tuple[Frame, int]] = {}
+
+    def shared(self, encoding: Encoding, full_state: bool = False) -> Tuple[Frame, int]:
+        """The frame common to every socket of one kind, and its size in bytes"""
+        full_state = full_state and self.full_message is not None
+        entry = self.encoded.get((encoding, full_state))
+        if entry is None:
+            message = self.full_message if full_state else self.message
+            if encoding == Encoding.JSON:
+                text = encode_message(message)
+                entry = (text, len(text.encode()))
+            else:
+                data = pack_message(message, self.aliases, self.new_aliases)
+                entry = (data, len(data))
+            self.encoded[(encoding, full_state)] = entry
+        return entry
+
+    def personal(self, frame: Frame, encoding: Encoding, player_id: str) -> Frame:
+        """A shared frame with the player's own overlay, if they have one"""
+        overlay = self.private.get(player_id) if self.private else None
+        if overlay is None:
+            return frame
+        return with_private(frame, encode_overlay(overlay, encoding))
+
+    def frame(self, encoding: Encoding, full_state: bool, player_id: str) -> Frame:
+        """The frame for one socket"""
+        return self.personal(self.shared(encoding, full_state)[0], encoding, player_id)
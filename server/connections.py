@@ -0,0 +1,248 @@
+"""
+Connections - WebSocket fan-out with per-connection queues
+Broadcasts only enqueue pre-encoded frames; each connection has its own writer
+task, so a slow client never delays the others or the request that broadcast.
+Only broadcast updates are ever dropped for a slow client: replies and
+snapshots have no version gap to give the loss away, so they are always sent.
+Spectators are kept apart from players, so per-action broadcasts only reach
+players and spectators get the coalesced updates sent to them separately.
+"""
+
+from collections import deque
+from enum import Enum
+from typing import Deque, Dict, Iterator, List, Optional, Tuple
+import asyncio
+import logging
+import time
+
+from fastapi import WebSocket
+
+from codec import Encoding, Frame, Frames
+
+logger = logging.getLogger(__name__)
+
+class SlowConsumerPolicy(str, Enum):
+    DROP = "drop"              # Discard new updates while the queue is full
+    COALESCE = "coalesce"      # Discard queued updates and keep only the newest
+    DISCONNECT = "disconnect"  # Close the connection
+
+class Connection:
+    """One WebSocket with a bounded outgoing queue drained by its writer task"""
+
+    __slots__ = (
+        "websocket", "table_id", "player_id", "full_state", "encoding", "spectator", "queue", "max_queue",
+        "policy", "ready", "writer", "closed", "close_code", "sent", "dropped", "last_seen"
+    )
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        table_id: str,
+        player_id: str,
+        max_queue: int,
+        policy: SlowConsumerPolicy,
+        full_state: bool = False,
+        encoding: Encoding = Encoding.JSON,
+        spectator: bool = False
+    ):
+        self.websocket = websocket
+        self.table_id = table_id
+        self.player_id = player_id
+        self.full_state = full_state  # Legacy client that wants table_state on every update
+        self.encoding = encoding
+        self.spectator = spectator  # Not seated: gets coalesced updates instead of every event
+        self.queue: Deque[Tuple[Frame, bool]] = deque()  # (frame, droppable)
+        self.max_queue = max_queue
+        self.policy = policy
+        self.ready = asyncio.Event()
+        self.writer: Optional[asyncio.Task] = None
+        self.closed = False
+        self.close_code = 1013  # Try again later: the client fell too far behind
+        self.sent = 0
+        self.dropped = 0
+        self.last_seen = time.monotonic()  # When the client last sent anything
+
+    def send(self, frame: Frame, droppable: bool = False) -> bool:
+        """
+        Queue a frame for the writer without waiting; False if it was dropped
+
+        Only droppable frames (versioned broadcast updates) count against the
+        slow consumer policy; the others are queued whatever the backlog.
+        """
+        if self.closed:
+            return False
+
+        if droppable and len(self.queue) >= self.max_queue:
+            if self.policy == SlowConsumerPolicy.DISCONNECT:
+                self.dropped += len(self.queue) + 1
+                self.queue.clear()
+                self.close()
+                return False
+            if self.policy == SlowConsumerPolicy.DROP:
+                self.dropped += 1
+                return False
+            # Coalesce: clients detect the version gap and request a snapshot
+            kept = deque(entry for entry in self.queue if not entry[1])
+            self.dropped += len(self.queue) - len(kept)
+            self.queue = kept
+
+        self.queue.append((frame, droppable))
+        self.ready.set()
+        return True
+
+    def close(self):
+        """Stop accepting messages and let the writer close the socket"""
+        self.closed = True
+        self.ready.set()
+
+    async def run_writer(self, on_finished):
+        """Send queued frames in order until the connection closes"""
+        websocket = self.websocket
+        try:
+            while not self.closed:
+                await self.ready.wait()
+                self.ready.clear()
+                while self.queue and not self.closed:
+                    frame, _ = self.queue.popleft()
+                    if isinstance(frame, str):
+                        await websocket.send_text(frame)
+                    else:
+                        await websocket.send_bytes(frame)
+                    self.sent += 1
+
+            # Only the disconnect policy and evict() close a connection from this side
+            logger.info(f"Closing WebSocket: {self.player_id} (code {self.close_code}, {self.dropped} dropped)")
+            await websocket.close(code=self.close_code)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.info(f"WebSocket send failed for {self.player_id}: {e}")
+        finally:
+            self.closed = True
+            on_finished(self)
+
+class ConnectionManager:
+    """Tracks connections per table and fans out broadcasts to their queues"""
+
+    def __init__(self, max_queue: int = 64, policy: SlowConsumerPolicy = SlowConsumerPolicy.COALESCE):
+        self.max_queue = max_queue
+        self.policy = policy
+        self.tables: Dict[str, List[Connection]] = {}  # table_id -> player connections
+        self.spectators: Dict[str, List[Connection]] = {}  # table_id -> spectator connections
+        self.dropped_messages = 0  # From connections already removed
+        self.slow_disconnects = 0
+        self.messages_sent = 0
+        self.open = 0
+
+    def connect(
+        self,
+        websocket: WebSocket,
+        table_id: str,
+        player_id: str,
+        full_state: bool = False,
+        encoding: Encoding = Encoding.JSON,
+        spectator: bool = False
+    ) -> Connection:
+        """Register an accepted WebSocket and start its writer task"""
+        conn = Connection(websocket, table_id, player_id, self.max_queue, self.policy, full_state, encoding, spectator)
+        self._group(conn).setdefault(table_id, []).append(conn)
+        self.open += 1
+        conn.writer = asyncio.create_task(conn.run_writer(self._writer_finished))
+        return conn
+
+    def disconnect(self, conn: Connection):
+        """Unregister a connection and stop its writer"""
+        conn.closed = True
+        self._remove(conn)
+        if conn.writer is not None and not conn.writer.done():
+            conn.writer.cancel()
+
+    def evict(self, conn: Connection):
+        """Close a connection that stopped responding and unregister it"""
+        conn.close_code = 1001  # Going away
+        conn.close()
+        self._remove(conn)
+
+    def _writer_finished(self, conn: Connection):
+        if self._remove(conn) and conn.dropped and conn.policy == SlowConsumerPolicy.DISCONNECT:
+            self.slow_disconnects += 1
+
+    def promote(self, conn: Connection):
+        """Move a spectator who took a seat over to the players"""
+        conns = self.spectators.get(conn.table_id)
+        if not conn.spectator or not conns or conn not in conns:
+            return
+        conns.remove(conn)
+        if not conns:
+            del self.spectators[conn.table_id]
+        conn.spectator = False
+        self.tables.setdefault(conn.table_id, []).append(conn)
+
+    def _group(self, conn: Connection) -> Dict[str, List[Connection]]:
+        return self.spectators if conn.spectator else self.tables
+
+    def _remove(self, conn: Connection) -> bool:
+        group = self._group(conn)
+        conns = group.get(conn.table_id)
+        if not conns or conn not in conns:
+            return False
+        conns.remove(conn)
+        if not conns:
+            del group[conn.table_id]
+        self.open -= 1
+        self.dropped_messages += conn.dropped
+        self.messages_sent += conn.sent
+        return True
+
+    def broadcast(self, table_id: str, frames: Frames, spectators: bool = False) -> Tuple[int, int]:
+        """
+        Queue a message on every player connection at a table (or every
+        spectator one); returns how many accepted it and the bytes queued
+        (not counting private overlays)
+
+        Each encoding and update style is encoded once and shared; a player's
+        "private" overlay is spliced into their own copy only.
+        """
+        accepted = 0
+        queued_bytes = 0
+        for conn in (self.spectators if spectators else self.tables).get(table_id, ()):
+            frame, size = frames.shared(conn.encoding, conn.full_state)
+            if conn.send(frames.personal(frame, conn.encoding, conn.player_id), droppable=True):
+                accepted += 1
+                queued_bytes += size
+        return accepted, queued_bytes
+
+    def is_connected(self, table_id: str, player_id: str) -> bool:
+        """Whether the player has a connection at the table"""
+        return any(conn.player_id == player_id for conn in self.tables.get(table_id, ()))
+
+    def is_watched(self, table_id: str) -> bool:
+        """Whether any player or spectator is connected to the table"""
+        return table_id in self.tables or table_id in self.spectators
+
+    def spectator_count(self, table_id: str) -> int:
+        return len(self.spectators.get(table_id, ()))
+
+    def count(self) -> int:
+        """Number of open connections"""
+        return self.open
+
+    def _all(self) -> Iterator[Connection]:
+        for group in (self.tables, self.spectators):
+            for conns in group.values():
+                yield from conns
+
+    def stats(self) -> Dict[str, int]:
+        """Queue depth and drop counters"""
+        conns = list(self._all())
+        depths = [len(conn.queue) for conn in conns]
+        return {
+            "connections": len(conns),
+            "spectators": sum(conn.spectator for conn in conns),
+            "msgpack_connections": sum(conn.encoding == Encoding.MSGPACK for conn in conns),
+            "queue_depth": sum(depths),
+            "max_queue_depth": max(depths, default=0),
+            "messages_sent": self.messages_sent + sum(conn.sent for conn in conns),
+            "dropped_messages": self.dropped_messages + sum(conn.dropped for conn in conns),
+            "slow_disconnects": self.slow_disconnects
+        }
@@ -0,0 +1,196 @@
+"""
+Equity - vectorized hand equity estimation
+Monte Carlo over batches of random boards and opponent hands, or exact
+enumeration when few cards remain. Safe to run in a process pool.
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+from math import comb
+import itertools
+import time
+
+import numpy as np
+
+from cards import DECK_SIZE
+from hand_evaluator import lookup_tables
+
+# ===== Batch Evaluator =====
+
+_tables = lookup_tables()
+_CARD_KEY = np.array(_tables["card_key"], dtype=np.int64)
+_CARD_BIT = np.array(_tables["card_bit"], dtype=np.int64)
+_SUIT_TABLE = np.array(_tables["suit_table"], dtype=np.int8)
+_FLUSH_TABLE = np.array(_tables["flush_table"], dtype=np.int64)
+_RANK_KEYS = np.array(sorted(_tables["rank_table"]), dtype=np.int64)
+_RANK_VALUES = np.array([_tables["rank_table"][k] for k in _RANK_KEYS.tolist()], dtype=np.int64)
+_RANK_MASK = _tables["rank_mask"]
+_SUIT_SHIFT = _tables["suit_shift"]
+del _tables
+
+def evaluate_batch(hands: np.ndarray) -> np.ndarray:
+    """Evaluate an (n, 5..7) array of integer cards, same strengths as hand_evaluator.evaluate"""
+    keys = _CARD_KEY[hands].sum(axis=1)
+    suits = _SUIT_TABLE[keys >> _SUIT_SHIFT]
+    strengths = _RANK_VALUES[np.searchsorted(_RANK_KEYS, keys & _RANK_MASK)]
+
+    flush = suits >= 0
+    if flush.any():
+        flush_hands = hands[flush]
+        in_suit = (flush_hands & 3) == suits[flush][:, None]
+        # Cards of one suit have distinct ranks, so summing the bits is an OR
+        masks = np.where(in_suit, _CARD_BIT[flush_hands], 0).sum(axis=1)
+        strengths[flush] = _FLUSH_TABLE[masks]
+    return strengths
+
+# ===== Equity =====
+
+DEFAULT_ITERATIONS = 20_000
+DEFAULT_TIME_BUDGET = 0.2  # seconds
+DEFAULT_EXACT_LIMIT = 100_000  # largest number of outcomes to enumerate exactly
+BATCH_SIZE = 5_000
+
+def _validate(hole: Sequence[int], board: Sequence[int], opponents: int):
+    if len(hole) != 2:
+        raise ValueError("Need exactly 2 hole cards")
+    if len(board) not in (0, 3, 4, 5):
+        raise ValueError("Board must have 0, 3, 4 or 5 cards")
+    if not 1 <= opponents <= 9:
+        raise ValueError("Opponents must be between 1 and 9")
+    known = list(hole) + list(board)
+    if len(set(known)) != len(known) or any(not 0 <= c < DECK_SIZE for c in known):
+        raise ValueError("Cards must be distinct and valid")
+
+def _score(hero: np.ndarray, opponents: np.ndarray) -> Tuple[int, int, float]:
+    """Count wins, ties and equity share of hero strengths (n,) against opponents (n, k)"""
+    best = opponents.max(axis=1)
+    wins = hero > best
+    ties = hero == best
+    tied_with = (opponents == hero[:, None]).sum(axis=1)
+    share = wins.sum() + (1.0 / (tied_with[ties] + 1)).sum()
+    return int(wins.sum()), int(ties.sum()), float(share)
+
+def _evaluate_draws(
+    hole: Sequence[int],
+    board: Sequence[int],
+    draws: np.ndarray,
+    opponents: int
+) -> Tuple[int, int, float]:
+    """Score rows of drawn cards: missing board cards first, then 2 per opponent"""
+    n = len(draws)
+    missing = 5 - len(board)
+    full_board = np.concatenate(
+        [np.broadcast_to(np.array(board, dtype=np.int64), (n, len(board))), draws[:, :missing]],
+        axis=1
+    )
+    hero = evaluate_batch(np.concatenate(
+        [np.broadcast_to(np.array(hole, dtype=np.int64), (n, 2)), full_board], axis=1
+    ))
+
+    opponent_holes = draws[:, missing:].reshape(n, opponents, 2)
+    opponent_hands = np.concatenate(
+        [opponent_holes, np.broadcast_to(full_board[:, None, :], (n, opponents, 5))], axis=2
+    ).reshape(n * opponents, 7)
+    opponent_strengths = evaluate_batch(opponent_hands).reshape(n, opponents)
+
+    return _score(hero, opponent_strengths)
+
+def count_outcomes(unknown: int, missing: int, opponents: int) -> int:
+    """Number of distinct (board, opponent hands) outcomes for exact enumeration"""
+    total = comb(unknown, missing)
+    remaining = unknown - missing
+    for _ in range(opponents):
+        total *= comb(remaining, 2)
+        remaining -= 2
+    return total
+
+def _enumerate(deck: List[int], missing: int, opponents: int) -> np.ndarray:
+    """Every board completion followed by every assignment of opponent hands"""
+    n = len(deck)
+    rows = np.array(list(itertools.combinations(range(n), missing)), dtype=np.int64)
+    rows = rows.reshape(comb(n, missing), missing)
+    pairs = np.array(list(itertools.combinations(range(n), 2)), dtype=np.int64)
+
+    for _ in range(opponents):
+        left = np.repeat(rows, len(pairs), axis=0)
+        right = np.tile(pairs, (len(rows), 1))
+        overlap = (left[:, :, None] == right[:, None, :]).any(axis=(1, 2))
+        rows = np.concatenate([left, right], axis=1)[~overlap]
+
+    return np.array(deck, dtype=np.int64)[rows]
+
+def estimate_equity(
+    hole: Sequence[int],
+    board: Sequence[int] = (),
+    opponents: int = 1,
+    iterations: int = DEFAULT_ITERATIONS,
+    time_budget: float = DEFAULT_TIME_BUDGET,
+    exact_limit: int = DEFAULT_EXACT_LIMIT,
+    seed: Optional[int] = None
+) -> Dict[str, object]:
+    """
+    Estimate win/tie equity of a hand against random opponent hands
+
+    Enumerates every outcome exactly when there are at most exact_limit of them,
+    otherwise samples until iterations or time_budget (seconds) runs out.
+    """
+    _validate(hole, board, opponents)
+    start = time.perf_counter()
+
+    known = set(hole) | set(board)
+    deck = [c for c in range(DECK_SIZE) if c not in known]
+    missing = 5 - len(board)
+    outcomes = count_outcomes(len(deck), missing, opponents)
+
+    exact = outcomes <= exact_limit
+    if exact:
+        draws = _enumerate(deck, missing, opponents)
+        wins, ties, share = _evaluate_draws(hole, board, draws, opponents)
+        samples = outcomes
+    else:
+        rng = np.random.default_rng(seed)
+        unknown = np.array(deck, dtype=np.int64)
+        drawn = missing + 2 * opponents
+        wins = ties = samples = 0
+        share = 0.0
+        while samples < iterations:
+            batch = min(BATCH_SIZE, iterations - samples)
+            picks = np.argsort(rng.random((batch, len(deck))), axis=1)[:, :drawn]
+            w, t, s = _evaluate_draws(hole, board, unknown[picks], opponents)
+            wins += w
+            ties += t
+            share += s
+            samples += batch
+            if time.perf_counter() - start >= time_budget:
+                break
+
+    return {
+        "win": wins / samples,
+        "tie": ties / samples,
+        "equity": share / samples,
+        "samples": samples,
+        "exact": exact,
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 2)
+    }
+
+if __name__ == "__main__":
+    import argparse
+
+    from cards import card_from_str
+
+    parser = argparse.ArgumentParser(description="Equity calculator and batch evaluator benchmark")
+    parser.add_argument("hole", nargs="?", default="A♠,A♥", help="Hole cards, e.g. A♠,K♠")
+    parser.add_argument("--board", default="", help="Board cards, e.g. 2♣,7♦,J♥")
+    parser.add_argument("--opponents", type=int, default=1)
+    parser.add_argument("--iterations", type=int, default=200_000)
+    args = parser.parse_args()
+
+    hole = [card_from_str(c) for c in args.hole.split(",")]
+    board = [card_from_str(c) for c in args.board.split(",") if c]
+    result = estimate_equity(hole, board, args.opponents, args.iterations, time_budget=60.0)
+    print(result)
+
+    hands = np.argsort(np.random.default_rng(0).random((1_000_000, DECK_SIZE)), axis=1)[:, :7]
+    start = time.perf_counter()
+    evaluate_batch(hands)
+    elapsed = time.perf_counter() - start
+    print(f"evaluate_batch: {len(hands) / elapsed:,.0f} hands/sec")
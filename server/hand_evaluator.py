@@ -0,0 +1,272 @@
+"""
+Hand Evaluator - table-driven Texas Hold'em hand ranking
+Ranks 5 to 7 card hands with a few precomputed table lookups
+"""
+
+from typing import Dict, List, Optional, Sequence
+
+from cards import DECK_SIZE
+
+# Cards use the integer encoding from cards.py (rank * 4 + suit)
+
+# ===== Hand Strength =====
+#
+# A strength is an int where higher beats lower:
+#   category << 20 | five ranks packed 4 bits each (most significant first)
+
+HIGH_CARD = 0
+ONE_PAIR = 1
+TWO_PAIR = 2
+THREE_OF_A_KIND = 3
+STRAIGHT = 4
+FLUSH = 5
+FULL_HOUSE = 6
+FOUR_OF_A_KIND = 7
+STRAIGHT_FLUSH = 8
+
+HAND_NAMES = [
+    "High Card", "One Pair", "Two Pair", "Three of a Kind", "Straight",
+    "Flush", "Full House", "Four of a Kind", "Straight Flush"
+]
+
+def _pack(category: int, *ranks: int) -> int:
+    value = category
+    for i in range(5):
+        value = (value << 4) | (ranks[i] if i < len(ranks) else 0)
+    return value
+
+def hand_category(strength: int) -> int:
+    """Get the hand category (HIGH_CARD ... STRAIGHT_FLUSH) of a strength"""
+    return strength >> 20
+
+def hand_name(strength: int) -> str:
+    """Get a readable name like "Full House" for a strength"""
+    return HAND_NAMES[strength >> 20]
+
+# ===== Lookup Tables =====
+#
+# Each card contributes one int to a hand key:
+#   bits 0-31: 5 ** rank, so the sum is the base-5 rank count vector
+#   bits 32-43: 1 << (3 * suit), so each 3-bit field counts one suit
+# Summing the cards of a hand gives both counts with no carries.
+
+_RANK_MASK = (1 << 32) - 1
+_SUIT_SHIFT = 32
+
+_CARD_KEY = [5 ** (c >> 2) + (1 << (_SUIT_SHIFT + 3 * (c & 3))) for c in range(DECK_SIZE)]
+_CARD_BIT = [1 << (c >> 2) for c in range(DECK_SIZE)]
+
+def _find_straight(mask: int) -> int:
+    """Highest rank of a straight in a 13-bit rank mask, or -1"""
+    for high in range(12, 3, -1):
+        window = 0b11111 << (high - 4)
+        if mask & window == window:
+            return high
+    wheel = (1 << 12) | 0b1111
+    if mask & wheel == wheel:
+        return 3
+    return -1
+
+_STRAIGHT_HIGH = [_find_straight(mask) for mask in range(1 << 13)]
+
+def _non_flush_strength(counts: Sequence[int]) -> int:
+    """Best non-flush hand for a rank count vector of 5 to 7 cards"""
+    ranks = [r for r in range(12, -1, -1) if counts[r]]
+    quads = [r for r in ranks if counts[r] == 4]
+    trips = [r for r in ranks if counts[r] == 3]
+    pairs = [r for r in ranks if counts[r] == 2]
+
+    if quads:
+        kicker = next(r for r in ranks if r != quads[0])
+        return _pack(FOUR_OF_A_KIND, quads[0], kicker)
+    if trips and (len(trips) > 1 or pairs):
+        return _pack(FULL_HOUSE, trips[0], max(trips[1:] + pairs))
+
+    straight = _STRAIGHT_HIGH[sum(1 << r for r in ranks)]
+    if straight >= 0:
+        return _pack(STRAIGHT, straight)
+
+    if trips:
+        kickers = [r for r in ranks if r != trips[0]][:2]
+        return _pack(THREE_OF_A_KIND, trips[0], *kickers)
+    if len(pairs) >= 2:
+        kicker = next(r for r in ranks if r not in pairs[:2])
+        return _pack(TWO_PAIR, pairs[0], pairs[1], kicker)
+    if pairs:
+        kickers = [r for r in ranks if r != pairs[0]][:3]
+        return _pack(ONE_PAIR, pairs[0], *kickers)
+    return _pack(HIGH_CARD, *ranks[:5])
+
+def _flush_strength(mask: int) -> int:
+    """Best flush or straight flush for a 13-bit mask of one suit's ranks"""
+    straight = _STRAIGHT_HIGH[mask]
+    if straight >= 0:
+        return _pack(STRAIGHT_FLUSH, straight)
+    return _pack(FLUSH, *[r for r in range(12, -1, -1) if mask >> r & 1][:5])
+
+def _build_rank_table() -> Dict[int, int]:
+    """Map every base-5 rank count key of 5 to 7 cards to its strength"""
+    table = {}
+    counts = [0] * 13
+    powers = [5 ** r for r in range(13)]
+
+    def fill(rank: int, remaining: int, key: int):
+        if rank == 13:
+            if remaining <= 2:
+                table[key] = _non_flush_strength(counts)
+            return
+        for n in range(min(4, remaining) + 1):
+            counts[rank] = n
+            fill(rank + 1, remaining - n, key + n * powers[rank])
+        counts[rank] = 0
+
+    fill(0, 7, 0)
+    return table
+
+def _build_suit_table() -> List[int]:
+    """Map every packed suit count field to its flush suit, or -1"""
+    table = [-1] * (1 << 12)
+    for index in range(1 << 12):
+        for suit in range(4):
+            if (index >> (3 * suit)) & 7 >= 5:
+                table[index] = suit
+    return table
+
+_RANK_TABLE = _build_rank_table()
+_SUIT_TABLE = _build_suit_table()
+_FLUSH_TABLE = [
+    _flush_strength(mask) if bin(mask).count("1") >= 5 else 0
+    for mask in range(1 << 13)
+]
+
+def lookup_tables() -> Dict[str, object]:
+    """Expose the lookup tables for batch evaluators (see equity.py)"""
+    return {
+        "card_key": _CARD_KEY,
+        "card_bit": _CARD_BIT,
+        "rank_table": _RANK_TABLE,
+        "suit_table": _SUIT_TABLE,
+        "flush_table": _FLUSH_TABLE,
+        "rank_mask": _RANK_MASK,
+        "suit_shift": _SUIT_SHIFT,
+    }
+
+# ===== Evaluation =====
+
+def evaluate7(c1: int, c2: int, c3: int, c4: int, c5: int, c6: int, c7: int) -> int:
+    """Evaluate exactly seven integer cards"""
+    k = _CARD_KEY
+    key = k[c1] + k[c2] + k[c3] + k[c4] + k[c5] + k[c6] + k[c7]
+    suit = _SUIT_TABLE[key >> _SUIT_SHIFT]
+    if suit < 0:
+        return _RANK_TABLE[key & _RANK_MASK]
+
+    mask = 0
+    for c in (c1, c2, c3, c4, c5, c6, c7):
+        if c & 3 == suit:
+            mask |= _CARD_BIT[c]
+    return _FLUSH_TABLE[mask]
+
+def evaluate(cards: Sequence[int]) -> int:
+    """Evaluate 5 to 7 integer cards and return the strength of the best hand"""
+    if not 5 <= len(cards) <= 7:
+        raise ValueError(f"Need 5 to 7 cards, got {len(cards)}")
+
+    key = 0
+    for c in cards:
+        key += _CARD_KEY[c]
+    suit = _SUIT_TABLE[key >> _SUIT_SHIFT]
+    if suit < 0:
+        return _RANK_TABLE[key & _RANK_MASK]
+
+    mask = 0
+    for c in cards:
+        if c & 3 == suit:
+            mask |= _CARD_BIT[c]
+    return _FLUSH_TABLE[mask]
+
+# ===== Pots =====
+
+def award_pots(
+    contributions: Dict[str, int],
+    strengths: Dict[str, int],
+    order: Sequence[str]
+) -> Dict[str, int]:
+    """
+    Split the pot between the best hands, with side pots for all-in players
+
+    contributions: chips each player put in this hand (folded players included)
+    strengths: hand strength of each player still in the hand
+    order: seat order used to hand out odd chips, first seat gets them first
+    Returns chips won per player
+    """
+    payouts = {pid: 0 for pid in strengths}
+    levels = sorted(set(contributions[pid] for pid in strengths))
+    seat = {pid: i for i, pid in enumerate(order)}
+
+    previous = 0
+    for i, level in enumerate(levels):
+        last = i == len(levels) - 1
+        amount = 0
+        for paid in contributions.values():
+            # The last pot also collects folded chips above every contender's level
+            amount += max(paid - previous, 0) if last else max(min(paid, level) - previous, 0)
+        previous = level
+        if amount == 0:
+            continue
+
+        eligible = [pid for pid in strengths if contributions[pid] >= level]
+        best = max(strengths[pid] for pid in eligible)
+        winners = sorted(
+            (pid for pid in eligible if strengths[pid] == best),
+            key=lambda pid: seat.get(pid, len(seat))
+        )
+        share, remainder = divmod(amount, len(winners))
+        for j, pid in enumerate(winners):
+            payouts[pid] += share + (1 if j < remainder else 0)
+
+    return payouts
+
+def best_hands(strengths: Dict[str, int]) -> List[str]:
+    """Get the players holding the best strength (more than one on a tie)"""
+    if not strengths:
+        return []
+    best = max(strengths.values())
+    return [pid for pid, s in strengths.items() if s == best]
+
+# ===== Benchmark =====
+
+def benchmark(hands: int = 1_000_000, seed: Optional[int] = 0) -> float:
+    """Evaluate random 7-card hands and return evaluations per second"""
+    import random
+    import time
+
+    rng = random.Random(seed)
+    deck = list(range(DECK_SIZE))
+    samples = [tuple(rng.sample(deck, 7)) for _ in range(min(hands, 100_000))]
+    rounds, extra = divmod(hands, len(samples))
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for hand in samples:
+            evaluate7(*hand)
+    for hand in samples[:extra]:
+        evaluate7(*hand)
+    elapsed = time.perf_counter() - start
+
+    return hands / elapsed
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Hand evaluator benchmark")
+    parser.add_argument("--hands", type=int, default=2_000_000, help="Number of 7-card hands to evaluate")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    _build_rank_table()
+    print(f"Rank table: {len(_RANK_TABLE)} entries, built in {time.perf_counter() - start:.3f}s")
+
+    rate = benchmark(args.hands)
+    print(f"evaluate7: {rate:,.0f} hands/sec ({1e9 / rate:.0f} ns/hand)")
@@ -0,0 +1,353 @@
+"""
+Hand History - append-only binary log of finished hands, with replay
+Each hand is one length-prefixed, checksummed frame. Frames are encoded and
+written by a background thread in batches, files rotate by size, and readers
+stream frames from memory-mapped files.
+
+    python hand_history.py list hand_history
+    python hand_history.py replay hand_history --table <table_id> --hand 42 --step 3
+"""
+
+from typing import Iterator, List, Optional, Tuple
+import logging
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+import zlib
+
+from cards import Deck, cards_to_str
+from poker_game import ActionType, HandRecord, Player, PokerTable
+
+FORMAT_VERSION = 1
+DEFAULT_MAX_FILE_SIZE = 64 * 1024 * 1024
+DEFAULT_FLUSH_INTERVAL = 0.5  # Seconds between batched writes
+
+# Frame: payload length, CRC32 of the payload, then the payload
+_FRAME = struct.Struct("<II")
+# Payload header: format version, hand number, start time, blinds, dealer seat
+_HEADER = struct.Struct("<BIdIIB")
+_SEAT_CHIPS = struct.Struct("<I")
+_ACTION = struct.Struct("<BBq")
+_PAYOUT = struct.Struct("<BI")
+
+_ACTIONS = list(ActionType)
+_ACTION_CODES = {action: code for code, action in enumerate(_ACTIONS)}
+
+_FILE_PATTERN = re.compile(r"hands-(\d{6})\.log$")
+
+_INT64_MIN, _INT64_MAX = -2 ** 63, 2 ** 63 - 1
+
+logger = logging.getLogger(__name__)
+
+# ===== Encoding =====
+
+def _pack_str(value: str) -> bytes:
+    data = value.encode("utf-8")[:0xFFFF]
+    return struct.pack("<H", len(data)) + data
+
+def _unpack_str(buf, offset: int) -> Tuple[str, int]:
+    (length,) = struct.unpack_from("<H", buf, offset)
+    offset += 2
+    return bytes(buf[offset:offset + length]).decode("utf-8", errors="replace"), offset + length
+
+def encode_record(record: HandRecord) -> bytes:
+    """Encode a hand as one frame"""
+    parts = [
+        _HEADER.pack(
+            FORMAT_VERSION, record.hand_number, record.started_at,
+            record.small_blind, record.big_blind, record.dealer
+        ),
+        _pack_str(record.table_id),
+        bytes((len(record.seats),))
+    ]
+    for player_id, name, chips in record.seats:
+        parts += (_pack_str(player_id), _pack_str(name), _SEAT_CHIPS.pack(chips))
+    parts += (
+        bytes((len(record.cards),)), record.cards,
+        bytes((len(record.board),)), bytes(record.board),
+        struct.pack("<H", len(record.actions))
+    )
+    parts += (
+        _ACTION.pack(seat, _ACTION_CODES[action], min(max(amount, _INT64_MIN), _INT64_MAX))
+        for seat, action, amount in record.actions
+    )
+    parts.append(bytes((len(record.payouts),)))
+    parts += (_PAYOUT.pack(seat, amount) for seat, amount in record.payouts)
+
+    payload = b"".join(parts)
+    return _FRAME.pack(len(payload), zlib.crc32(payload)) + payload
+
+def decode_record(payload) -> HandRecord:
+    """Decode one frame's payload"""
+    version, hand_number, started_at, small_blind, big_blind, dealer = _HEADER.unpack_from(payload, 0)
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported hand history format: {version}")
+    offset = _HEADER.size
+    table_id, offset = _unpack_str(payload, offset)
+
+    seats = []
+    count = payload[offset]
+    offset += 1
+    for _ in range(count):
+        player_id, offset = _unpack_str(payload, offset)
+        name, offset = _unpack_str(payload, offset)
+        (chips,) = _SEAT_CHIPS.unpack_from(payload, offset)
+        offset += _SEAT_CHIPS.size
+        seats.append((player_id, name, chips))
+
+    record = HandRecord(table_id, hand_number, started_at, small_blind, big_blind, dealer, seats)
+    count = payload[offset]
+    record.cards = bytes(payload[offset + 1:offset + 1 + count])
+    offset += 1 + count
+    count = payload[offset]
+    record.board = list(payload[offset + 1:offset + 1 + count])
+    offset += 1 + count
+
+    (count,) = struct.unpack_from("<H", payload, offset)
+    offset += 2
+    for _ in range(count):
+        seat, code, amount = _ACTION.unpack_from(payload, offset)
+        offset += _ACTION.size
+        record.actions.append((seat, _ACTIONS[code], amount))
+
+    count = payload[offset]
+    offset += 1
+    for _ in range(count):
+        record.payouts.append(_PAYOUT.unpack_from(payload, offset))
+        offset += _PAYOUT.size
+    return record
+
+# ===== Writer =====
+
+class HandHistoryWriter:
+    """
+    Appends hands to rotating log files from a background thread
+
+    append() only queues the record under a short lock, so it is safe to
+    call from the event loop; the writer thread encodes and writes
+    everything queued every flush_interval seconds and is the only user of
+    the file.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        max_file_size: int = DEFAULT_MAX_FILE_SIZE,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL
+    ):
+        self.directory = directory
+        self.max_file_size = max_file_size
+        self.flush_interval = flush_interval
+        self.pending: List[HandRecord] = []
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.closed = False
+        self.hands_written = 0
+        self.bytes_written = 0
+
+        os.makedirs(directory, exist_ok=True)
+        # Always start a new file, so a torn frame from a crash stays at the end of the old one
+        self.sequence = max(log_sequences(directory), default=0) + 1
+        self.file = self._open()
+        self.thread = threading.Thread(target=self._run, name="hand-history", daemon=True)
+        self.thread.start()
+
+    def _open(self):
+        return open(os.path.join(self.directory, f"hands-{self.sequence:06d}.log"), "ab")
+
+    def append(self, record: HandRecord):
+        """Queue a finished hand for writing"""
+        with self.lock:
+            self.pending.append(record)
+
+    def _run(self):
+        while not self.closed:
+            self.wake.wait(self.flush_interval)
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Hand history write failed")
+
+    def flush(self):
+        """Write everything queued so far (writer thread only, or after close)"""
+        with self.lock:
+            records, self.pending = self.pending, []
+
+        frames = []
+        for record in records:
+            try:
+                frames.append(encode_record(record))
+            except (struct.error, ValueError, KeyError):
+                # One bad hand must not cost the rest of the batch
+                logger.exception(f"Skipping hand {record.hand_number} of table {record.table_id}")
+        data = b"".join(frames)
+        if not data:
+            return
+        if self.file.tell() + len(data) > self.max_file_size and self.file.tell() > 0:
+            self.file.close()
+            self.sequence += 1
+            self.file = self._open()
+        self.file.write(data)
+        self.file.flush()
+        self.hands_written += len(frames)
+        self.bytes_written += len(data)
+
+    def close(self):
+        """Write what is queued and stop the writer thread"""
+        self.closed = True
+        self.wake.set()
+        self.thread.join()
+        self.flush()
+        self.file.close()
+
+    def stats(self) -> dict:
+        return {
+            "hands_written": self.hands_written,
+            "bytes_written": self.bytes_written,
+            "pending": len(self.pending),
+            "file_sequence": self.sequence
+        }
+
+# ===== Reader =====
+
+def log_sequences(directory: str) -> List[int]:
+    """Sequence numbers of the log files in a directory, oldest first"""
+    if not os.path.isdir(directory):
+        return []
+    return sorted(int(m.group(1)) for m in map(_FILE_PATTERN.match, os.listdir(directory)) if m)
+
+def iter_file(path: str) -> Iterator[HandRecord]:
+    """Stream the hands in one log file; stops at a torn or corrupt frame"""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            view = memoryview(buf)
+            offset = 0
+            try:
+                while offset + _FRAME.size <= len(buf):
+                    length, crc = _FRAME.unpack_from(buf, offset)
+                    start = offset + _FRAME.size
+                    with view[start:start + length] as payload:
+                        if len(payload) < length or zlib.crc32(payload) != crc:
+                            break
+                        record = decode_record(payload)
+                    yield record
+                    offset = start + length
+            finally:
+                view.release()
+
+def iter_hands(directory: str, table_id: Optional[str] = None) -> Iterator[HandRecord]:
+    """Stream every logged hand in order, optionally only one table's"""
+    for sequence in log_sequences(directory):
+        for record in iter_file(os.path.join(directory, f"hands-{sequence:06d}.log")):
+            if table_id is None or record.table_id == table_id:
+                yield record
+
+def find_hand(directory: str, table_id: str, hand_number: int) -> Optional[HandRecord]:
+    """Find one table's hand in the log"""
+    for record in iter_hands(directory, table_id):
+        if record.hand_number == hand_number:
+            return record
+    return None
+
+# ===== Replay =====
+
+class ScriptedDeck(Deck):
+    """A deck that deals a recorded sequence of cards"""
+
+    __slots__ = ()
+
+    def __init__(self, cards: bytes):
+        super().__init__()
+        self.cards = bytearray(cards)
+
+    def shuffle(self, order: bytes):
+        self.position = 0
+
+    def __len__(self) -> int:
+        return len(self.cards) - self.position
+
+class ReplayTable(PokerTable):
+    """A PokerTable that plays back one hand and stops when it ends"""
+
+    __slots__ = ("replayed_hand",)
+
+    def start_new_hand(self):
+        if self.hand_number == self.replayed_hand:
+            return  # The hand is over; leave the final stacks in place
+        super().start_new_hand()
+
+def replay(record: HandRecord, steps: Optional[int] = None) -> PokerTable:
+    """
+    Rebuild the table of a logged hand after its first `steps` actions
+    (all of them by default)
+
+    After the last action the table is left in SHOWDOWN with the payouts applied.
+    """
+    table = ReplayTable(record.table_id, max(len(record.seats), 2), record.small_blind)
+    table.big_blind = record.big_blind
+    table.replayed_hand = record.hand_number
+    for seat, (player_id, name, chips) in enumerate(record.seats):
+        player = Player(player_id, name)
+        player.chips = chips
+        table.players[player_id] = player
+        table.player_order.append(player_id)
+        table.seats.sit(seat)
+
+    table.deck = ScriptedDeck(record.cards)
+    table.dealer_position = record.dealer
+    table.hand_number = record.hand_number - 1
+    table.start_new_hand()
+
+    for seat, action, amount in record.actions[:steps]:
+        player_id = record.seats[seat][0]
+        if not table.perform_action(player_id, action, amount):
+            raise ValueError(f"Replay diverged at {action.value} by seat {seat}")
+    return table
+
+def describe(record: HandRecord) -> str:
+    """One-line summary of a hand"""
+    started = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(record.started_at))
+    winners = ", ".join(f"{record.seats[seat][1]} +{amount}" for seat, amount in record.payouts)
+    return (
+        f"{record.table_id[:8]} #{record.hand_number:<6} {started}  "
+        f"{len(record.seats)} seats  {len(record.actions)} actions  "
+        f"board {' '.join(cards_to_str(record.board)) or '-'}  {winners}"
+    )
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Hand history log tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+    list_parser = commands.add_parser("list", help="Print one line per logged hand")
+    list_parser.add_argument("directory")
+    list_parser.add_argument("--table", help="Only this table's hands")
+    replay_parser = commands.add_parser("replay", help="Rebuild a table at a point in a hand")
+    replay_parser.add_argument("directory")
+    replay_parser.add_argument("--table", required=True, help="Table ID")
+    replay_parser.add_argument("--hand", type=int, required=True, help="Hand number")
+    replay_parser.add_argument("--step", type=int, default=None, help="Actions to apply (default: all)")
+    args = parser.parse_args()
+
+    if args.command == "list":
+        for record in iter_hands(args.directory, args.table):
+            print(describe(record))
+    else:
+        record = find_hand(args.directory, args.table, args.hand)
+        if record is None:
+            raise SystemExit("Hand not found")
+        print(describe(record))
+        for i, (seat, action, amount) in enumerate(record.actions[:args.step], 1):
+            print(f"  {i:>3}. {record.seats[seat][1]} {action.value} {amount or ''}")
+        table = replay(record, args.step)
+        state = table.to_dict()
+        # Show every hole card; this is an audit tool
+        for player, entry in zip((table.players[pid] for pid in table.player_order), state["players"]):
+            entry["cards"] = cards_to_str(player.cards)
+        print(json.dumps(state, indent=2, ensure_ascii=False, default=str))
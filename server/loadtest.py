@@ -0,0 +1,335 @@
+"""
+Load Test - throughput and latency benchmark for the server
+Fills N tables with M scripted players that act over REST or WebSocket and
+measures actions/sec, action-to-broadcast latency, memory per table and
+event loop lag. Results are appended as JSON lines for later comparison.
+
+    python loadtest.py --tables 20 --players 6 --duration 30 --output results.jsonl
+    python loadtest.py --url http://localhost:8000 --transport rest --compare results.jsonl
+"""
+
+from typing import Any, Dict, List, Optional
+import asyncio
+import itertools
+import json
+import logging
+import os
+import socket
+import subprocess
+import threading
+import time
+import tracemalloc
+
+try:
+    import aiohttp
+except ImportError:  # Only the load test needs an HTTP client
+    aiohttp = None
+
+# Metrics compared by --compare, and whether higher is better
+COMPARED_METRICS = {
+    "actions_per_sec": True,
+    "latency_p50_ms": False,
+    "latency_p95_ms": False,
+    "latency_p99_ms": False,
+    "loop_lag_p99_ms": False,
+    "memory_per_table_kb": False
+}
+
+LAG_INTERVAL = 0.05  # Seconds between event loop lag probes
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of unsorted samples (0 if empty)"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+# ===== In-Process Server =====
+
+class InProcessServer:
+    """Runs the FastAPI app with uvicorn on its own event loop in a background thread"""
+
+    def __init__(self):
+        import uvicorn
+        import poker_server_full
+
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            self.port = sock.getsockname()[1]
+        self.app_module = poker_server_full
+        self.server = uvicorn.Server(uvicorn.Config(
+            poker_server_full.app, host="127.0.0.1", port=self.port, log_level="warning"
+        ))
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.thread = threading.Thread(target=self._serve, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def _serve(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_until_complete(self.server.serve())
+
+    def start(self):
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.01)
+
+    def stop(self):
+        self.server.should_exit = True
+        self.thread.join(timeout=10)
+
+async def monitor_loop_lag(samples: List[float]):
+    """Record how late each LAG_INTERVAL sleep wakes up, in ms"""
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(LAG_INTERVAL)
+        samples.append((time.perf_counter() - start - LAG_INTERVAL) * 1000)
+
+def traced_server_memory() -> int:
+    """Bytes traced by tracemalloc outside the load test's own client code"""
+    snapshot = tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, __file__),
+        tracemalloc.Filter(False, "*/aiohttp/*")
+    ))
+    return sum(stat.size for stat in snapshot.statistics("filename"))
+
+# ===== Scripted Players =====
+
+class LoadStats:
+    """Counters shared by every player in a run"""
+
+    def __init__(self):
+        self.recording = False  # False during warmup
+        self.actions = 0
+        self.errors = 0
+        self.latency_ms: List[float] = []  # Action sent -> its broadcast received
+
+class LoadPlayer:
+    """
+    A seat that calls whenever a table update says it is its turn
+
+    A call with nothing to call is a check, so every action is valid and the
+    player only has to follow current_player_id through the deltas.
+    """
+
+    def __init__(self, session: "aiohttp.ClientSession", url: str, transport: str, stats: LoadStats):
+        self.session = session
+        self.url = url
+        self.transport = transport
+        self.stats = stats
+        self.table_id = ""
+        self.player_id = ""
+        self.ws: Optional["aiohttp.ClientWebSocketResponse"] = None
+        self.version: Optional[int] = None
+        self.current_player_id: Optional[str] = None
+        self.acted_version = -1
+        self.sent_at: Optional[float] = None
+        self.request_ids = itertools.count()
+
+    async def join(self, table_id: str, name: str):
+        async with self.session.post(
+            f"{self.url}/api/tables/{table_id}/join", params={"player_name": name, "is_bot": "true"}
+        ) as response:
+            response.raise_for_status()
+            self.player_id = (await response.json())["player_id"]
+        self.table_id = table_id
+
+    async def run(self):
+        ws_url = f"{self.url.replace('http', 'ws', 1)}/ws/{self.table_id}/{self.player_id}?updates=delta"
+        async with self.session.ws_connect(ws_url, max_msg_size=0) as ws:
+            self.ws = ws
+            async for message in ws:
+                if message.type != aiohttp.WSMsgType.TEXT:
+                    break
+                received = time.perf_counter()
+                data = json.loads(message.data)
+                self.record_broadcast(data, received)
+
+                if data.get("type") == "snapshot":
+                    self.version = data["version"]
+                    self.current_player_id = data["table_state"]["current_player_id"]
+                elif "delta" in data:
+                    if data["base_version"] != self.version:
+                        if self.version is not None:
+                            # Missed an update; resync
+                            self.version = None
+                            await ws.send_json({"type": "snapshot"})
+                        continue
+                    self.version = data["version"]
+                    self.current_player_id = data["delta"].get("current_player_id", self.current_player_id)
+                else:
+                    continue
+                await self.maybe_act()
+
+    def record_broadcast(self, data: Dict[str, Any], received: float):
+        """Match the broadcast of our own last action to the time it was sent"""
+        if self.sent_at is None:
+            return
+        events = data.get("events", [data]) if data.get("type") == "batch" else [data]
+        if any(e.get("type") == "action_performed" and e.get("player_id") == self.player_id for e in events):
+            if self.stats.recording:
+                self.stats.latency_ms.append((received - self.sent_at) * 1000)
+            self.sent_at = None
+
+    async def maybe_act(self):
+        if self.current_player_id != self.player_id or self.version <= self.acted_version:
+            return
+        self.acted_version = self.version
+        self.sent_at = time.perf_counter()
+        if self.stats.recording:
+            self.stats.actions += 1
+
+        if self.transport == "ws":
+            await self.ws.send_json({"type": "action", "request_id": str(next(self.request_ids)), "action": "call"})
+            return
+        async with self.session.post(
+            f"{self.url}/api/tables/{self.table_id}/action",
+            json={"player_id": self.player_id, "action": "call"}
+        ) as response:
+            if response.status != 200:
+                self.stats.errors += 1
+
+# ===== Runner =====
+
+async def run_load(
+    url: str,
+    tables: int,
+    players: int,
+    duration: float,
+    warmup: float,
+    transport: str,
+    server: Optional[InProcessServer] = None
+) -> Dict[str, Any]:
+    """Seat tables x players, play for warmup + duration seconds and summarize"""
+    stats = LoadStats()
+    lag_samples: List[float] = []
+    lag_future = None
+    if server is not None:
+        lag_future = asyncio.run_coroutine_threadsafe(monitor_loop_lag(lag_samples), server.loop)
+        tracemalloc.start()
+        baseline_memory = traced_server_memory()
+
+    connector = aiohttp.TCPConnector(limit=0)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        seated: List[LoadPlayer] = []
+        for t in range(tables):
+            async with session.post(f"{url}/api/tables", params={"max_players": players}) as response:
+                response.raise_for_status()
+                table_id = (await response.json())["table_id"]
+            for p in range(players):
+                player = LoadPlayer(session, url, transport, stats)
+                await player.join(table_id, f"load{t}-{p}")
+                seated.append(player)
+
+        memory_per_table = None
+        if server is not None:
+            memory_per_table = (traced_server_memory() - baseline_memory) / tables
+            tracemalloc.stop()
+
+        tasks = [asyncio.create_task(player.run()) for player in seated]
+        await asyncio.sleep(warmup)
+        lag_samples.clear()
+        stats.recording = True
+        started = time.perf_counter()
+        await asyncio.sleep(duration)
+        stats.recording = False
+        elapsed = time.perf_counter() - started
+
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    if lag_future is not None:
+        lag_future.cancel()
+
+    return {
+        "tables": tables,
+        "players_per_table": players,
+        "transport": transport,
+        "in_process": server is not None,
+        "duration": round(elapsed, 3),
+        "actions": stats.actions,
+        "errors": stats.errors,
+        "actions_per_sec": round(stats.actions / elapsed, 1),
+        "latency_p50_ms": round(percentile(stats.latency_ms, 50), 3),
+        "latency_p95_ms": round(percentile(stats.latency_ms, 95), 3),
+        "latency_p99_ms": round(percentile(stats.latency_ms, 99), 3),
+        "loop_lag_p99_ms": round(percentile(lag_samples, 99), 3) if server is not None else None,
+        "loop_lag_max_ms": round(max(lag_samples, default=0.0), 3) if server is not None else None,
+        "memory_per_table_kb": round(memory_per_table / 1024, 1) if memory_per_table is not None else None
+    }
+
+def git_revision() -> Optional[str]:
+    """Current commit of the checkout, recorded with each result"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True, cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(result: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    """Describe each compared metric's change against a baseline result"""
+    lines = []
+    for key, higher_is_better in COMPARED_METRICS.items():
+        old, new = baseline.get(key), result.get(key)
+        if not old or new is None:
+            continue
+        change = (new - old) / old * 100
+        better = change > 0 if higher_is_better else change < 0
+        lines.append(f"    {key:<22} {old:>12,.3f} -> {new:>12,.3f}  {change:+7.1f}%  {'better' if better else 'worse'}")
+    return lines
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Server load test and latency benchmark")
+    parser.add_argument("--url", help="Server to test (default: start the app in this process)")
+    parser.add_argument("--tables", type=int, default=10, help="Number of tables")
+    parser.add_argument("--players", type=int, default=6, help="Players per table")
+    parser.add_argument("--duration", type=float, default=20.0, help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Unmeasured seconds before the measurement")
+    parser.add_argument("--transport", choices=("ws", "rest"), default="ws", help="How players send actions")
+    parser.add_argument("--output", help="Append the result as a JSON line to this file")
+    parser.add_argument("--compare", help="Compare against the last result in this JSON lines file")
+    args = parser.parse_args()
+
+    if aiohttp is None:
+        raise SystemExit("The load test needs aiohttp: pip install aiohttp")
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            lines = [line for line in f if line.strip()]
+        baseline = json.loads(lines[-1]) if lines else None
+
+    server = None
+    url = args.url
+    if url is None:
+        logging.getLogger("poker_server_full").setLevel(logging.WARNING)
+        logging.getLogger("poker_game").setLevel(logging.WARNING)
+        logging.getLogger("connections").setLevel(logging.WARNING)
+        server = InProcessServer()
+        server.start()
+        url = server.url
+
+    try:
+        result = asyncio.run(run_load(url, args.tables, args.players, args.duration, args.warmup, args.transport, server))
+    finally:
+        if server is not None:
+            server.stop()
+
+    result = {"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "revision": git_revision(), **result}
+    print(json.dumps(result, indent=2))
+
+    if baseline is not None:
+        print(f"Compared with {baseline.get('revision')} ({baseline.get('timestamp')}):")
+        print("\n".join(compare(result, baseline)))
+
+    if args.output:
+        with open(args.output, "a") as f:
+            f.write(json.dumps(result) + "\n")
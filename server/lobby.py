@@ -0,0 +1,141 @@
+"""
+Lobby - index of table summaries by blind level and open seats
+Listing, filtering and seat finding are bisections over sorted keys instead of
+scans of every table, and changed summaries are collected for incremental
+lobby updates.
+"""
+
+from bisect import bisect_left, bisect_right, insort
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from poker_game import PokerTable
+
+Key = Tuple[int, int, str]
+
+MAX_LOBBY_PAGE = 500  # Largest `limit` of one lobby page, on a shard and on the router
+
+def table_summary(table: PokerTable) -> Dict[str, Any]:
+    """The lobby fields of a table"""
+    return {
+        "table_id": table.id,
+        "players": len(table.players),
+        "max_players": table.max_players,
+        "phase": table.phase,
+        "small_blind": table.small_blind
+    }
+
+def open_seats(summary: Dict[str, Any]) -> int:
+    return summary["max_players"] - summary["players"]
+
+def summary_key(summary: Dict[str, Any], by_seats: bool = False) -> Key:
+    """A summary's key in Lobby.by_blind, or in Lobby.by_seats"""
+    seats, blind = open_seats(summary), summary["small_blind"]
+    return (seats, blind, summary["table_id"]) if by_seats else (blind, seats, summary["table_id"])
+
+def encode_cursor(key: Key) -> str:
+    return f"{key[0]}:{key[1]}:{key[2]}"
+
+def decode_cursor(cursor: str) -> Key:
+    """Parse a cursor from encode_cursor(); raises ValueError"""
+    first, second, table_id = cursor.split(":", 2)
+    return int(first), int(second), table_id
+
+class Lobby:
+    """
+    Table summaries kept in two sorted key lists
+
+    by_blind holds (small_blind, open_seats, table_id) and by_seats holds
+    (open_seats, small_blind, table_id), so "tables at this blind", "tables
+    with at least N open seats" and "the fullest table that still has room"
+    are each a bisection.
+    """
+
+    __slots__ = ("entries", "by_blind", "by_seats", "changed", "removed")
+
+    def __init__(self):
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.by_blind: List[Key] = []
+        self.by_seats: List[Key] = []
+        self.changed: Set[str] = set()  # Updated since the last take_changes()
+        self.removed: Set[str] = set()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _unindex(self, summary: Dict[str, Any]):
+        del self.by_blind[bisect_left(self.by_blind, summary_key(summary))]
+        del self.by_seats[bisect_left(self.by_seats, summary_key(summary, by_seats=True))]
+
+    def update(self, summary: Dict[str, Any]) -> bool:
+        """Add or refresh a table's summary; False if nothing changed"""
+        table_id = summary["table_id"]
+        previous = self.entries.get(table_id)
+        if previous == summary:
+            return False
+        if previous is not None:
+            self._unindex(previous)
+        self.entries[table_id] = summary
+        insort(self.by_blind, summary_key(summary))
+        insort(self.by_seats, summary_key(summary, by_seats=True))
+        self.changed.add(table_id)
+        self.removed.discard(table_id)
+        return True
+
+    def remove(self, table_id: str):
+        """Drop a table from the lobby"""
+        summary = self.entries.pop(table_id, None)
+        if summary is None:
+            return
+        self._unindex(summary)
+        self.changed.discard(table_id)
+        self.removed.add(table_id)
+
+    def query(
+        self,
+        small_blind: Optional[int] = None,
+        min_seats: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        One page of summaries and the cursor of the next page (None on the last)
+
+        Ordered by blind then open seats when small_blind is given or no
+        filter is set, otherwise by open seats then blind. Raises ValueError
+        for a malformed cursor.
+        """
+        if small_blind is not None:
+            keys, low, high = self.by_blind, (small_blind, min_seats), (small_blind + 1,)
+        elif min_seats:
+            keys, low, high = self.by_seats, (min_seats,), None
+        else:
+            keys, low, high = self.by_blind, (), None
+
+        start = bisect_left(keys, low)
+        if cursor:
+            # Keyset pagination: resume after the last key of the previous page
+            start = max(start, bisect_right(keys, decode_cursor(cursor)))
+        end = len(keys) if high is None else bisect_left(keys, high)
+        page = keys[start:min(end, start + limit)]
+
+        next_cursor = encode_cursor(page[-1]) if page and start + limit < end else None
+        return [self.entries[key[2]] for key in page], next_cursor
+
+    def find_seat(self, small_blind: Optional[int] = None, seats: int = 1) -> Optional[str]:
+        """The table with the fewest open seats that still has `seats` free, so games fill up"""
+        if small_blind is not None:
+            keys, low = self.by_blind, (small_blind, seats)
+        else:
+            keys, low = self.by_seats, (seats,)
+        i = bisect_left(keys, low)
+        if i == len(keys) or (small_blind is not None and keys[i][0] != small_blind):
+            return None
+        return keys[i][2]
+
+    def take_changes(self) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """Summaries updated and table IDs removed since the last call"""
+        updated = [self.entries[table_id] for table_id in self.changed]
+        removed = list(self.removed)
+        self.changed.clear()
+        self.removed.clear()
+        return updated, removed
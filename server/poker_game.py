@@ -0,0 +1,486 @@
+"""
+Poker Game - Texas Hold'em table and player state
+Pure game logic with no web dependencies, shared by the server and the simulator
+"""
+
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from enum import Enum
+from datetime import datetime
+import logging
+import time
+
+from cards import Deck, cards_to_str
+from hand_evaluator import evaluate, hand_name, award_pots
+from seat_ring import SeatRing
+from shuffler import secure_shuffler
+
+logger = logging.getLogger(__name__)
+
+# ===== Data Models =====
+
+class GamePhase(str, Enum):
+    WAITING = "waiting"
+    PRE_FLOP = "pre_flop"
+    FLOP = "flop"
+    TURN = "turn"
+    RIVER = "river"
+    SHOWDOWN = "showdown"
+
+class ActionType(str, Enum):
+    FOLD = "fold"
+    CHECK = "check"
+    CALL = "call"
+    BET = "bet"
+    RAISE = "raise"
+    ALL_IN = "all_in"
+
+class Player:
+    __slots__ = (
+        "id", "name", "chips", "current_bet", "total_bet", "cards",
+        "folded", "is_bot", "last_action_time", "all_in", "time_bank", "timed_out"
+    )
+
+    def __init__(self, player_id: str, name: str, is_bot: bool = False):
+        self.id = player_id
+        self.name = name
+        self.chips = 1000  # Starting chips
+        self.current_bet = 0
+        self.total_bet = 0  # Chips put in the pot this hand, used for side pots
+        self.cards: List[int] = []
+        self.folded = False
+        self.is_bot = is_bot
+        self.last_action_time = datetime.now()  # Last action or state read, for the seat reaper
+        self.all_in = False
+        self.time_bank = 0.0  # Extra seconds to act beyond the turn timeout
+        self.timed_out = False  # Auto-acted on the last turn; gets a short clock until acting again
+
+    def to_dict(self, show_cards: bool = False):
+        return {
+            "id": self.id,
+            "name": self.name,
+            "chips": self.chips,
+            "current_bet": self.current_bet,
+            "cards": cards_to_str(self.cards) if show_cards else ["hidden", "hidden"] if len(self.cards) == 2 else [],
+            "folded": self.folded,
+            "is_bot": self.is_bot,
+            "all_in": self.all_in,
+            "time_bank": round(self.time_bank, 1)
+        }
+
+class HandRecord:
+    """Everything needed to replay one hand: seating, cards dealt, actions and payouts"""
+
+    __slots__ = (
+        "table_id", "hand_number", "started_at", "small_blind", "big_blind",
+        "dealer", "seats", "cards", "board", "actions", "payouts"
+    )
+
+    def __init__(
+        self,
+        table_id: str,
+        hand_number: int,
+        started_at: float,
+        small_blind: int,
+        big_blind: int,
+        dealer: int,
+        seats: List[Tuple[str, str, int]]
+    ):
+        self.table_id = table_id
+        self.hand_number = hand_number
+        self.started_at = started_at
+        self.small_blind = small_blind
+        self.big_blind = big_blind
+        self.dealer = dealer
+        self.seats = seats  # (player_id, name, chips before the blinds) for every seat
+        self.cards = b""  # Every card dealt, in deal order
+        self.board: List[int] = []
+        self.actions: List[Tuple[int, ActionType, int]] = []  # (seat, action, amount as requested)
+        self.payouts: List[Tuple[int, int]] = []  # (seat, chips won)
+
+class PokerTable:
+    __slots__ = (
+        "id", "players", "player_order", "max_players", "small_blind", "big_blind",
+        "pot", "current_bet", "community_cards", "phase", "dealer_position",
+        "seats", "created_at", "deck", "last_action", "hand_number",
+        "revision", "history", "record", "leaving", "actions_taken", "action_deadline",
+        "shuffler"
+    )
+
+    def __init__(self, table_id: str, max_players: int = 6, small_blind: int = 5):
+        self.id = table_id
+        self.players: Dict[str, Player] = {}
+        self.player_order: List[str] = []
+        self.max_players = max_players
+        self.small_blind = small_blind
+        self.big_blind = small_blind * 2
+        self.pot = 0
+        self.current_bet = 0
+        self.community_cards: List[int] = []
+        self.phase = GamePhase.WAITING
+        self.dealer_position = 0  # Seat index, the same as the index in player_order
+        self.seats = SeatRing(max_players)  # Turn order and who still owes an action
+        self.created_at = datetime.now()
+        self.deck = Deck()
+        self.last_action = None
+        self.hand_number = 0  # Hands started at this table
+        self.revision = 0  # Bumped on every mutation, keys caches and REST ETags (not the WebSocket version)
+        self.history: Optional[Callable[[HandRecord], None]] = None  # Gets each finished hand
+        self.record: Optional[HandRecord] = None  # The current hand, while history is set
+        self.leaving: Set[str] = set()  # Players removed when the current hand ends
+        self.actions_taken = 0  # Successful actions, so (hand_number, actions_taken) identifies a turn
+        self.action_deadline: Optional[float] = None  # Epoch seconds the current player must act by
+        self.shuffler = secure_shuffler  # Source of deck orders; seeded ones make games reproducible
+
+    def add_player(self, player: Player) -> bool:
+        if len(self.players) >= self.max_players:
+            return False
+        self.seats.sit(len(self.player_order))
+        self.players[player.id] = player
+        self.player_order.append(player.id)
+        self.revision += 1
+
+        # Players joining mid-hand sit out until the next deal
+        if self.phase != GamePhase.WAITING:
+            player.folded = True
+
+        # Start game if we have at least 2 players
+        if len(self.players) >= 2 and self.phase == GamePhase.WAITING:
+            self.start_new_hand()
+
+        return True
+
+    def remove_player(self, player_id: str) -> bool:
+        """Unseat a player now if no hand is running, otherwise when the current hand ends"""
+        if player_id not in self.players or player_id in self.leaving:
+            return False
+        self.leaving.add(player_id)
+        self.revision += 1
+        if self.phase == GamePhase.WAITING:
+            self.drop_leaving_players()
+        return True
+
+    def drop_leaving_players(self):
+        """Remove the leaving players between hands; the other seats move up and the ring is rebuilt"""
+        order = self.player_order
+        keep = [seat for seat, pid in enumerate(order) if pid not in self.leaving]
+        # The button stays with the first remaining seat at or after it
+        self.dealer_position = next((i for i, seat in enumerate(keep) if seat >= self.dealer_position), 0)
+        for pid in self.leaving:
+            del self.players[pid]
+        self.player_order = [order[seat] for seat in keep]
+        self.leaving.clear()
+
+        self.seats = SeatRing(self.max_players)
+        for seat in range(len(self.player_order)):
+            self.seats.sit(seat)
+
+    def create_deck(self):
+        """Load a freshly shuffled order into the table's deck"""
+        self.deck.shuffle(self.shuffler.take())
+
+    def deal_card(self) -> int:
+        """Deal one card from the deck"""
+        if not self.deck:
+            self.create_deck()
+        return self.deck.deal()
+
+    def start_new_hand(self):
+        """Start a new hand with every player who has chips, or wait for more players"""
+        if self.leaving:
+            self.drop_leaving_players()  # A table left with fewer than 2 players waits below
+        elif len(self.players) < 2:
+            return
+
+        # Reset table
+        self.revision += 1
+        self.pot = 0
+        self.current_bet = 0
+        self.community_cards = []
+        self.record = None
+
+        # Reset players
+        for player in self.players.values():
+            player.current_bet = 0
+            player.total_bet = 0
+            player.folded = False
+            player.cards = []
+            player.all_in = False
+
+        ring = self.seats
+        dealt = [seat for seat, pid in enumerate(self.player_order) if self.players[pid].chips > 0]
+        if len(dealt) < 2:
+            self.phase = GamePhase.WAITING
+            ring.clear()
+            return
+
+        self.hand_number += 1
+        self.phase = GamePhase.PRE_FLOP
+        ring.deal_in(dealt)
+        for pid in self.player_order:
+            if not self.players[pid].chips:
+                self.players[pid].folded = True
+
+        # The button moves to the next seat that was dealt in
+        self.dealer_position = ring.first_active_after(self.dealer_position - 1)
+
+        if self.history is not None:
+            self.record = HandRecord(
+                self.id, self.hand_number, time.time(), self.small_blind, self.big_blind,
+                self.dealer_position,
+                [(pid, self.players[pid].name, self.players[pid].chips) for pid in self.player_order]
+            )
+
+        # Create and shuffle deck
+        self.create_deck()
+
+        # Deal cards to players
+        for _ in range(2):
+            for seat in dealt:
+                self.players[self.player_order[seat]].cards.append(self.deal_card())
+
+        # Post blinds
+        sb_seat = ring.next[self.dealer_position]
+        bb_seat = ring.next[sb_seat]
+        self.post_blind(sb_seat, self.small_blind)
+        self.post_blind(bb_seat, self.big_blind)
+        self.current_bet = self.big_blind
+
+        # First to act is the player after the big blind
+        self.start_betting_round(bb_seat)
+        if not ring.owes:
+            self.advance_to_next_player()
+
+    def post_blind(self, seat: int, blind: int):
+        """Post a forced bet, all-in if the player is short"""
+        player = self.players[self.player_order[seat]]
+        amount = min(blind, player.chips)
+        player.chips -= amount
+        player.current_bet = amount
+        player.total_bet = amount
+        self.pot += amount
+        if player.chips == 0:
+            player.all_in = True
+            self.seats.all_in(seat)
+
+    def start_betting_round(self, after_seat: int):
+        """Open a betting round with the first seat after `after_seat` to act"""
+        ring = self.seats
+        ring.start_round(after_seat)
+
+        # With nobody left to bet against, only a player short of the bet acts
+        if ring.can_act == 1:
+            player = self.players[self.player_order[ring.current]]
+            if player.current_bet >= self.current_bet:
+                ring.end_round()
+
+    def get_current_player_id(self) -> Optional[str]:
+        """Get the current player's ID"""
+        seat = self.seats.current
+        if seat < 0 or self.phase == GamePhase.WAITING:
+            return None
+        return self.player_order[seat]
+
+    def advance_to_next_player(self):
+        """Pass the turn to the next player who owes an action, or finish the round"""
+        ring = self.seats
+        if ring.in_hand == 1:
+            # Everyone else folded
+            self.phase = GamePhase.SHOWDOWN
+            self.handle_showdown()
+            return
+
+        if ring.owes:
+            ring.advance()
+            return
+
+        # Deal the next street; the board runs out while nobody can bet
+        while True:
+            street = self.phase
+            self.advance_phase()
+            if street == GamePhase.RIVER or ring.owes:
+                return
+
+    def is_betting_round_complete(self) -> bool:
+        """Check if nobody owes an action in the current betting round"""
+        return not self.seats.owes
+
+    def advance_phase(self):
+        """Advance to the next game phase"""
+        # Reset bets for next round
+        for player in self.players.values():
+            player.current_bet = 0
+        self.current_bet = 0
+
+        if self.phase == GamePhase.PRE_FLOP:
+            # Deal flop (3 cards)
+            self.community_cards = [self.deal_card() for _ in range(3)]
+            self.phase = GamePhase.FLOP
+        elif self.phase == GamePhase.FLOP:
+            # Deal turn (1 card)
+            self.community_cards.append(self.deal_card())
+            self.phase = GamePhase.TURN
+        elif self.phase == GamePhase.TURN:
+            # Deal river (1 card)
+            self.community_cards.append(self.deal_card())
+            self.phase = GamePhase.RIVER
+        elif self.phase == GamePhase.RIVER:
+            # Go to showdown
+            self.phase = GamePhase.SHOWDOWN
+            self.handle_showdown()
+            return
+
+        # Post-flop action starts left of the dealer
+        self.start_betting_round(self.dealer_position)
+
+    def handle_showdown(self):
+        """Handle showdown - simplified version"""
+        active_players = [p for p in self.players.values() if not p.folded]
+
+        if len(active_players) == 1:
+            # Only one player left - they win
+            winner = active_players[0]
+            winner.chips += self.pot
+            payouts = {winner.id: self.pot}
+            logger.info(f"Player {winner.name} wins {self.pot} chips (others folded)")
+        else:
+            strengths = {
+                p.id: evaluate(p.cards + self.community_cards)
+                for p in active_players
+            }
+            contributions = {pid: p.total_bet for pid, p in self.players.items()}
+
+            # Odd chips go to the first winners left of the dealer
+            start = (self.dealer_position + 1) % len(self.player_order)
+            order = self.player_order[start:] + self.player_order[:start]
+
+            payouts = award_pots(contributions, strengths, order)
+            for pid, amount in payouts.items():
+                if amount > 0:
+                    winner = self.players[pid]
+                    winner.chips += amount
+                    logger.info(
+                        f"Player {winner.name} wins {amount} chips with "
+                        f"{hand_name(strengths[pid])} (showdown)"
+                    )
+
+        if self.record is not None:
+            self.finish_record(payouts)
+
+        # Start new hand after a delay
+        self.dealer_position = (self.dealer_position + 1) % len(self.player_order)
+        self.start_new_hand()
+
+    def finish_record(self, payouts: Dict[str, int]):
+        """Complete the current hand's record and hand it to the history callback"""
+        record = self.record
+        self.record = None
+        record.cards = bytes(self.deck.cards[:self.deck.position])
+        record.board = list(self.community_cards)
+        record.payouts = [
+            (self.player_order.index(pid), amount) for pid, amount in payouts.items() if amount > 0
+        ]
+        self.history(record)
+
+    def perform_action(self, player_id: str, action: ActionType, amount: int = 0) -> bool:
+        """Perform a player action"""
+        if player_id != self.get_current_player_id():
+            return False
+
+        player = self.players[player_id]
+        seat = self.seats.current
+        previous_bet = self.current_bet
+
+        if action == ActionType.FOLD:
+            player.folded = True
+
+        elif action == ActionType.CHECK:
+            if player.current_bet < self.current_bet:
+                return False  # Cannot check, must call or fold
+
+        elif action == ActionType.CALL:
+            call_amount = min(self.current_bet - player.current_bet, player.chips)
+            player.chips -= call_amount
+            player.current_bet += call_amount
+            player.total_bet += call_amount
+            self.pot += call_amount
+            if player.chips == 0:
+                player.all_in = True
+
+        elif action == ActionType.BET:
+            if self.current_bet > 0:
+                return False  # Cannot bet, must raise
+            bet_amount = min(amount, player.chips)
+            player.chips -= bet_amount
+            player.current_bet += bet_amount
+            player.total_bet += bet_amount
+            self.pot += bet_amount
+            self.current_bet = player.current_bet
+            if player.chips == 0:
+                player.all_in = True
+
+        elif action == ActionType.RAISE:
+            total_amount = min(amount, player.chips + player.current_bet)
+            if total_amount <= self.current_bet and total_amount < player.chips + player.current_bet:
+                return False  # Must raise above the current bet unless going all-in
+            actual_raise = total_amount - player.current_bet
+            player.chips -= actual_raise
+            player.current_bet = total_amount
+            player.total_bet += actual_raise
+            self.pot += actual_raise
+            self.current_bet = max(self.current_bet, player.current_bet)
+            if player.chips == 0:
+                player.all_in = True
+
+        elif action == ActionType.ALL_IN:
+            all_in_amount = player.chips
+            player.chips = 0
+            player.current_bet += all_in_amount
+            player.total_bet += all_in_amount
+            self.pot += all_in_amount
+            self.current_bet = max(self.current_bet, player.current_bet)
+            player.all_in = True
+
+        # Rejected actions return above without touching the table
+        self.revision += 1
+        self.last_action = {
+            "player_id": player_id,
+            "player_name": player.name,
+            "action": action,
+            "amount": amount
+        }
+        if self.record is not None:
+            self.record.actions.append((seat, action, amount))
+        self.actions_taken += 1
+
+        ring = self.seats
+        if player.folded:
+            ring.fold(seat)
+        elif player.all_in:
+            ring.all_in(seat)
+        else:
+            ring.acted(seat)
+        if self.current_bet > previous_bet:
+            ring.reopen(seat)
+
+        self.advance_to_next_player()
+        return True
+
+    def to_dict(self, viewing_player_id: Optional[str] = None):
+        """Convert table to dictionary"""
+        return {
+            "table_id": self.id,
+            "pot": self.pot,
+            "current_bet": self.current_bet,
+            "community_cards": cards_to_str(self.community_cards),
+            "phase": self.phase,
+            "hand_number": self.hand_number,
+            "small_blind": self.small_blind,
+            "big_blind": self.big_blind,
+            "current_player_id": self.get_current_player_id(),
+            "action_deadline": self.action_deadline,
+            "players": [
+                self.players[pid].to_dict(show_cards=(pid == viewing_player_id))
+                for pid in self.player_order
+            ],
+            "last_action": self.last_action
+        }
@@ -3,17 +3,37 @@ Poker Game Server - FastAPI implementation
 Texas Hold'em Poker with WebSocket support
 """
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Query
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Query, Request
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse, JSONResponse
-from pydantic import BaseModel
-from typing import Dict, List, Optional
-from enum import Enum
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse, Response
+from pydantic import BaseModel, ValidationError
+from typing import Dict, List, Optional, Set, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
 import uuid
-import random
 import asyncio
-from datetime import datetime
+import functools
+import json
+import os
 import logging
+import threading
+import time
+
+from poker_game import GamePhase, ActionType, Player, PokerTable
+from table_sync import TableSync
+from table_actor import TableActor
+from hand_history import HandHistoryWriter
+from table_store import TableStore
+from lobby import MAX_LOBBY_PAGE, Lobby, table_summary
+from reaper import Reaper
+from sharding import HashRing
+from metrics import LatencyMiddleware, Registry
+from profiler import SamplingProfiler
+from shuffler import Shuffler
+from turn_timer import TurnTimers
+from connections import Connection, ConnectionManager, SlowConsumerPolicy
+from codec import Encoding, Frame, Frames, decode_request, encode_message, pack_message
+from equity import estimate_equity, DEFAULT_ITERATIONS, DEFAULT_EXACT_LIMIT
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -21,320 +41,442 @@ logger = logging.getLogger(__name__)
 
 app = FastAPI(title="Poker Game Server")
 
-# ===== Data Models =====
-
-class GamePhase(str, Enum):
-    WAITING = "waiting"
-    PRE_FLOP = "pre_flop"
-    FLOP = "flop"
-    TURN = "turn"
-    RIVER = "river"
-    SHOWDOWN = "showdown"
-
-class ActionType(str, Enum):
-    FOLD = "fold"
-    CHECK = "check"
-    CALL = "call"
-    BET = "bet"
-    RAISE = "raise"
-    ALL_IN = "all_in"
-
-class Player:
-    def __init__(self, player_id: str, name: str, is_bot: bool = False):
-        self.id = player_id
-        self.name = name
-        self.chips = 1000  # Starting chips
-        self.current_bet = 0
-        self.cards = []
-        self.folded = False
-        self.is_bot = is_bot
-        self.last_action_time = datetime.now()
-        self.all_in = False
-
-    def to_dict(self, show_cards: bool = False):
-        return {
-            "id": self.id,
-            "name": self.name,
-            "chips": self.chips,
-            "current_bet": self.current_bet,
-            "cards": self.cards if show_cards else ["hidden", "hidden"] if len(self.cards) == 2 else [],
-            "folded": self.folded,
-            "is_bot": self.is_bot,
-            "all_in": self.all_in
-        }
+# ===== Global State =====
 
-class PokerTable:
-    def __init__(self, table_id: str, max_players: int = 6, small_blind: int = 5):
-        self.id = table_id
-        self.players: Dict[str, Player] = {}
-        self.player_order: List[str] = []
-        self.max_players = max_players
-        self.small_blind = small_blind
-        self.big_blind = small_blind * 2
-        self.pot = 0
-        self.current_bet = 0
-        self.community_cards = []
-        self.phase = GamePhase.WAITING
-        self.dealer_position = 0
-        self.current_player_index = 0
-        self.created_at = datetime.now()
-        self.deck = []
-        self.last_action = None
-
-    def add_player(self, player: Player) -> bool:
-        if len(self.players) >= self.max_players:
-            return False
-        self.players[player.id] = player
-        self.player_order.append(player.id)
-
-        # Start game if we have at least 2 players
-        if len(self.players) >= 2 and self.phase == GamePhase.WAITING:
-            self.start_new_hand()
-
-        return True
-
-    def create_deck(self):
-        """Create a standard 52-card deck"""
-        suits = ['♠', '♥', '♦', '♣']
-        ranks = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A']
-        self.deck = [f"{rank}{suit}" for suit in suits for rank in ranks]
-        random.shuffle(self.deck)
-
-    def deal_card(self) -> str:
-        """Deal one card from the deck"""
-        if not self.deck:
-            self.create_deck()
-        return self.deck.pop()
-
-    def start_new_hand(self):
-        """Start a new hand"""
-        if len(self.players) < 2:
-            return
-
-        # Reset table
-        self.pot = 0
-        self.current_bet = 0
-        self.community_cards = []
-        self.phase = GamePhase.PRE_FLOP
-
-        # Reset players
-        for player in self.players.values():
-            player.current_bet = 0
-            player.folded = False
-            player.cards = []
-            player.all_in = False
-
-        # Create and shuffle deck
-        self.create_deck()
-
-        # Deal cards to players
-        for _ in range(2):
-            for player_id in self.player_order:
-                if not self.players[player_id].folded:
-                    self.players[player_id].cards.append(self.deal_card())
-
-        # Post blinds
-        active_players = [pid for pid in self.player_order if not self.players[pid].folded]
-        if len(active_players) >= 2:
-            # Small blind
-            sb_player_id = active_players[(self.dealer_position + 1) % len(active_players)]
-            sb_amount = min(self.small_blind, self.players[sb_player_id].chips)
-            self.players[sb_player_id].chips -= sb_amount
-            self.players[sb_player_id].current_bet = sb_amount
-            self.pot += sb_amount
-
-            # Big blind
-            bb_player_id = active_players[(self.dealer_position + 2) % len(active_players)]
-            bb_amount = min(self.big_blind, self.players[bb_player_id].chips)
-            self.players[bb_player_id].chips -= bb_amount
-            self.players[bb_player_id].current_bet = bb_amount
-            self.pot += bb_amount
-            self.current_bet = bb_amount
-
-            # Set first player (after big blind)
-            self.current_player_index = (self.dealer_position + 3) % len(active_players)
-
-    def get_current_player_id(self) -> Optional[str]:
-        """Get the current player's ID"""
-        active_players = [pid for pid in self.player_order if not self.players[pid].folded]
-        if not active_players or self.phase == GamePhase.WAITING:
-            return None
-        return active_players[self.current_player_index % len(active_players)]
-
-    def advance_to_next_player(self):
-        """Move to the next active player"""
-        active_players = [pid for pid in self.player_order if not self.players[pid].folded]
-        if not active_players:
-            return
-
-        self.current_player_index = (self.current_player_index + 1) % len(active_players)
-
-        # Check if betting round is complete
-        if self.is_betting_round_complete():
-            self.advance_phase()
-
-    def is_betting_round_complete(self) -> bool:
-        """Check if all active players have matched the current bet"""
-        active_players = [p for p in self.players.values() if not p.folded and not p.all_in]
-        if len(active_players) <= 1:
-            return True
+tables: Dict[str, PokerTable] = {}
+table_syncs: Dict[str, TableSync] = {}  # table_id -> versioned state for delta updates
+actors: Dict[str, TableActor] = {}  # table_id -> actor that runs every mutation of the table
+
+# Every WebSocket gets a bounded outgoing queue; a client that falls further
+# behind than WS_QUEUE_SIZE messages is handled by WS_SLOW_CONSUMER_POLICY
+connections = ConnectionManager(
+    max_queue=int(os.environ.get("WS_QUEUE_SIZE", "64")),
+    policy=SlowConsumerPolicy(os.environ.get("WS_SLOW_CONSUMER_POLICY", "coalesce"))
+)
+
+# The last EVENT_BUFFER_SIZE broadcasts of each table are kept so a client
+# reconnecting with ?resume_from=<seq> gets only what it missed
+EVENT_BUFFER_SIZE = int(os.environ.get("EVENT_BUFFER_SIZE", "64"))
+
+# Sockets of players not seated at the table are spectators: instead of every
+# event they get the latest state every SPECTATOR_UPDATE_INTERVAL seconds, and
+# each table takes at most SPECTATOR_LIMIT of them
+SPECTATOR_UPDATE_INTERVAL = float(os.environ.get("SPECTATOR_UPDATE_INTERVAL", "0.2"))
+SPECTATOR_LIMIT = int(os.environ.get("SPECTATOR_LIMIT", "500"))
+spectator_pending: Set[str] = set()  # Tables that changed since their spectators' last update
+spectator_task: Optional[asyncio.Task] = None
+
+# Finished hands go to an append-only log for audits when HAND_HISTORY_DIR is set
+HAND_HISTORY_DIR = os.environ.get("HAND_HISTORY_DIR", "")
+hand_history: Optional[HandHistoryWriter] = None
+
+def get_hand_history() -> Optional[HandHistoryWriter]:
+    """Get the hand history writer, starting it on first use"""
+    global hand_history
+    if hand_history is None and HAND_HISTORY_DIR:
+        hand_history = HandHistoryWriter(
+            HAND_HISTORY_DIR,
+            max_file_size=int(os.environ.get("HAND_HISTORY_MAX_BYTES", str(64 * 1024 * 1024)))
+        )
+    return hand_history
+
+# In sharded mode (see shard_router.py) this process is one of SHARD_COUNT
+# workers and only hosts the tables the hash ring assigns to SHARD_INDEX
+SHARD_INDEX = int(os.environ.get("SHARD_INDEX", "0"))
+SHARD_COUNT = int(os.environ.get("SHARD_COUNT", "1"))
+shard_ring = HashRing(SHARD_COUNT)
+
+# With TABLE_STORE_PATH set, tables are snapshotted to SQLite every
+# SNAPSHOT_INTERVAL seconds so a restart resumes every game. Tables touched in
+# the last TABLE_HOT_SECONDS are restored at startup, older ones on first access
+TABLE_STORE_PATH = os.environ.get("TABLE_STORE_PATH", "")
+SNAPSHOT_INTERVAL = float(os.environ.get("SNAPSHOT_INTERVAL", "2.0"))
+TABLE_HOT_SECONDS = float(os.environ.get("TABLE_HOT_SECONDS", "900"))
+table_store: Optional[TableStore] = None
+cold_tables: Dict[str, dict] = {}  # table_id -> lobby summary of a stored table not loaded yet
+snapshot_task: Optional[asyncio.Task] = None
+
+# Table summaries indexed for listing and seat finding; lobby sockets get the
+# changed summaries every LOBBY_UPDATE_INTERVAL seconds
+lobby = Lobby()
+lobby_connections = ConnectionManager(
+    max_queue=int(os.environ.get("WS_QUEUE_SIZE", "64")),
+    policy=SlowConsumerPolicy.COALESCE
+)
+LOBBY_UPDATE_INTERVAL = float(os.environ.get("LOBBY_UPDATE_INTERVAL", "0.5"))
+lobby_version = 0
+lobby_sent: Dict[str, int] = {}  # lobby socket group -> version of the last update sent to it
+lobby_task: Optional[asyncio.Task] = None
+
+# Abandoned tables and seats and silent sockets are reclaimed by the reaper;
+# MAX_TABLES and MAX_CONNECTIONS bound what a busy instance can hold
+TABLE_IDLE_SECONDS = float(os.environ.get("TABLE_IDLE_SECONDS", "1800"))
+SEAT_IDLE_SECONDS = float(os.environ.get("SEAT_IDLE_SECONDS", "600"))
+HEARTBEAT_TIMEOUT = float(os.environ.get("HEARTBEAT_TIMEOUT", "90"))
+MAX_TABLES = int(os.environ.get("MAX_TABLES", "10000"))
+MAX_SEATS = 10  # Largest table that can be created; hand history stores seats and blinds in fixed-size fields
+MAX_SMALL_BLIND = 1_000_000
+MAX_CONNECTIONS = int(os.environ.get("MAX_CONNECTIONS", "10000"))
+REAPER_INTERVAL = 1.0
+rejected = {"tables": 0, "connections": 0, "spectators": 0}  # Refused by the caps
+reaper_task: Optional[asyncio.Task] = None
+
+# Each turn allows ACTION_TIMEOUT seconds plus the player's time bank, then the
+# player checks if they can and folds otherwise; ACTION_TIMEOUT=0 disables it
+ACTION_TIMEOUT = float(os.environ.get("ACTION_TIMEOUT", "30"))
+TIME_BANK_SECONDS = float(os.environ.get("TIME_BANK_SECONDS", "30"))  # Starting and largest time bank
+TIME_BANK_REFILL = float(os.environ.get("TIME_BANK_REFILL", "5"))  # Added to every time bank each hand
+AWAY_ACTION_TIMEOUT = float(os.environ.get("AWAY_ACTION_TIMEOUT", "3"))  # For players who timed out last turn
+turn_clocks: Dict[str, Tuple[Tuple[int, int], float, Optional[str]]] = {}  # table_id -> (turn, started, player_id)
+
+# Decks come from a pool shuffled ahead of time with os.urandom entropy.
+# SHUFFLE_SEED (any string) makes the deals reproducible, for tests only
+SHUFFLE_POOL_SIZE = int(os.environ.get("SHUFFLE_POOL_SIZE", "256"))
+SHUFFLE_SEED = os.environ.get("SHUFFLE_SEED", "")
+shuffler = Shuffler(SHUFFLE_POOL_SIZE, SHUFFLE_SEED or None)
+
+# Equity simulations run in worker processes so they never block the event loop
+EQUITY_WORKERS = int(os.environ.get("EQUITY_WORKERS", "2"))
+MAX_EQUITY_ITERATIONS = 200_000
+
+# Longest a GET /api/tables/{table_id}?wait_for_revision=N request is parked
+MAX_POLL_TIMEOUT = 60.0
+equity_executor: Optional[ProcessPoolExecutor] = None
+
+def get_equity_executor() -> ProcessPoolExecutor:
+    """Get the equity process pool, starting it on first use"""
+    global equity_executor
+    if equity_executor is None:
+        equity_executor = ProcessPoolExecutor(max_workers=EQUITY_WORKERS)
+    return equity_executor
+
+# ===== Metrics =====
+# Exported at /metrics in the Prometheus text format
+
+metrics = Registry()
+request_seconds = metrics.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route", ("method", "route", "status")
+)
+actions_total = metrics.counter("poker_actions_total", "Player actions performed, by type", ("action",))
+hands_completed = metrics.counter("poker_hands_completed_total", "Hands played to the end")
+broadcast_seconds = metrics.histogram(
+    "poker_broadcast_duration_seconds", "Time to encode a table broadcast and queue it on every socket",
+    buckets=(0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.05)
+)
+turn_timeouts = metrics.counter("poker_turn_timeouts_total", "Turns auto-acted after the deadline", ("action",))
+broadcast_bytes = metrics.counter("poker_broadcast_bytes_total", "Bytes of table broadcasts queued on sockets")
+broadcast_messages = metrics.counter("poker_broadcast_messages_total", "Table broadcast messages queued on sockets")
+spectator_updates = metrics.counter("poker_spectator_updates_total", "Coalesced updates sent to table spectators")
+loop_lag_seconds = metrics.histogram(
+    "poker_event_loop_lag_seconds", "How late the event loop woke a sleeping task",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+)
+app.add_middleware(LatencyMiddleware, histogram=request_seconds)
+
+LOOP_LAG_INTERVAL = 0.5  # Seconds between event loop lag probes
+HOT_TABLE_WINDOW = 10.0  # Seconds over which table command rates are measured
+HOT_TABLES = 10  # Busiest tables exported
+hot_tables: Dict[str, float] = {}  # table_id -> commands/sec over the last window
+monitor_task: Optional[asyncio.Task] = None
+
+# The sampling profiler only exists when PROFILER_ENABLED is set
+PROFILER_ENABLED = os.environ.get("PROFILER_ENABLED", "") not in ("", "0", "false")
+MAX_PROFILE_SECONDS = 60.0
+profiler: Optional[SamplingProfiler] = None
+
+# ===== WebSocket Connection Manager =====
 
-        # All active players must have matched current_bet
-        for player in active_players:
-            if player.current_bet < self.current_bet:
-                return False
-        return True
-
-    def advance_phase(self):
-        """Advance to the next game phase"""
-        # Reset bets for next round
-        for player in self.players.values():
-            player.current_bet = 0
-        self.current_bet = 0
-        self.current_player_index = (self.dealer_position + 1) % len(self.player_order)
-
-        if self.phase == GamePhase.PRE_FLOP:
-            # Deal flop (3 cards)
-            self.community_cards = [self.deal_card() for _ in range(3)]
-            self.phase = GamePhase.FLOP
-        elif self.phase == GamePhase.FLOP:
-            # Deal turn (1 card)
-            self.community_cards.append(self.deal_card())
-            self.phase = GamePhase.TURN
-        elif self.phase == GamePhase.TURN:
-            # Deal river (1 card)
-            self.community_cards.append(self.deal_card())
-            self.phase = GamePhase.RIVER
-        elif self.phase == GamePhase.RIVER:
-            # Go to showdown
-            self.phase = GamePhase.SHOWDOWN
-            self.handle_showdown()
-
-    def handle_showdown(self):
-        """Handle showdown - simplified version"""
-        active_players = [p for p in self.players.values() if not p.folded]
-
-        if len(active_players) == 1:
-            # Only one player left - they win
-            winner = active_players[0]
-            winner.chips += self.pot
-            logger.info(f"Player {winner.name} wins {self.pot} chips (others folded)")
+def encode_for(conn: Connection, message: dict, aliases: Optional[Dict[str, int]] = None) -> Frame:
+    """Encode a reply in the socket's encoding; MessagePack replaces player IDs by `aliases`"""
+    if conn.encoding == Encoding.MSGPACK:
+        return pack_message(message, aliases)
+    return encode_message(message)
+
+def broadcast_to_table(
+    table_id: str,
+    message: dict,
+    full_state_message: Optional[dict] = None,
+    private: Optional[Dict[str, dict]] = None,
+    new_aliases: Optional[Dict[str, int]] = None
+):
+    """
+    Queue a message for all connected clients at a table without waiting for any of them
+
+    Messages to a live table get the next "seq" and are kept for resuming clients.
+    """
+    start = time.perf_counter()
+    sync = table_syncs.get(table_id)
+    if sync is not None:
+        seq = sync.next_seq()
+        message = {**message, "seq": seq}
+        if full_state_message is not None:
+            full_state_message = {**full_state_message, "seq": seq}
+    frames = Frames(
+        message, full_state_message, private,
+        aliases=sync.aliases if sync is not None else None,
+        new_aliases=new_aliases
+    )
+    if sync is not None:
+        sync.remember(seq, frames)
+    accepted, queued_bytes = connections.broadcast(table_id, frames)
+    broadcast_seconds.observe(time.perf_counter() - start)
+    if accepted:
+        broadcast_messages.inc(amount=accepted)
+        broadcast_bytes.inc(amount=queued_bytes)
+
+def broadcast_table_update(table: PokerTable, events: List[dict]):
+    """
+    Broadcast a batch of events with the table's state delta since the previous version
+
+    A single event is sent as it is; several are wrapped in one "batch" message.
+    Players whose hole cards changed also get them in a "private" field.
+    """
+    track_turn(table)
+    sync = table_syncs[table.id]
+    update = sync.update(table)
+    private = sync.private if update is not None else None
+    new_aliases = sync.new_aliases if update is not None else None
+    if update is None:
+        update = {"version": sync.version, "base_version": sync.version, "delta": {}}
+
+    event = events[0] if len(events) == 1 else {"type": "batch", "events": events}
+    broadcast_to_table(
+        table.id,
+        {**event, **update},
+        # sync.state is the public state as of sync.version, so no second to_dict()
+        full_state_message={**event, "version": sync.version, "table_state": sync.state},
+        private=private,
+        new_aliases=new_aliases
+    )
+    if connections.spectator_count(table.id):
+        spectator_pending.add(table.id)
+    lobby.update(table_summary(table))
+
+# ===== Table Registry =====
+
+def register_table(table: PokerTable):
+    """Make a new or restored table live: state sync, actor and hand history"""
+    writer = get_hand_history()
+    if writer is not None:
+        table.history = writer.append
+    table.shuffler = shuffler
+    tables[table.id] = table
+    table_syncs[table.id] = TableSync(EVENT_BUFFER_SIZE)
+    actors[table.id] = TableActor(table, broadcast_table_update)
+    lobby.update(table_summary(table))
+    track_turn(table)
+
+    now = time.monotonic()
+    reaper.schedule("tables", table.id, now + TABLE_IDLE_SECONDS)
+    for player_id in table.player_order:
+        reaper.schedule("seats", (table.id, player_id), now + SEAT_IDLE_SECONDS)
+
+def find_table(table_id: str) -> Optional[PokerTable]:
+    """Get a live table, rehydrating it from the table store if it is cold"""
+    table = tables.get(table_id)
+    if table is None and table_id in cold_tables:
+        table = table_store.load(table_id)
+        del cold_tables[table_id]
+        if table is not None:
+            register_table(table)
+            logger.info(f"Rehydrated table {table_id}")
+    return table
+
+def require_table(table_id: str) -> PokerTable:
+    """find_table() for endpoints; raises 404"""
+    table = find_table(table_id)
+    if table is None:
+        raise HTTPException(status_code=404, detail="Table not found")
+    return table
+
+async def snapshot_tables():
+    """Write the tables that changed since the last pass, forever"""
+    while True:
+        await asyncio.sleep(SNAPSHOT_INTERVAL)
+        try:
+            # Encoding runs between actor commands, so every snapshot is consistent
+            rows = table_store.collect(tables.values())
+            await asyncio.to_thread(table_store.write, rows)
+        except Exception:
+            logger.exception("Table snapshot failed")
+
+@app.on_event("startup")
+async def start_shuffler():
+    if SHUFFLE_SEED:
+        logger.warning("SHUFFLE_SEED is set: deals are predictable")
+    shuffler.start()
+
+@app.on_event("startup")
+async def restore_tables():
+    """Open the table store, restore recently active tables and start snapshotting"""
+    global table_store, snapshot_task
+    if not TABLE_STORE_PATH:
+        return
+    table_store = TableStore(TABLE_STORE_PATH)
+    now, monotonic_now = time.time(), time.monotonic()
+    stale, unowned = [], 0
+    for table_id, _, updated_at, summary in table_store.index():
+        if shard_ring.owner(table_id) != SHARD_INDEX:
+            # The router moves these to their owner on startup; left here they are never served
+            unowned += 1
+            continue
+        if table_id in tables:
+            continue
+        idle_left = updated_at + TABLE_IDLE_SECONDS - now
+        if idle_left <= 0:
+            stale.append(table_id)
+            continue
+        cold_tables[table_id] = summary
+        lobby.update(summary)
+        if now - updated_at <= TABLE_HOT_SECONDS:
+            find_table(table_id)
         else:
-            # TODO: Implement hand evaluation
-            # For now, randomly pick a winner
-            winner = random.choice(active_players)
-            winner.chips += self.pot
-            logger.info(f"Player {winner.name} wins {self.pot} chips (showdown)")
-
-        # Start new hand after a delay
-        self.dealer_position = (self.dealer_position + 1) % len(self.player_order)
-        self.start_new_hand()
-
-    def perform_action(self, player_id: str, action: ActionType, amount: int = 0) -> bool:
-        """Perform a player action"""
-        if player_id != self.get_current_player_id():
-            return False
-
-        player = self.players[player_id]
-
-        if action == ActionType.FOLD:
-            player.folded = True
-            # Check if only one player left
-            active_players = [p for p in self.players.values() if not p.folded]
-            if len(active_players) == 1:
-                self.phase = GamePhase.SHOWDOWN
-                self.handle_showdown()
-                return True
-
-        elif action == ActionType.CHECK:
-            if player.current_bet < self.current_bet:
-                return False  # Cannot check, must call or fold
-
-        elif action == ActionType.CALL:
-            call_amount = min(self.current_bet - player.current_bet, player.chips)
-            player.chips -= call_amount
-            player.current_bet += call_amount
-            self.pot += call_amount
-            if player.chips == 0:
-                player.all_in = True
-
-        elif action == ActionType.BET:
-            if self.current_bet > 0:
-                return False  # Cannot bet, must raise
-            bet_amount = min(amount, player.chips)
-            player.chips -= bet_amount
-            player.current_bet += bet_amount
-            self.pot += bet_amount
-            self.current_bet = player.current_bet
-            if player.chips == 0:
-                player.all_in = True
-
-        elif action == ActionType.RAISE:
-            total_amount = min(amount, player.chips)
-            actual_raise = total_amount - player.current_bet
-            player.chips -= actual_raise
-            player.current_bet = total_amount
-            self.pot += actual_raise
-            self.current_bet = max(self.current_bet, player.current_bet)
-            if player.chips == 0:
-                player.all_in = True
-
-        elif action == ActionType.ALL_IN:
-            all_in_amount = player.chips
-            player.chips = 0
-            player.current_bet += all_in_amount
-            self.pot += all_in_amount
-            self.current_bet = max(self.current_bet, player.current_bet)
-            player.all_in = True
-
-        self.last_action = {
-            "player_id": player_id,
-            "player_name": player.name,
-            "action": action,
-            "amount": amount
-        }
+            reaper.schedule("cold_tables", (table_id, monotonic_now + idle_left), monotonic_now + idle_left)
+    if stale:
+        table_store.delete(stale)
+    logger.info(f"Restored {len(tables)} tables, {len(cold_tables)} cold, dropped {len(stale)} abandoned")
+    if unowned:
+        logger.warning(f"{unowned} stored tables belong to other shards and were not restored")
+    snapshot_task = asyncio.create_task(snapshot_tables())
+
+# ===== Turn Timers =====
+
+def track_turn(table: PokerTable):
+    """Start the clock when a new turn begins (runs after every batch, before the broadcast)"""
+    if ACTION_TIMEOUT <= 0:
+        return
+    turn = (table.hand_number, table.actions_taken)
+    clock = turn_clocks.get(table.id)
+    if clock is not None and clock[0] == turn:
+        return
+
+    if clock is not None and clock[0][0] != turn[0]:
+        # A new hand tops up every time bank
+        for player in table.players.values():
+            player.time_bank = min(TIME_BANK_SECONDS, player.time_bank + TIME_BANK_REFILL)
+
+    now = asyncio.get_running_loop().time()
+    player_id = table.get_current_player_id()
+    turn_clocks[table.id] = (turn, now, player_id)
+    if player_id is None:
+        table.action_deadline = None
+        return
+
+    player = table.players[player_id]
+    allowed = AWAY_ACTION_TIMEOUT if player.timed_out else ACTION_TIMEOUT + player.time_bank
+    table.action_deadline = round(time.time() + allowed, 3)
+    turn_timers.schedule(now + allowed, table.id, turn)
+
+def turn_expired(table_id: str, turn: Tuple[int, int]):
+    actor = actors.get(table_id)
+    if actor is not None:
+        actor.send(timeout_command, turn)
+
+turn_timers = TurnTimers(turn_expired)
+
+# ===== Table Commands =====
+# Commands run inside the table's actor, one at a time and in arrival order
+
+def join_command(table: PokerTable, player_name: str, is_bot: bool):
+    """Seat a new player; returns the player ID"""
+    if len(table.players) >= table.max_players:
+        raise HTTPException(status_code=400, detail="Table is full")
 
-        self.advance_to_next_player()
-        return True
-
-    def to_dict(self, viewing_player_id: Optional[str] = None):
-        """Convert table to dictionary"""
-        return {
-            "table_id": self.id,
-            "pot": self.pot,
-            "current_bet": self.current_bet,
-            "community_cards": self.community_cards,
-            "phase": self.phase,
-            "small_blind": self.small_blind,
-            "big_blind": self.big_blind,
-            "current_player_id": self.get_current_player_id(),
-            "players": [
-                self.players[pid].to_dict(show_cards=(pid == viewing_player_id))
-                for pid in self.player_order
-            ],
-            "last_action": self.last_action
-        }
+    player_id = str(uuid.uuid4())
+    player = Player(player_id, player_name, is_bot)
+    player.time_bank = TIME_BANK_SECONDS
 
-# ===== Global State =====
+    if not table.add_player(player):
+        raise HTTPException(status_code=400, detail="Failed to join table")
+    reaper.schedule("seats", (table.id, player_id), time.monotonic() + SEAT_IDLE_SECONDS)
 
-tables: Dict[str, PokerTable] = {}
-websocket_connections: Dict[str, List[WebSocket]] = {}  # table_id -> list of websockets
+    logger.info(f"Player {player_name} joined table {table.id}")
 
-# ===== WebSocket Connection Manager =====
+    return player_id, {
+        "type": "player_joined",
+        "player_id": player_id,
+        "player_name": player_name
+    }
 
-async def broadcast_to_table(table_id: str, message: dict):
-    """Broadcast message to all connected clients at a table"""
-    if table_id in websocket_connections:
-        disconnected = []
-        for ws in websocket_connections[table_id]:
-            try:
-                await ws.send_json(message)
-            except:
-                disconnected.append(ws)
+def leave_command(table: PokerTable, player_id: str):
+    """Unseat a player, at the end of the hand if one is running"""
+    if not table.remove_player(player_id):
+        return False, None
 
-        # Remove disconnected websockets
-        for ws in disconnected:
-            websocket_connections[table_id].remove(ws)
+    logger.info(f"Player {player_id} left table {table.id}")
+
+    return True, {
+        "type": "player_left",
+        "player_id": player_id
+    }
+
+def action_command(table: PokerTable, player_id: str, action: ActionType, amount: int):
+    """Perform the current player's action"""
+    current_player_id = table.get_current_player_id()
+    if player_id != current_player_id:
+        current_player_name = table.players[current_player_id].name if current_player_id else "unknown"
+        raise HTTPException(
+            status_code=400,
+            detail=f"Not your turn. Current player: {current_player_name}"
+        )
+
+    hand_number = table.hand_number
+    if not table.perform_action(player_id, action, amount):
+        raise HTTPException(status_code=400, detail="Invalid action")
+    count_action(table, action, hand_number)
+
+    # Time past the turn timeout comes out of the time bank
+    player = table.players[player_id]
+    clock = turn_clocks.get(table.id)
+    if clock is not None and clock[2] == player_id:
+        overtime = asyncio.get_running_loop().time() - clock[1] - ACTION_TIMEOUT
+        if overtime > 0:
+            player.time_bank = max(0.0, player.time_bank - overtime)
+    player.timed_out = False
+    player.last_action_time = datetime.now()
+
+    logger.info(f"Player {player_id} performed {action}")
+
+    return True, {
+        "type": "action_performed",
+        "player_id": player_id,
+        "player_name": table.players[player_id].name,
+        "action": action,
+        "amount": amount
+    }
+
+def timeout_command(table: PokerTable, turn: Tuple[int, int]):
+    """Check or fold for the current player if the turn has not moved on"""
+    player_id = table.get_current_player_id()
+    if (table.hand_number, table.actions_taken) != turn or player_id is None:
+        return False, None
+
+    player = table.players[player_id]
+    action = ActionType.CHECK if player.current_bet >= table.current_bet else ActionType.FOLD
+    hand_number = table.hand_number
+    if not table.perform_action(player_id, action, 0):
+        return False, None
+    count_action(table, action, hand_number)
+    turn_timeouts.inc((action.value,))
+    player.timed_out = True
+    player.time_bank = 0.0
+
+    logger.info(f"Player {player_id} timed out ({action})")
+
+    return True, {
+        "type": "action_performed",
+        "player_id": player_id,
+        "player_name": player.name,
+        "action": action,
+        "amount": 0,
+        "timed_out": True
+    }
+
+def count_action(table: PokerTable, action: ActionType, hand_number: int):
+    """Update the action and hand metrics after a successful action"""
+    actions_total.inc((action.value,))
+    if table.hand_number != hand_number or table.phase == GamePhase.WAITING:
+        hands_completed.inc()
 
 # ===== API Endpoints =====
 
@@ -349,31 +491,71 @@ async def health_check():
     return {
         "status": "healthy",
         "tables": len(tables),
-        "active_connections": sum(len(conns) for conns in websocket_connections.values())
+        "cold_tables": len(cold_tables),
+        "active_connections": connections.count(),
+        "lobby_connections": lobby_connections.count(),
+        "websocket": connections.stats(),
+        "actors": {
+            "commands": sum(actor.commands for actor in actors.values()),
+            "batches": sum(actor.batches for actor in actors.values()),
+            "waiting_requests": sum(actor.waiting for actor in actors.values())
+        },
+        "hand_history": hand_history.stats() if hand_history is not None else None,
+        "snapshots_written": table_store.snapshots_written if table_store is not None else None,
+        "shuffler": {
+            "pool": len(shuffler.pool),
+            "shuffled": shuffler.shuffled,
+            "misses": shuffler.misses,
+            "shuffles_per_second": round(shuffler.shuffles_per_second)
+        },
+        "turn_timers": {
+            "scheduled": len(turn_timers),
+            "timeouts": sum(turn_timeouts.values.values())
+        },
+        "reaper": {
+            "reclaimed": reaper.reclaimed,
+            "rejected": rejected,
+            "scheduled": len(reaper)
+        }
     }
 
 @app.get("/api/tables")
-async def list_tables():
-    """List all tables"""
-    return {
-        "tables": [
-            {
-                "table_id": table.id,
-                "players": len(table.players),
-                "max_players": table.max_players,
-                "phase": table.phase,
-                "small_blind": table.small_blind
-            }
-            for table in tables.values()
-        ]
-    }
+async def list_tables(
+    small_blind: Optional[int] = Query(None),
+    min_seats: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=MAX_LOBBY_PAGE),
+    cursor: Optional[str] = Query(None)
+):
+    """List tables, optionally by blind level and open seats, one page at a time"""
+    try:
+        page, next_cursor = lobby.query(small_blind, min_seats, limit, cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return {"tables": page, "next_cursor": next_cursor, "total": len(lobby)}
+
+@app.get("/api/lobby/find-seat")
+async def find_seat(small_blind: Optional[int] = Query(None), seats: int = Query(1, ge=1)):
+    """The table with room for `seats` more players that is closest to full"""
+    table_id = lobby.find_seat(small_blind, seats)
+    if table_id is None:
+        raise HTTPException(status_code=404, detail="No open seat")
+    return lobby.entries[table_id]
 
 @app.post("/api/tables")
-async def create_table(max_players: int = Query(6), small_blind: int = Query(5)):
+async def create_table(
+    max_players: int = Query(6, ge=2, le=MAX_SEATS),
+    small_blind: int = Query(5, ge=1, le=MAX_SMALL_BLIND)
+):
     """Create a new table"""
+    if len(lobby) >= MAX_TABLES:
+        rejected["tables"] += 1
+        raise HTTPException(status_code=503, detail="Table limit reached")
+
     table_id = str(uuid.uuid4())
-    table = PokerTable(table_id, max_players, small_blind)
-    tables[table_id] = table
+    while shard_ring.owner(table_id) != SHARD_INDEX:
+        # The router finds tables by hashing their ID, so only keep IDs this shard owns
+        table_id = str(uuid.uuid4())
+    register_table(PokerTable(table_id, max_players, small_blind))
 
     logger.info(f"Created table {table_id}")
 
@@ -384,14 +566,50 @@ async def create_table(max_players: int = Query(6), small_blind: int = Query(5))
         "big_blind": small_blind * 2
     }
 
-@app.get("/api/tables/{table_id}")
-async def get_table(table_id: str, player_id: Optional[str] = Query(None)):
-    """Get table state"""
-    if table_id not in tables:
-        raise HTTPException(status_code=404, detail="Table not found")
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header covers the ETag"""
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == etag:
+            return True
+    return False
 
-    table = tables[table_id]
-    return table.to_dict(viewing_player_id=player_id)
+@app.get("/api/tables/{table_id}")
+async def get_table(
+    request: Request,
+    table_id: str,
+    player_id: Optional[str] = Query(None),
+    wait_for_revision: Optional[int] = Query(None, ge=0),
+    timeout: float = Query(30.0, gt=0, le=MAX_POLL_TIMEOUT)
+):
+    """
+    Get table state
+
+    The ETag is the table revision; a matching If-None-Match gets a 304.
+    With wait_for_revision, the request waits until the table has moved past
+    that revision and answers 304 if it times out first. The revision counts
+    every change to the table and is unrelated to the WebSocket version.
+    """
+    table = require_table(table_id)
+    if player_id in table.players:
+        # Polling counts as presence for the seat reaper
+        table.players[player_id].last_action_time = datetime.now()
+    changed = True
+    if wait_for_revision is not None:
+        changed = await actors[table_id].wait_for_revision(wait_for_revision, timeout)
+
+    headers = {"ETag": f'"{table.revision}"', "X-Table-Revision": str(table.revision)}
+    if not changed or etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+
+    # Served from the table's encoded state cache; bots poll this constantly
+    return Response(
+        content=table_syncs[table_id].encoded(table, player_id),
+        media_type="application/json",
+        headers=headers
+    )
 
 @app.post("/api/tables/{table_id}/join")
 async def join_table(
@@ -400,39 +618,15 @@ async def join_table(
     is_bot: bool = Query(False)
 ):
     """Join a table"""
-    if table_id not in tables:
-        raise HTTPException(status_code=404, detail="Table not found")
-
-    table = tables[table_id]
-
-    if len(table.players) >= table.max_players:
-        raise HTTPException(status_code=400, detail="Table is full")
-
-    player_id = str(uuid.uuid4())
-    player = Player(player_id, player_name, is_bot)
-
-    if not table.add_player(player):
-        raise HTTPException(status_code=400, detail="Failed to join table")
-
-    logger.info(f"Player {player_name} joined table {table_id}")
-
-    # Broadcast player joined
-    await broadcast_to_table(table_id, {
-        "type": "player_joined",
-        "player_id": player_id,
-        "player_name": player_name,
-        "table_state": table.to_dict()
-    })
-
-    response = {
-        "player_id": player_id,
-        "table_state": table.to_dict(viewing_player_id=player_id)
-    }
+    table = require_table(table_id)
+    player_id = await actors[table_id].call(join_command, player_name, is_bot)
 
+    content = b'{"player_id":' + json.dumps(player_id).encode()
     if is_bot:
-        response["api_token"] = f"token_{player_id}"
+        content += b',"api_token":' + json.dumps(f"token_{player_id}").encode()
+    content += b',"table_state":' + table_syncs[table_id].encoded(table, player_id) + b'}'
 
-    return response
+    return Response(content=content, media_type="application/json")
 
 class ActionRequest(BaseModel):
     player_id: str
@@ -442,80 +636,572 @@ class ActionRequest(BaseModel):
 @app.post("/api/tables/{table_id}/action")
 async def perform_action(table_id: str, action_request: ActionRequest):
     """Perform a game action"""
-    if table_id not in tables:
-        raise HTTPException(status_code=404, detail="Table not found")
-
-    table = tables[table_id]
-
-    current_player_id = table.get_current_player_id()
-    if action_request.player_id != current_player_id:
-        current_player_name = table.players[current_player_id].name if current_player_id else "unknown"
-        raise HTTPException(
-            status_code=400,
-            detail=f"Not your turn. Current player: {current_player_name}"
-        )
-
-    success = table.perform_action(
+    table = require_table(table_id)
+    await actors[table_id].call(
+        action_command,
         action_request.player_id,
         action_request.action,
         action_request.amount or 0
     )
 
-    if not success:
-        raise HTTPException(status_code=400, detail="Invalid action")
-
-    logger.info(f"Player {action_request.player_id} performed {action_request.action}")
+    return Response(
+        content=b'{"success":true,"table_state":' + table_syncs[table_id].encoded(table, action_request.player_id) + b'}',
+        media_type="application/json"
+    )
 
-    # Broadcast action
-    await broadcast_to_table(table_id, {
-        "type": "action_performed",
-        "player_id": action_request.player_id,
-        "player_name": table.players[action_request.player_id].name,
-        "action": action_request.action,
-        "amount": action_request.amount,
-        "table_state": table.to_dict()
-    })
+@app.get("/api/tables/{table_id}/equity")
+async def get_equity(
+    table_id: str,
+    player_id: str = Query(...),
+    iterations: int = Query(DEFAULT_ITERATIONS, ge=100, le=MAX_EQUITY_ITERATIONS),
+    time_budget_ms: int = Query(200, ge=10, le=2000),
+    exact: bool = Query(True)
+):
+    """Estimate the player's win/tie equity against the opponents still in the hand"""
+    table = require_table(table_id)
+
+    if player_id not in table.players:
+        raise HTTPException(status_code=404, detail="Player not found")
+
+    player = table.players[player_id]
+    if len(player.cards) != 2 or player.folded:
+        raise HTTPException(status_code=400, detail="Player is not in the hand")
+
+    opponents = sum(1 for p in table.players.values() if p.id != player_id and not p.folded)
+    if opponents == 0:
+        raise HTTPException(status_code=400, detail="No opponents left in the hand")
+
+    job = functools.partial(
+        estimate_equity,
+        list(player.cards),
+        list(table.community_cards),
+        opponents,
+        iterations=iterations,
+        time_budget=time_budget_ms / 1000,
+        exact_limit=DEFAULT_EXACT_LIMIT if exact else 0
+    )
+    result = await asyncio.get_running_loop().run_in_executor(get_equity_executor(), job)
 
     return {
-        "success": True,
-        "table_state": table.to_dict(viewing_player_id=action_request.player_id)
+        "table_id": table_id,
+        "player_id": player_id,
+        "phase": table.phase,
+        "opponents": opponents,
+        **result
     }
 
-@app.websocket("/ws/{table_id}/{player_id}")
-async def websocket_endpoint(websocket: WebSocket, table_id: str, player_id: str):
-    """WebSocket endpoint for real-time updates"""
-    await websocket.accept()
+@app.on_event("shutdown")
+async def shutdown_workers():
+    """Stop the table actors and the equity worker processes, and flush the hand history and table snapshots"""
+    for task in (snapshot_task, lobby_task, spectator_task, reaper_task, monitor_task):
+        if task is not None:
+            task.cancel()
+    turn_timers.stop()
+    shuffler.stop()
+    for actor in actors.values():
+        actor.stop()
+    if table_store is not None:
+        table_store.write(table_store.collect(tables.values()))
+        table_store.close()
+    if equity_executor is not None:
+        equity_executor.shutdown(wait=False, cancel_futures=True)
+    if hand_history is not None:
+        hand_history.close()
 
-    # Add to connections
-    if table_id not in websocket_connections:
-        websocket_connections[table_id] = []
-    websocket_connections[table_id].append(websocket)
+@app.websocket("/ws/{table_id}/{player_id}")
+async def websocket_endpoint(
+    websocket: WebSocket,
+    table_id: str,
+    player_id: str,
+    updates: str = Query("full"),
+    resume_from: Optional[int] = Query(None),
+    encoding: Encoding = Query(Encoding.JSON)
+):
+    """
+    WebSocket endpoint for real-time updates
+
+    Updates carry the whole table_state unless the client asks for
+    updates=delta, which sends versioned deltas against the snapshot instead.
+    A client reconnecting with resume_from (the last "seq" it received) is sent
+    the broadcasts it missed instead of a snapshot, while they are still buffered.
+    With encoding=msgpack every message but "pong" is a MessagePack binary frame.
+    A player_id not seated at the table connects as a spectator.
+    """
+    table = find_table(table_id)
+    spectator = table is not None and player_id not in table.players
+    if spectator and connections.spectator_count(table_id) >= SPECTATOR_LIMIT:
+        rejected["spectators"] += 1
+        await websocket.close(code=1013)
+        return
+    if not await accept_websocket(websocket):
+        return
+
+    # Add to connections; everything sent to this socket goes through its queue
+    conn = connections.connect(
+        websocket, table_id, player_id,
+        full_state=(updates == "full"), encoding=encoding, spectator=spectator
+    )
+    watch_connection(connections, conn)
 
-    logger.info(f"WebSocket connected: {player_id} to table {table_id}")
+    logger.info(f"WebSocket connected: {player_id} to table {table_id}{' (spectator)' if spectator else ''}")
 
     try:
+        missed = None
+        if table is not None and resume_from is not None and not conn.full_state and not conn.spectator:
+            missed = table_syncs[table_id].events_since(resume_from)
+
         # Send connection confirmation
-        await websocket.send_json({
+        conn.send(encode_for(conn, {
             "type": "connected",
             "player_id": player_id,
-            "table_id": table_id
-        })
+            "table_id": table_id,
+            "resumed": missed is not None
+        }))
+
+        if missed is not None:
+            for _, frames in missed:
+                conn.send(frames.frame(conn.encoding, False, player_id))
+        elif table is not None:
+            # Give delta clients a base version to apply updates to
+            send_snapshot(conn, table)
+
+        # Keep connection alive, handle ping/pong, snapshot and game requests
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+            conn.last_seen = time.monotonic()
+            data = message.get("text")
+            if data == "ping":
+                conn.send("pong")
+                continue
+
+            # Requests are JSON text or MessagePack binary, whatever the socket's encoding
+            request = decode_request(data, message.get("bytes"))
+            if not isinstance(request, dict):
+                conn.send(ws_error(conn, None, 422, MALFORMED_REQUEST))
+                continue
+            request_type = request.get("type")
+            if not isinstance(request_type, str):
+                continue
+            if request_type == "snapshot":
+                table = find_table(table_id)
+                if table is not None:
+                    send_snapshot(conn, table)
+            elif request_type in WS_REQUESTS:
+                conn.send(await handle_ws_request(conn, request))
+
+    except WebSocketDisconnect:
+        logger.info(f"WebSocket disconnected: {conn.player_id}")
+
+    finally:
+        connections.disconnect(conn)
+
+    # Broadcast disconnection, in order with the table's other events
+    event = {"type": "player_disconnected", "player_id": conn.player_id}
+    if table_id in actors:
+        actors[table_id].publish(event)
+    else:
+        broadcast_to_table(table_id, event)
+
+def send_snapshot(conn: Connection, table: PokerTable):
+    """Queue the table's full state as the connection's player sees it"""
+    sync = table_syncs[table.id]
+    if conn.spectator:
+        # At the version of the spectator feed, unless nobody else follows it
+        message = sync.spectator_snapshot(table, catch_up=connections.spectator_count(table.id) == 1)
+    else:
+        message = sync.snapshot(table, conn.player_id)
+    if conn.encoding == Encoding.MSGPACK:
+        # Every alias given out so far, so the client can read any later message
+        conn.send(pack_message(message, sync.aliases, sync.aliases))
+    else:
+        conn.send(encode_message(message))
+
+# ===== Lobby Updates =====
+
+def lobby_group(small_blind: Optional[int]) -> str:
+    """Connection group of lobby sockets with the same blind filter"""
+    return "lobby" if small_blind is None else f"lobby:{small_blind}"
+
+def lobby_snapshot(small_blind: Optional[int]) -> dict:
+    return {
+        "type": "lobby_snapshot",
+        "version": lobby_version,
+        "tables": lobby.query(small_blind, limit=len(lobby) or 1)[0]
+    }
 
-        # Keep connection alive and handle ping/pong
+def publish_lobby_changes():
+    """
+    Send each lobby socket group the summaries changed since the last call
+
+    base_version is the version of the group's previous update; a client
+    whose version is older than that missed an update and should resync.
+    """
+    global lobby_version
+    updated, removed = lobby.take_changes()
+    if not updated and not removed:
+        return
+    lobby_version += 1
+    for group in list(lobby_connections.tables):
+        small_blind = None if group == "lobby" else int(group.split(":", 1)[1])
+        group_updated = [s for s in updated if small_blind is None or s["small_blind"] == small_blind]
+        if not group_updated and not removed:
+            continue
+        lobby_connections.broadcast(group, Frames({
+            "type": "lobby_update",
+            "version": lobby_version,
+            "base_version": lobby_sent.get(group, 0),
+            "updated": group_updated,
+            "removed": removed
+        }))
+        lobby_sent[group] = lobby_version
+    for group in [g for g in lobby_sent if g not in lobby_connections.tables]:
+        del lobby_sent[group]
+
+async def publish_lobby():
+    while True:
+        await asyncio.sleep(LOBBY_UPDATE_INTERVAL)
+        publish_lobby_changes()
+
+@app.on_event("startup")
+async def start_lobby_updates():
+    global lobby_task
+    lobby_task = asyncio.create_task(publish_lobby())
+
+@app.websocket("/ws/lobby")
+async def lobby_websocket(websocket: WebSocket, small_blind: Optional[int] = Query(None)):
+    """Lobby table list: a snapshot, then incremental updates"""
+    if not await accept_websocket(websocket):
+        return
+    conn = lobby_connections.connect(websocket, lobby_group(small_blind), "lobby")
+    watch_connection(lobby_connections, conn)
+    try:
+        conn.send(encode_message(lobby_snapshot(small_blind)))
         while True:
             data = await websocket.receive_text()
+            conn.last_seen = time.monotonic()
             if data == "ping":
-                await websocket.send_text("pong")
-
+                conn.send("pong")
+                continue
+            try:
+                request = json.loads(data)
+            except ValueError:
+                continue
+            if isinstance(request, dict) and request.get("type") == "snapshot":
+                conn.send(encode_message(lobby_snapshot(small_blind)))
     except WebSocketDisconnect:
-        logger.info(f"WebSocket disconnected: {player_id}")
-        websocket_connections[table_id].remove(websocket)
-
-        # Broadcast disconnection
-        await broadcast_to_table(table_id, {
-            "type": "player_disconnected",
-            "player_id": player_id
-        })
+        pass
+    finally:
+        lobby_connections.disconnect(conn)
+
+# ===== Spectator Updates =====
+
+def publish_spectator_update(table_id: str):
+    """Send a table's spectators one delta covering every version since their last update"""
+    sync = table_syncs.get(table_id)
+    if sync is None:
+        return
+    update = sync.spectator_update()
+    if update is None:
+        return
+    added = update["delta"].get("players_added", ())
+    message = {"type": "spectator_update", **update}
+    frames = Frames(
+        message,
+        full_message={"type": "spectator_update", "version": update["version"], "table_state": sync.state},
+        aliases=sync.aliases,
+        new_aliases={p["id"]: sync.aliases[p["id"]] for p in added if p["id"] in sync.aliases}
+    )
+    accepted, queued_bytes = connections.broadcast(table_id, frames, spectators=True)
+    spectator_updates.inc()
+    if accepted:
+        broadcast_messages.inc(amount=accepted)
+        broadcast_bytes.inc(amount=queued_bytes)
+
+async def publish_spectators():
+    while True:
+        await asyncio.sleep(SPECTATOR_UPDATE_INTERVAL)
+        pending = list(spectator_pending)
+        spectator_pending.clear()
+        for table_id in pending:
+            try:
+                publish_spectator_update(table_id)
+            except Exception:
+                logger.exception(f"Spectator update failed for table {table_id}")
+
+@app.on_event("startup")
+async def start_spectator_updates():
+    global spectator_task
+    spectator_task = asyncio.create_task(publish_spectators())
+
+# ===== Reaper =====
+
+store_deletes: List[str] = []  # Reclaimed tables still to delete from the table store
+
+def table_expires_at(table_id: str, now: float) -> Optional[float]:
+    actor = actors.get(table_id)
+    if actor is None:
+        return None
+    if connections.is_watched(table_id) or actor.waiting:
+        return now + TABLE_IDLE_SECONDS
+    return actor.last_active + TABLE_IDLE_SECONDS
+
+def reclaim_table(table_id: str):
+    actors.pop(table_id).stop(HTTPException(status_code=404, detail="Table not found"))
+    turn_clocks.pop(table_id, None)
+    del tables[table_id]
+    del table_syncs[table_id]
+    spectator_pending.discard(table_id)
+    lobby.remove(table_id)
+    if table_store is not None:
+        store_deletes.append(table_id)
+    logger.info(f"Reclaimed idle table {table_id}")
+
+def cold_table_expires_at(key, now: float) -> Optional[float]:
+    table_id, expires_at = key
+    return expires_at if table_id in cold_tables else None
+
+def reclaim_cold_table(key):
+    table_id, _ = key
+    del cold_tables[table_id]
+    lobby.remove(table_id)
+    store_deletes.append(table_id)
+
+def seat_expires_at(key, now: float) -> Optional[float]:
+    table_id, player_id = key
+    table = tables.get(table_id)
+    player = table.players.get(player_id) if table is not None else None
+    if player is None or player_id in table.leaving:
+        return None
+    if connections.is_connected(table_id, player_id):
+        return now + SEAT_IDLE_SECONDS
+    return now + SEAT_IDLE_SECONDS - (datetime.now() - player.last_action_time).total_seconds()
+
+def reclaim_seat(key):
+    table_id, player_id = key
+    actors[table_id].send(leave_command, player_id)
+
+def connection_expires_at(key, now: float) -> Optional[float]:
+    _, conn = key
+    return None if conn.closed else conn.last_seen + HEARTBEAT_TIMEOUT
+
+def evict_connection(key):
+    manager, conn = key
+    logger.info(f"Evicting silent WebSocket: {conn.player_id}")
+    manager.evict(conn)
+
+reaper = Reaper({
+    "tables": (table_expires_at, reclaim_table),
+    "cold_tables": (cold_table_expires_at, reclaim_cold_table),
+    "seats": (seat_expires_at, reclaim_seat),
+    "connections": (connection_expires_at, evict_connection)
+})
+
+def watch_connection(manager: ConnectionManager, conn):
+    """Evict the connection if the client goes HEARTBEAT_TIMEOUT seconds without sending anything"""
+    reaper.schedule("connections", (manager, conn), conn.last_seen + HEARTBEAT_TIMEOUT)
+
+async def accept_websocket(websocket: WebSocket) -> bool:
+    """Accept a WebSocket unless MAX_CONNECTIONS are open"""
+    if connections.count() + lobby_connections.count() >= MAX_CONNECTIONS:
+        rejected["connections"] += 1
+        await websocket.close(code=1013)
+        return False
+    await websocket.accept()
+    return True
+
+async def reap():
+    """Reclaim whatever has expired, forever"""
+    while True:
+        await asyncio.sleep(REAPER_INTERVAL)
+        try:
+            reaper.run(time.monotonic())
+            if store_deletes and table_store is not None:
+                table_ids = store_deletes[:]
+                store_deletes.clear()
+                await asyncio.to_thread(table_store.delete, table_ids)
+        except Exception:
+            logger.exception("Reaper failed")
+
+@app.on_event("startup")
+async def start_reaper():
+    global reaper_task
+    reaper_task = asyncio.create_task(reap())
+
+# ===== Monitoring =====
+
+def collect_connections():
+    stats = connections.stats()
+    return {
+        ("table",): stats["connections"] - stats["spectators"],
+        ("spectator",): stats["spectators"],
+        ("lobby",): lobby_connections.count()
+    }
+
+def collect_queue_depth():
+    stats = connections.stats()
+    return {("total",): stats["queue_depth"], ("max",): stats["max_queue_depth"]}
+
+metrics.collector("poker_tables", "Tables in memory and cold tables in the table store", lambda: {
+    ("live",): len(tables), ("cold",): len(cold_tables)
+}, ("state",))
+metrics.collector("poker_websocket_connections", "Open WebSocket connections", collect_connections, ("kind",))
+metrics.collector("poker_websocket_queue_depth", "Messages queued on table sockets", collect_queue_depth, ("stat",))
+metrics.collector(
+    "poker_websocket_dropped_messages_total", "Messages dropped for slow table sockets",
+    lambda: {(): connections.stats()["dropped_messages"]}, kind="counter"
+)
+metrics.collector(
+    "poker_reaper_reclaimed_total", "Idle objects reclaimed by the reaper",
+    lambda: {(kind,): count for kind, count in reaper.reclaimed.items()}, ("kind",), kind="counter"
+)
+metrics.collector(
+    "poker_decks_shuffled_total", "Decks shuffled, ahead of time or inline",
+    lambda: {(): shuffler.shuffled}, kind="counter"
+)
+metrics.collector(
+    "poker_shuffle_pool_misses_total", "Hands that found the shuffled deck pool empty",
+    lambda: {(): shuffler.misses}, kind="counter"
+)
+metrics.collector("poker_shuffle_pool_decks", "Shuffled decks ready in the pool", lambda: {(): len(shuffler.pool)})
+metrics.collector(
+    "poker_hot_table_commands_per_second", f"Command rate of the {HOT_TABLES} busiest tables",
+    lambda: {(table_id,): rate for table_id, rate in hot_tables.items()}, ("table_id",)
+)
+metrics.collector(
+    "poker_hand_history_pending", "Finished hands not yet written to the hand history",
+    lambda: {(): len(hand_history.pending)} if hand_history is not None else {}
+)
+
+async def monitor():
+    """Probe event loop lag and refresh the busiest tables, forever"""
+    last_commands: Dict[str, int] = {}
+    window_start = time.monotonic()
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(LOOP_LAG_INTERVAL)
+        loop_lag_seconds.observe(max(0.0, time.perf_counter() - start - LOOP_LAG_INTERVAL))
+
+        now = time.monotonic()
+        if now - window_start < HOT_TABLE_WINDOW:
+            continue
+        elapsed, window_start = now - window_start, now
+        commands = {table_id: actor.commands for table_id, actor in actors.items()}
+        rates = [
+            (count - last_commands.get(table_id, 0), table_id)
+            for table_id, count in commands.items()
+            if count != last_commands.get(table_id, 0)
+        ]
+        rates.sort(reverse=True)
+        hot_tables.clear()
+        hot_tables.update((table_id, round(delta / elapsed, 2)) for delta, table_id in rates[:HOT_TABLES])
+        last_commands = commands
+
+@app.on_event("startup")
+async def start_monitoring():
+    global monitor_task
+    monitor_task = asyncio.create_task(monitor())
+
+@app.get("/metrics")
+async def get_metrics():
+    """Prometheus metrics"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/debug/profile")
+async def get_profile(
+    seconds: float = Query(5.0, gt=0, le=MAX_PROFILE_SECONDS),
+    interval_ms: float = Query(5.0, ge=1, le=100)
+):
+    """Sample the event loop thread for a while and return collapsed stacks (flame graph input)"""
+    global profiler
+    if not PROFILER_ENABLED:
+        raise HTTPException(status_code=404, detail="Profiler is disabled")
+    if profiler is not None and profiler.running:
+        raise HTTPException(status_code=409, detail="A profile is already being taken")
+
+    profiler = SamplingProfiler(threading.get_ident(), interval_ms / 1000)
+    profiler.start()
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        profiler.stop()
+    return PlainTextResponse(profiler.collapsed(), headers={"X-Profile-Samples": str(profiler.samples)})
+
+# ===== WebSocket Requests =====
+# Game requests over the socket run the same commands as the REST endpoints;
+# each is answered on the same connection with an "ack" or an "error" that
+# echoes its request_id
+
+class WsActionRequest(BaseModel):
+    request_id: Optional[str] = None
+    action: ActionType
+    amount: Optional[int] = 0
+
+class WsJoinRequest(BaseModel):
+    request_id: Optional[str] = None
+    player_name: str
+    is_bot: bool = False
+
+class WsStateRequest(BaseModel):
+    request_id: Optional[str] = None
+
+WS_REQUESTS = {
+    "action": WsActionRequest,
+    "join": WsJoinRequest,
+    "state": WsStateRequest
+}
+MALFORMED_REQUEST = "Malformed request: expected a JSON or MessagePack object"
+
+def ws_error(conn: Connection, request_id: Optional[str], status_code: int, detail) -> Frame:
+    """Encode an error reply to a WebSocket request"""
+    return encode_for(conn, {
+        "type": "error",
+        "request_id": request_id,
+        "status": status_code,
+        "detail": detail
+    })
+
+async def handle_ws_request(conn: Connection, request: dict) -> Frame:
+    """Run one typed WebSocket request for the connection's player and encode the reply"""
+    request_type = request["type"]
+    request_id = request.get("request_id")
+    try:
+        body = WS_REQUESTS[request_type].model_validate(request)
+    except ValidationError as e:
+        return ws_error(conn, request_id if isinstance(request_id, str) else None, 422, json.loads(e.json(include_url=False)))
+
+    table_id = conn.table_id
+    table = find_table(table_id)
+    if table is None:
+        return ws_error(conn, request_id, 404, "Table not found")
+    sync = table_syncs[table_id]
+
+    try:
+        if request_type == "action":
+            await actors[table_id].call(action_command, conn.player_id, body.action, body.amount or 0)
+        elif request_type == "join":
+            # The connection now belongs to the new player, who gets every event from now on
+            conn.player_id = await actors[table_id].call(join_command, body.player_name, body.is_bot)
+            if conn.spectator:
+                connections.promote(conn)
+                send_snapshot(conn, table)
+    except HTTPException as e:
+        return ws_error(conn, request_id, e.status_code, e.detail)
+
+    reply = {"type": "ack", "request_id": request_id, "version": sync.version}
+    if request_type == "join":
+        reply["player_id"] = conn.player_id
+        if body.is_bot:
+            reply["api_token"] = f"token_{conn.player_id}"
+    elif request_type == "state":
+        if conn.encoding == Encoding.MSGPACK:
+            reply["table_state"] = table.to_dict(viewing_player_id=conn.player_id)
+            return pack_message(reply, sync.aliases)
+        # Splice the cached state in without decoding it
+        text = encode_message(reply)
+        return text[:-1] + ',"table_state":' + sync.encoded(table, conn.player_id).decode() + '}'
+    return encode_for(conn, reply)
 
 # Mount static files
 app.mount("/static", StaticFiles(directory="static"), name="static")
@@ -0,0 +1,56 @@
+"""
+Reaper - deadline heap for expiring idle tables, seats and connections
+Activity only refreshes a timestamp on the object itself. When an entry's
+deadline passes, the reaper asks when the object really goes idle and either
+reclaims it or pushes the entry back at that time, so busy objects cost
+nothing per action and idle ones are found without scanning everything.
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import heapq
+import itertools
+
+# Per kind of object: when a key expires given its latest activity
+# (time.monotonic(), None if it is already gone), and how to reclaim it
+ExpiresAt = Callable[[Any, float], Optional[float]]
+Reclaim = Callable[[Any], None]
+Expiry = Tuple[ExpiresAt, Reclaim]
+
+class Reaper:
+    """Min-heap of (deadline, kind, key) entries, with one Expiry per kind"""
+
+    __slots__ = ("kinds", "heap", "sequence", "reclaimed")
+
+    def __init__(self, kinds: Dict[str, Expiry]):
+        self.kinds = kinds
+        self.heap: List[Tuple[float, int, str, Any]] = []
+        self.sequence = itertools.count()  # Tie-breaker, so keys are never compared
+        self.reclaimed: Dict[str, int] = {kind: 0 for kind in kinds}
+
+    def __len__(self) -> int:
+        return len(self.heap)
+
+    def schedule(self, kind: str, key: Any, deadline: float):
+        """Look at the object again at `deadline` (time.monotonic())"""
+        heapq.heappush(self.heap, (deadline, next(self.sequence), kind, key))
+
+    def run(self, now: float) -> int:
+        """Handle every entry that is due; returns how many objects were reclaimed"""
+        heap = self.heap
+        due = []
+        while heap and heap[0][0] <= now:
+            due.append(heapq.heappop(heap))
+
+        reclaimed = 0
+        for _, _, kind, key in due:
+            expires, reclaim = self.kinds[kind]
+            expires_at = expires(key, now)
+            if expires_at is None:
+                continue
+            if expires_at > now:
+                self.schedule(kind, key, expires_at)
+                continue
+            reclaim(key)
+            self.reclaimed[kind] += 1
+            reclaimed += 1
+        return reclaimed
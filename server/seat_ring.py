@@ -0,0 +1,126 @@
+"""
+Seat Ring - incremental turn order for one table
+Seat states are updated as players act, and the seats that can still act are
+kept in a linked ring, so finding the next player never rebuilds a list
+"""
+
+from enum import IntEnum
+from typing import Iterable, List
+
+class SeatState(IntEnum):
+    EMPTY = 0
+    SITTING_OUT = 1  # Seated but not dealt into the current hand
+    ACTIVE = 2       # In the hand and able to act
+    FOLDED = 3
+    ALL_IN = 4       # In the hand but has no chips left to act with
+
+class SeatRing:
+    """
+    Seat states plus a circular linked list of the ACTIVE seats
+
+    `owes` is a bitmask of the seats that still have to act in the current
+    betting round; the round is over when it is empty. A seat leaving the ring
+    keeps its `next` link (as in dancing links), so the turn can pass on from a
+    player who has just folded or gone all-in in O(1).
+    """
+
+    __slots__ = ("size", "state", "next", "prev", "active_mask", "can_act", "in_hand", "owes", "current")
+
+    def __init__(self, size: int):
+        self.size = size
+        self.state: List[SeatState] = [SeatState.EMPTY] * size
+        self.next: List[int] = list(range(size))
+        self.prev: List[int] = list(range(size))
+        self.active_mask = 0  # Bitmask of ACTIVE seats
+        self.can_act = 0      # Number of ACTIVE seats
+        self.in_hand = 0      # Number of ACTIVE and ALL_IN seats
+        self.owes = 0         # Bitmask of seats still to act this round
+        self.current = -1     # Seat to act, -1 between rounds and hands
+
+    # ===== Seating =====
+
+    def sit(self, seat: int):
+        """Seat a player; they sit out until the next deal"""
+        self.state[seat] = SeatState.SITTING_OUT
+
+    def deal_in(self, seats: Iterable[int]):
+        """Start a hand: the given seats become ACTIVE, every other occupied seat sits out"""
+        state = self.state
+        for seat in range(self.size):
+            if state[seat] != SeatState.EMPTY:
+                state[seat] = SeatState.SITTING_OUT
+
+        dealt = sorted(seats)
+        for i, seat in enumerate(dealt):
+            state[seat] = SeatState.ACTIVE
+            self.next[seat] = dealt[(i + 1) % len(dealt)]
+            self.prev[seat] = dealt[i - 1]
+
+        self.active_mask = sum(1 << seat for seat in dealt)
+        self.can_act = self.in_hand = len(dealt)
+        self.owes = 0
+        self.current = -1
+
+    def clear(self):
+        """End the hand without dealing a new one"""
+        self.deal_in(())
+
+    # ===== Hand Progress =====
+
+    def _unlink(self, seat: int, state: SeatState):
+        nxt = self.next[seat]
+        prv = self.prev[seat]
+        self.next[prv] = nxt
+        self.prev[nxt] = prv
+        self.state[seat] = state
+        self.active_mask &= ~(1 << seat)
+        self.owes &= ~(1 << seat)
+        self.can_act -= 1
+
+    def fold(self, seat: int):
+        """Take an ACTIVE seat out of the hand"""
+        self._unlink(seat, SeatState.FOLDED)
+        self.in_hand -= 1
+
+    def all_in(self, seat: int):
+        """Keep an ACTIVE seat in the hand without further actions"""
+        self._unlink(seat, SeatState.ALL_IN)
+
+    def acted(self, seat: int):
+        """Record that a seat has acted without raising"""
+        self.owes &= ~(1 << seat)
+
+    def reopen(self, seat: int):
+        """A bet or raise by `seat`: every other ACTIVE seat owes an action again"""
+        self.owes = self.active_mask & ~(1 << seat)
+
+    def first_active_after(self, seat: int) -> int:
+        """The first ACTIVE seat clockwise after `seat` (which may have any state), or -1"""
+        state = self.state
+        for offset in range(1, self.size + 1):
+            candidate = (seat + offset) % self.size
+            if state[candidate] == SeatState.ACTIVE:
+                return candidate
+        return -1
+
+    def start_round(self, after_seat: int):
+        """Open a betting round: every ACTIVE seat owes an action, starting after `after_seat`"""
+        self.owes = self.active_mask
+        self.current = self.first_active_after(after_seat) if self.owes else -1
+
+    def end_round(self):
+        """Close the betting round without further actions"""
+        self.owes = 0
+        self.current = -1
+
+    def advance(self) -> int:
+        """Pass the turn to the next seat that owes an action; -1 if the round is over"""
+        if not self.owes:
+            self.current = -1
+            return -1
+
+        seat = self.next[self.current]
+        while not self.owes >> seat & 1:
+            seat = self.next[seat]
+        self.current = seat
+        return seat
@@ -0,0 +1,524 @@
+"""
+Shard Router - one port in front of several poker server processes
+Each shard is a regular poker_server_full process on a Unix socket that hosts
+the tables the hash ring assigns to it. The router forwards table REST and
+WebSocket traffic to the owning shard, creates tables round-robin, and merges
+the lobby of every shard.
+
+    python shard_router.py --shards 4 --port 8000
+"""
+
+from fastapi import FastAPI, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.staticfiles import StaticFiles
+from fastapi.responses import HTMLResponse, Response
+from starlette.websockets import WebSocketState
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import glob
+import heapq
+import itertools
+import json
+import logging
+import re
+import multiprocessing
+import os
+import tempfile
+import time
+
+import httpx
+import orjson
+import websockets
+
+from lobby import MAX_LOBBY_PAGE, encode_cursor, summary_key
+from sharding import HashRing
+from table_store import TableStore
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+app = FastAPI(title="Poker Game Server (shard router)")
+
+# ===== Configuration =====
+
+SHARDS = int(os.environ.get("SHARDS", str(os.cpu_count() or 1)))
+SHARD_SOCKET_DIR = os.environ.get("SHARD_SOCKET_DIR", tempfile.gettempdir())
+HAND_HISTORY_DIR = os.environ.get("HAND_HISTORY_DIR", "")  # Each shard writes to its own subdirectory
+TABLE_STORE_PATH = os.environ.get("TABLE_STORE_PATH", "")  # Each shard writes to its own file next to it
+SHARD_START_TIMEOUT = 30.0
+SHARD_STOP_TIMEOUT = 30.0  # Shards flush their hand history and table snapshots when stopped
+UPSTREAM_TIMEOUT = 75.0  # Longer than the longest long-poll
+LOBBY_PING_INTERVAL = 30.0  # Keeps the router's lobby sockets inside the shards' heartbeat timeout
+
+# Headers that describe one hop rather than the message; httpx also undoes any content encoding
+HOP_HEADERS = {
+    "host", "connection", "keep-alive", "transfer-encoding", "content-length", "upgrade",
+    "accept-encoding", "content-encoding"
+}
+
+ring = HashRing(1)
+socket_paths: List[str] = []
+shard_clients: List[httpx.AsyncClient] = []
+shard_processes: List[multiprocessing.Process] = []
+create_order = itertools.cycle([0])  # Shards take turns creating tables
+
+# ===== Shard Processes =====
+
+def shard_store_path(index: int) -> str:
+    """The table store file of one shard: tables.db becomes tables.shard-N.db"""
+    root, ext = os.path.splitext(TABLE_STORE_PATH)
+    return f"{root}.shard-{index}{ext}"
+
+def run_shard(index: int, count: int, socket_path: str):
+    """Entry point of a shard process"""
+    os.environ["SHARD_INDEX"] = str(index)
+    os.environ["SHARD_COUNT"] = str(count)
+    if HAND_HISTORY_DIR:
+        # Each writer numbers its own files, so shards must not share a directory
+        os.environ["HAND_HISTORY_DIR"] = os.path.join(HAND_HISTORY_DIR, f"shard-{index}")
+    if TABLE_STORE_PATH:
+        # One SQLite writer per file
+        os.environ["TABLE_STORE_PATH"] = shard_store_path(index)
+
+    import uvicorn
+    uvicorn.run("poker_server_full:app", uds=socket_path, log_level="warning")
+
+def rebalance_table_stores(ring: HashRing):
+    """
+    Move stored tables into the file of the shard that now owns them, so a
+    change in the shard count neither strands tables nor leaves stale rows behind
+    """
+    root, ext = os.path.splitext(TABLE_STORE_PATH)
+    pattern = re.compile(re.escape(os.path.basename(root)) + r"\.shard-(\d+)" + re.escape(ext) + "$")
+    indexes = []
+    for path in glob.glob(f"{glob.escape(root)}.shard-*{ext}"):
+        match = pattern.match(os.path.basename(path))
+        if match:
+            indexes.append(int(match.group(1)))
+    stores = {index: TableStore(shard_store_path(index)) for index in set(indexes) | set(range(ring.shards))}
+    try:
+        revisions = {
+            index: {table_id: revision for table_id, revision, _, _ in store.index()}
+            for index, store in stores.items()
+        }
+        moved = 0
+        for index, store in stores.items():
+            moving: Dict[int, List[str]] = {}
+            for table_id in revisions[index]:
+                owner = ring.owner(table_id)
+                if owner != index:
+                    moving.setdefault(owner, []).append(table_id)
+            for owner, table_ids in moving.items():
+                # Keep whichever copy is newer if both files somehow hold the table
+                rows = [row for row in store.rows(table_ids) if revisions[owner].get(row[0], -1) < row[1]]
+                stores[owner].write(rows)
+                store.delete(table_ids)
+                moved += len(table_ids)
+        if moved:
+            logger.info(f"Moved {moved} stored tables to the shards that now own them")
+    finally:
+        for store in stores.values():
+            store.close()
+
+    # Files of shards that no longer exist are empty now
+    for index in indexes:
+        if index >= ring.shards:
+            for path in glob.glob(glob.escape(shard_store_path(index)) + "*"):
+                os.remove(path)
+
+async def wait_for_shards():
+    """Wait until every shard answers its health check"""
+    deadline = time.monotonic() + SHARD_START_TIMEOUT
+    for shard, client in enumerate(shard_clients):
+        while True:
+            try:
+                if (await client.get("/health")).status_code == 200:
+                    break
+            except httpx.TransportError:
+                pass
+            if not shard_processes[shard].is_alive() or time.monotonic() > deadline:
+                raise RuntimeError(f"Shard {shard} failed to start")
+            await asyncio.sleep(0.1)
+
+@app.on_event("startup")
+async def start_shards():
+    global ring, create_order
+    ring = HashRing(SHARDS)
+    create_order = itertools.cycle(range(SHARDS))
+    if TABLE_STORE_PATH:
+        # Before any shard opens its file
+        await asyncio.to_thread(rebalance_table_stores, ring)
+    context = multiprocessing.get_context("spawn")
+    for shard in range(SHARDS):
+        path = os.path.join(SHARD_SOCKET_DIR, f"poker-shard-{os.getpid()}-{shard}.sock")
+        if os.path.exists(path):
+            os.remove(path)
+        # Not a daemon: shards start their own equity worker processes
+        process = context.Process(target=run_shard, args=(shard, SHARDS, path), name=f"shard-{shard}")
+        process.start()
+        socket_paths.append(path)
+        shard_processes.append(process)
+        shard_clients.append(httpx.AsyncClient(
+            transport=httpx.AsyncHTTPTransport(uds=path),
+            base_url=f"http://shard-{shard}",
+            timeout=UPSTREAM_TIMEOUT
+        ))
+    await wait_for_shards()
+    logger.info(f"Started {SHARDS} shards")
+
+@app.on_event("shutdown")
+async def stop_shards():
+    for client in shard_clients:
+        await client.aclose()
+    for process in shard_processes:
+        process.terminate()
+    for process in shard_processes:
+        await asyncio.to_thread(process.join, SHARD_STOP_TIMEOUT)
+        if process.is_alive():
+            process.kill()
+    for path in socket_paths:
+        if os.path.exists(path):
+            os.remove(path)
+
+# ===== Forwarding =====
+
+async def forward(shard: int, request: Request, path: Optional[str] = None) -> Response:
+    """Send the request to a shard and relay its response"""
+    url = path or request.url.path
+    if request.url.query:
+        url += "?" + request.url.query
+    try:
+        upstream = await shard_clients[shard].request(
+            request.method,
+            url,
+            headers=[(name, value) for name, value in request.headers.items() if name not in HOP_HEADERS],
+            content=await request.body()
+        )
+    except httpx.TransportError:
+        raise HTTPException(status_code=503, detail="Shard unavailable")
+    headers = {name: value for name, value in upstream.headers.items() if name not in HOP_HEADERS}
+    return Response(content=upstream.content, status_code=upstream.status_code, headers=headers)
+
+async def shard_get(shard: int, path: str, params: str = "") -> Tuple[int, Any]:
+    """(status code, decoded JSON body) of a GET on one shard"""
+    try:
+        response = await shard_clients[shard].get(path, params=params)
+    except httpx.TransportError:
+        raise HTTPException(status_code=503, detail="Shard unavailable")
+    return response.status_code, response.json()
+
+async def every_shard(path: str, params: str = "") -> List[Tuple[int, Any]]:
+    return await asyncio.gather(*(shard_get(shard, path, params) for shard in range(len(shard_clients))))
+
+# ===== API Endpoints =====
+
+@app.get("/")
+async def root():
+    """Redirect to static HTML"""
+    return HTMLResponse(content=open("static/index.html").read())
+
+@app.get("/health")
+async def health_check():
+    """Totals over every shard, and each shard's own health"""
+    shards = []
+    for shard in range(len(shard_clients)):
+        try:
+            status, body = await shard_get(shard, "/health")
+        except HTTPException:
+            status, body = 503, {"status": "unreachable"}
+        shards.append(body if status == 200 else {"status": "unreachable"})
+    healthy = [body for body in shards if body.get("status") == "healthy"]
+    return {
+        "status": "healthy" if len(healthy) == len(shards) else "degraded",
+        "shards": len(shards),
+        "tables": sum(body["tables"] for body in healthy),
+        "cold_tables": sum(body["cold_tables"] for body in healthy),
+        "active_connections": sum(body["active_connections"] for body in healthy),
+        "lobby_connections": sum(body["lobby_connections"] for body in healthy),
+        "per_shard": shards
+    }
+
+@app.get("/api/tables")
+async def list_tables(
+    request: Request,
+    small_blind: Optional[int] = Query(None),
+    min_seats: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=MAX_LOBBY_PAGE)
+):
+    """One lobby page merged from every shard's page; cursors work the same as on one server"""
+    pages = await every_shard("/api/tables", request.url.query)
+    for status, body in pages:
+        if status != 200:
+            raise HTTPException(status_code=status, detail=body.get("detail"))
+
+    # Every shard orders its page the same way, so the first `limit` of the merge is the page
+    by_seats = small_blind is None and min_seats > 0
+    merged = heapq.merge(*(body["tables"] for _, body in pages), key=lambda s: summary_key(s, by_seats))
+    page = list(itertools.islice(merged, limit + 1))
+    more = len(page) > limit or any(body["next_cursor"] for _, body in pages)
+    page = page[:limit]
+    return {
+        "tables": page,
+        "next_cursor": encode_cursor(summary_key(page[-1], by_seats)) if more and page else None,
+        "total": sum(body["total"] for _, body in pages)
+    }
+
+@app.get("/api/lobby/find-seat")
+async def find_seat(request: Request, small_blind: Optional[int] = Query(None)):
+    """The best table of every shard's best table"""
+    replies = await every_shard("/api/lobby/find-seat", request.url.query)
+    for status, body in replies:
+        if status not in (200, 404):
+            raise HTTPException(status_code=status, detail=body.get("detail"))
+    found = [body for status, body in replies if status == 200]
+    if not found:
+        raise HTTPException(status_code=404, detail="No open seat")
+    return min(found, key=lambda s: summary_key(s, by_seats=small_blind is None))
+
+@app.post("/api/tables")
+async def create_table(request: Request):
+    """Create a table on the next shard, or on any other shard below its table limit"""
+    first = next(create_order)
+    for offset in range(len(shard_clients)):
+        response = await forward((first + offset) % len(shard_clients), request)
+        if response.status_code != 503:
+            break
+    return response
+
+@app.get("/api/tables/{table_id}")
+async def get_table(table_id: str, request: Request):
+    return await forward(ring.owner(table_id), request)
+
+@app.api_route("/api/tables/{table_id}/{rest:path}", methods=["GET", "POST"])
+async def table_request(table_id: str, rest: str, request: Request):
+    """Join, action, equity and any other table endpoint go to the table's shard"""
+    return await forward(ring.owner(table_id), request)
+
+@app.get("/shards/{shard}/{path:path}")
+async def shard_request(shard: int, path: str, request: Request):
+    """One shard's own endpoints, e.g. /shards/0/metrics"""
+    if not 0 <= shard < len(shard_clients):
+        raise HTTPException(status_code=404, detail="Shard not found")
+    return await forward(shard, request, "/" + path)
+
+# ===== WebSocket Proxy =====
+
+def relay_close_code(code: Optional[int]) -> int:
+    """A close code that may be sent on, for one received from a shard"""
+    if code is None or code == 1006:
+        return 1011  # The shard went away
+    return 1000 if code == 1005 else code
+
+async def open_upstream(websocket: WebSocket, shard: int, path: str):
+    """Connect to a shard's WebSocket; closes the client and returns None on failure"""
+    try:
+        return await websockets.unix_connect(socket_paths[shard], f"ws://shard-{shard}{path}", max_size=None)
+    except websockets.InvalidStatusCode:
+        await websocket.close(code=1013)  # The shard refused it, e.g. at MAX_CONNECTIONS
+    except (OSError, websockets.WebSocketException):
+        await websocket.close(code=1011)
+    return None
+
+@app.websocket("/ws/lobby")
+async def lobby_websocket(websocket: WebSocket, small_blind: Optional[int] = Query(None)):
+    """Every shard's lobby socket merged into one snapshot and one stream of updates"""
+    query = "" if small_blind is None else f"?small_blind={small_blind}"
+    upstreams = []
+    for shard in range(len(socket_paths)):
+        upstream = await open_upstream(websocket, shard, "/ws/lobby" + query)
+        if upstream is None:
+            for opened in upstreams:
+                await opened.close()
+            return
+        upstreams.append(upstream)
+    await websocket.accept()
+
+    # Shard messages and client messages are handled in arrival order by this task
+    inbox: asyncio.Queue = asyncio.Queue()
+
+    async def read_shard(shard: int, upstream):
+        try:
+            async for message in upstream:
+                await inbox.put((shard, message))
+        except websockets.ConnectionClosed:
+            pass
+        await inbox.put((shard, None))
+
+    async def read_client():
+        try:
+            while True:
+                await inbox.put((None, await websocket.receive_text()))
+        except WebSocketDisconnect:
+            await inbox.put((None, None))
+
+    async def ping_shards():
+        while True:
+            await asyncio.sleep(LOBBY_PING_INTERVAL)
+            for upstream in upstreams:
+                await upstream.send("ping")
+
+    tasks = [asyncio.create_task(read_shard(shard, upstream)) for shard, upstream in enumerate(upstreams)]
+    tasks += [asyncio.create_task(read_client()), asyncio.create_task(ping_shards())]
+    merge = LobbyMerge(len(upstreams))
+    try:
+        while True:
+            shard, data = await inbox.get()
+            if data is None:
+                if shard is not None:
+                    await websocket.close(code=1011)
+                break
+            if shard is None:
+                if data == "ping":
+                    await websocket.send_text("pong")
+                elif is_snapshot_request(data):
+                    await resync_lobby(merge, upstreams)
+                continue
+            try:
+                message = json.loads(data)
+            except ValueError:
+                continue  # "pong"
+            if not isinstance(message, dict):
+                continue
+            outgoing = merge.receive(shard, message)
+            if outgoing is None:
+                await resync_lobby(merge, upstreams)
+                continue
+            for out in outgoing:
+                await websocket.send_text(orjson.dumps(out).decode())
+    except (WebSocketDisconnect, RuntimeError, websockets.ConnectionClosed):
+        pass
+    finally:
+        for task in tasks:
+            task.cancel()
+        for upstream in upstreams:
+            await upstream.close()
+
+def is_snapshot_request(data: str) -> bool:
+    try:
+        request = json.loads(data)
+    except ValueError:
+        return False
+    return isinstance(request, dict) and request.get("type") == "snapshot"
+
+async def resync_lobby(merge: "LobbyMerge", upstreams: list):
+    """Ask every shard for a new snapshot and send the client one merged snapshot"""
+    merge.resync()
+    for upstream in upstreams:
+        await upstream.send('{"type": "snapshot"}')
+
+class LobbyMerge:
+    """
+    Turns several shards' lobby streams into one
+
+    The client sees one snapshot, then updates with the router's own
+    version numbers, so its usual base_version check works unchanged.
+    """
+
+    __slots__ = ("version", "shard_versions", "pending", "snapshots", "buffered")
+
+    def __init__(self, shards: int):
+        self.version = 0
+        self.shard_versions = [0] * shards
+        self.pending = set(range(shards))  # Shards whose snapshot is still to come
+        self.snapshots: Dict[int, List[Dict[str, Any]]] = {}
+        self.buffered: List[Dict[str, Any]] = []  # Updates that arrived after their shard's snapshot
+
+    def resync(self):
+        self.pending = set(range(len(self.shard_versions)))
+        self.snapshots = {}
+        self.buffered = []
+
+    def receive(self, shard: int, message: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+        """Messages to send the client; None if the shard's stream has a gap and needs a resync"""
+        kind = message.get("type")
+        if kind == "lobby_snapshot":
+            self.shard_versions[shard] = message["version"]
+            if shard not in self.pending:
+                return []
+            self.snapshots[shard] = message["tables"]
+            self.pending.discard(shard)
+            if self.pending:
+                return []
+            self.version += 1
+            # Each shard's snapshot is ordered by blind, like a single server's
+            tables = list(heapq.merge(*self.snapshots.values(), key=summary_key))
+            outgoing = [{"type": "lobby_snapshot", "version": self.version, "tables": tables}]
+            outgoing += [self._renumber(update) for update in self.buffered]
+            self.snapshots, self.buffered = {}, []
+            return outgoing
+
+        if kind != "lobby_update":
+            return []
+        missed = message["base_version"] > self.shard_versions[shard]
+        self.shard_versions[shard] = message["version"]
+        if missed:
+            return None
+        if shard in self.pending:
+            return []  # The shard's snapshot comes after this update, so it already includes it
+        if self.pending:
+            self.buffered.append(message)
+            return []
+        return [self._renumber(message)]
+
+    def _renumber(self, update: Dict[str, Any]) -> Dict[str, Any]:
+        self.version += 1
+        return {**update, "version": self.version, "base_version": self.version - 1}
+
+@app.websocket("/ws/{table_id}/{player_id}")
+async def table_websocket(websocket: WebSocket, table_id: str, player_id: str):
+    """Relay the table socket to and from the table's shard"""
+    path = websocket.url.path + ("?" + websocket.url.query if websocket.url.query else "")
+    upstream = await open_upstream(websocket, ring.owner(table_id), path)
+    if upstream is None:
+        return
+    await websocket.accept()
+
+    async def to_client():
+        try:
+            async for message in upstream:
+                if isinstance(message, str):
+                    await websocket.send_text(message)
+                else:
+                    await websocket.send_bytes(message)
+        except (websockets.ConnectionClosed, RuntimeError):
+            pass
+
+    async def to_shard():
+        try:
+            while True:
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    return
+                await upstream.send(message["text"] if message.get("text") is not None else message["bytes"])
+        except (websockets.ConnectionClosed, RuntimeError):
+            pass
+
+    tasks = [asyncio.create_task(to_client()), asyncio.create_task(to_shard())]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await upstream.close()
+        if websocket.client_state == WebSocketState.CONNECTED:
+            try:
+                await websocket.close(code=relay_close_code(upstream.close_code))
+            except RuntimeError:
+                pass
+
+# Mount static files
+app.mount("/static", StaticFiles(directory="static"), name="static")
+
+# ===== Main =====
+
+if __name__ == "__main__":
+    import argparse
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Run the poker server as several shard processes behind one port")
+    parser.add_argument("--shards", type=int, default=SHARDS, help="Number of shard processes")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+
+    SHARDS = args.shards
+    uvicorn.run(app, host=args.host, port=args.port)
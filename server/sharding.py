@@ -0,0 +1,37 @@
+"""
+Sharding - consistent hashing of table IDs onto worker processes
+Each shard owns many points on a hash ring and a table belongs to the shard
+owning the first point at or after the table's hash. Changing the number of
+shards only moves the tables between the old and new points.
+"""
+
+from bisect import bisect_left
+from hashlib import blake2b
+from typing import List
+
+VIRTUAL_NODES = 128  # Points per shard; more points spread tables more evenly
+
+def ring_hash(key: str) -> int:
+    return int.from_bytes(blake2b(key.encode(), digest_size=8).digest(), "big")
+
+class HashRing:
+    """Maps table IDs to shard indexes 0..shards-1"""
+
+    __slots__ = ("shards", "points", "owners")
+
+    def __init__(self, shards: int, virtual_nodes: int = VIRTUAL_NODES):
+        self.shards = shards
+        ring = sorted(
+            (ring_hash(f"shard-{shard}:{point}"), shard)
+            for shard in range(shards)
+            for point in range(virtual_nodes)
+        )
+        self.points: List[int] = [point for point, _ in ring]
+        self.owners: List[int] = [shard for _, shard in ring]
+
+    def owner(self, table_id: str) -> int:
+        """The shard a table lives on"""
+        if self.shards == 1:
+            return 0
+        i = bisect_left(self.points, ring_hash(table_id))
+        return self.owners[i if i < len(self.points) else 0]
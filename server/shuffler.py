@@ -0,0 +1,124 @@
+"""
+Shuffler - pool of pre-shuffled decks drawn from a CSPRNG
+Entropy is read from os.urandom in bulk and turned into Fisher-Yates swaps by
+rejection sampling, so every permutation is equally likely. A background
+thread keeps the pool topped up, so starting a hand only pops a ready deck.
+A seeded shuffler is deterministic for tests and simulations.
+"""
+
+from collections import deque
+from typing import Callable, Deque, Iterator, List, Optional, Union
+import logging
+import os
+import random
+import threading
+import time
+
+from cards import DECK_SIZE
+
+logger = logging.getLogger(__name__)
+
+ENTROPY_CHUNK = 4096  # Bytes read from the entropy source at a time (~70 decks)
+
+class Shuffler:
+    """Hands out uniformly permuted 52-card decks as bytes"""
+
+    def __init__(self, pool_size: int = 256, seed: Optional[Union[float, str]] = None):
+        self.pool_size = pool_size
+        self.pool: Deque[bytes] = deque()
+        self.seed = seed
+        read: Callable[[int], bytes] = os.urandom if seed is None else random.Random(seed).randbytes
+        self.entropy = self._stream(read)
+        self.lock = threading.Lock()  # Guards the entropy stream, shared by the worker and inline shuffles
+        self.wanted = threading.Event()
+        self.stopped = False
+        self.thread: Optional[threading.Thread] = None
+        self.shuffled = 0
+        self.misses = 0  # Decks shuffled inline because the pool was empty
+        self.busy_seconds = 0.0
+
+    @staticmethod
+    def _stream(read: Callable[[int], bytes]) -> Iterator[int]:
+        while True:
+            yield from read(ENTROPY_CHUNK)
+
+    @property
+    def shuffles_per_second(self) -> float:
+        """Decks one thread can shuffle per second, measured so far"""
+        return self.shuffled / self.busy_seconds if self.busy_seconds else 0.0
+
+    def start(self):
+        """Fill the pool from a background thread; without it every deck is shuffled inline"""
+        self.stopped = False
+        self.thread = threading.Thread(target=self._run, name="shuffler", daemon=True)
+        self.thread.start()
+        self.wanted.set()
+
+    def stop(self):
+        self.stopped = True
+        self.wanted.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def take(self) -> bytes:
+        """A freshly permuted deck"""
+        pool = self.pool
+        try:
+            deck = pool.popleft()
+        except IndexError:
+            if self.thread is not None:
+                self.misses += 1
+            return self.shuffle(1)[0]
+        if len(pool) < self.pool_size // 2:
+            self.wanted.set()
+        return deck
+
+    def shuffle(self, count: int) -> List[bytes]:
+        """Permute `count` new decks"""
+        decks = []
+        with self.lock:
+            start = time.perf_counter()
+            entropy = self.entropy
+            for _ in range(count):
+                cards = bytearray(range(DECK_SIZE))
+                for i in range(DECK_SIZE - 1, 0, -1):
+                    n = i + 1
+                    limit = 256 - 256 % n  # Bytes at or above this would favour low indices
+                    b = next(entropy)
+                    while b >= limit:
+                        b = next(entropy)
+                    j = b % n
+                    cards[i], cards[j] = cards[j], cards[i]
+                decks.append(bytes(cards))
+            self.shuffled += count
+            self.busy_seconds += time.perf_counter() - start
+        return decks
+
+    def _run(self):
+        pool = self.pool
+        while True:
+            self.wanted.wait()
+            self.wanted.clear()
+            if self.stopped:
+                return
+            try:
+                while len(pool) < self.pool_size and not self.stopped:
+                    pool.extend(self.shuffle(min(32, self.pool_size - len(pool))))
+            except Exception:
+                logger.exception("Deck shuffler failed")
+
+# Used by every table unless it is given its own (e.g. a seeded one)
+secure_shuffler = Shuffler()
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Deck shuffler benchmark")
+    parser.add_argument("--decks", type=int, default=100_000, help="Number of decks to shuffle")
+    parser.add_argument("--seed", type=float, default=None, help="Use a seeded generator instead of os.urandom")
+    args = parser.parse_args()
+
+    shuffler = Shuffler(seed=args.seed)
+    shuffler.shuffle(args.decks)
+    print(f"{shuffler.shuffles_per_second:,.0f} shuffles/sec ({'seeded' if args.seed is not None else 'os.urandom'})")
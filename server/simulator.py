@@ -0,0 +1,322 @@
+"""
+Simulator - headless multi-process hand simulation
+Drives PokerTable.perform_action directly with in-process strategies,
+spread across a process pool, and streams aggregate results.
+
+    python simulator.py --strategies bot,call,tight,random --hands 1000000
+"""
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Type
+import json
+import logging
+import os
+import random
+import time
+
+from poker_game import ActionType, GamePhase, Player, PokerTable
+from shuffler import Shuffler
+
+STARTING_STACK = 1000
+MAX_ACTIONS_PER_HAND = 500
+
+# ===== Strategies =====
+
+class Strategy:
+    """
+    Base class for in-process strategies
+
+    decide() gets the live table and the acting player. Strategies must only
+    read their own player's cards; other players' cards are not hidden here.
+    """
+
+    name = "base"
+
+    def __init__(self, rng: random.Random):
+        self.rng = rng
+
+    def decide(self, table: PokerTable, player: Player) -> Tuple[ActionType, int]:
+        raise NotImplementedError
+
+class CallingStation(Strategy):
+    """Always checks or calls"""
+
+    name = "call"
+
+    def decide(self, table: PokerTable, player: Player) -> Tuple[ActionType, int]:
+        if player.current_bet < table.current_bet:
+            return ActionType.CALL, 0
+        return ActionType.CHECK, 0
+
+class RandomStrategy(Strategy):
+    """Picks a legal-looking action uniformly at random"""
+
+    name = "random"
+
+    def decide(self, table: PokerTable, player: Player) -> Tuple[ActionType, int]:
+        if player.current_bet < table.current_bet:
+            action = self.rng.choice((ActionType.FOLD, ActionType.CALL, ActionType.RAISE))
+        else:
+            action = self.rng.choice((ActionType.CHECK, ActionType.BET))
+        if action == ActionType.RAISE:
+            return action, table.current_bet + table.big_blind
+        if action == ActionType.BET:
+            return action, table.big_blind
+        return action, 0
+
+class BotStrategy(Strategy):
+    """Same heuristic as clients/python/poker_bot.py PokerBot.decide_action"""
+
+    name = "bot"
+
+    def decide(self, table: PokerTable, player: Player) -> Tuple[ActionType, int]:
+        need_to_call = table.current_bet - player.current_bet
+
+        if need_to_call == 0:
+            if self.rng.random() < 0.3:
+                return ActionType.BET, min(table.small_blind * 2, player.chips)
+            return ActionType.CHECK, 0
+
+        call_ratio = need_to_call / player.chips if player.chips > 0 else 1.0
+        if call_ratio > 0.5:
+            return (ActionType.FOLD, 0) if self.rng.random() < 0.7 else (ActionType.CALL, 0)
+        if call_ratio > 0.2:
+            return (ActionType.FOLD, 0) if self.rng.random() < 0.4 else (ActionType.CALL, 0)
+        if self.rng.random() < 0.8:
+            return ActionType.CALL, 0
+        raise_amount = table.current_bet + min(table.small_blind * 2, player.chips - need_to_call)
+        return ActionType.RAISE, raise_amount
+
+class TightStrategy(Strategy):
+    """Plays pairs and high cards preflop, then bets made hands"""
+
+    name = "tight"
+
+    def decide(self, table: PokerTable, player: Player) -> Tuple[ActionType, int]:
+        need_to_call = table.current_bet - player.current_bet
+        high, low = sorted((c >> 2 for c in player.cards), reverse=True)
+
+        if table.phase == GamePhase.PRE_FLOP:
+            strong = high == low or low >= 8 or (high == 12 and low >= 6)
+        else:
+            board_ranks = {c >> 2 for c in table.community_cards}
+            strong = high == low or high in board_ranks or low in board_ranks
+
+        if not strong:
+            return (ActionType.FOLD, 0) if need_to_call else (ActionType.CHECK, 0)
+        if need_to_call == 0:
+            return ActionType.BET, table.big_blind * 2
+        if need_to_call <= player.chips // 4:
+            return ActionType.CALL, 0
+        return ActionType.FOLD, 0
+
+STRATEGIES: Dict[str, Type[Strategy]] = {
+    cls.name: cls for cls in (CallingStation, RandomStrategy, BotStrategy, TightStrategy)
+}
+
+def register_strategy(cls: Type[Strategy]) -> Type[Strategy]:
+    """Register a strategy class by its name (usable as a decorator)"""
+    STRATEGIES[cls.name] = cls
+    return cls
+
+# ===== Table Driver =====
+
+class SimulatedTable(PokerTable):
+    """PokerTable that records each hand's result and reloads busted stacks"""
+
+    __slots__ = ("starting_stack", "hand_start_stacks", "results", "rebuys")
+
+    def __init__(self, table_id: str, starting_stack: int, small_blind: int):
+        self.starting_stack = starting_stack
+        self.hand_start_stacks: Dict[str, int] = {}
+        self.results: Dict[str, List[int]] = {}  # player_id -> [net chips, hands won, hands played]
+        self.rebuys: Dict[str, int] = {}
+        super().__init__(table_id, max_players=10, small_blind=small_blind)
+
+    def start_new_hand(self):
+        """Record the finished hand, reload busted players, then deal the next one"""
+        for pid, start in self.hand_start_stacks.items():
+            net = self.players[pid].chips - start
+            result = self.results[pid]
+            result[0] += net
+            result[1] += net > 0
+            result[2] += 1
+
+        for player in self.players.values():
+            if player.chips < self.big_blind:
+                player.chips = self.starting_stack
+                self.rebuys[player.id] += 1
+
+        super().start_new_hand()
+        self.hand_start_stacks = {pid: p.chips + p.total_bet for pid, p in self.players.items()}
+
+    def add_player(self, player: Player) -> bool:
+        player.chips = self.starting_stack
+        self.results[player.id] = [0, 0, 0]
+        self.rebuys[player.id] = 0
+        return super().add_player(player)
+
+    def refund_hand(self):
+        """Give back every bet of a stalled hand and deal a new one"""
+        for player in self.players.values():
+            player.chips += player.total_bet
+            player.total_bet = 0
+        self.pot = 0
+        self.hand_start_stacks = {}
+        super().start_new_hand()
+        self.hand_start_stacks = {pid: p.chips + p.total_bet for pid, p in self.players.items()}
+
+def _fallback_action(table: PokerTable, player: Player) -> ActionType:
+    if player.current_bet < table.current_bet:
+        return ActionType.CALL
+    return ActionType.CHECK
+
+def simulate_chunk(
+    strategy_names: Sequence[str],
+    hands: int,
+    seed: Optional[int] = None,
+    starting_stack: int = STARTING_STACK,
+    small_blind: int = 5
+) -> Dict[str, object]:
+    """Play `hands` hands at one table in this process and return raw totals"""
+    logging.getLogger("poker_game").setLevel(logging.WARNING)
+    rng = random.Random(seed)
+
+    table = SimulatedTable("sim", starting_stack, small_blind)
+    table.shuffler = Shuffler(seed=rng.random())
+    strategies: Dict[str, Strategy] = {}
+    for seat, name in enumerate(strategy_names):
+        pid = f"seat{seat}"
+        strategies[pid] = STRATEGIES[name](random.Random(rng.random()))
+        table.add_player(Player(pid, f"{name}-{seat}", is_bot=True))
+    # Players after the first two joined mid-hand, so deal a clean first hand
+    table.refund_hand()
+
+    actions = invalid = stalled = 0
+    first_hand = table.hand_number
+    start = time.perf_counter()
+
+    while table.hand_number - first_hand < hands:
+        hand = table.hand_number
+        for _ in range(MAX_ACTIONS_PER_HAND):
+            pid = table.get_current_player_id()
+            player = table.players[pid]
+            action, amount = strategies[pid].decide(table, player)
+            actions += 1
+            if not table.perform_action(pid, action, amount):
+                invalid += 1
+                table.perform_action(pid, _fallback_action(table, player))
+            if table.hand_number != hand:
+                break
+        else:
+            stalled += 1
+            table.refund_hand()
+
+    return {
+        "hands": hands,
+        "actions": actions,
+        "invalid_actions": invalid,
+        "stalled_hands": stalled,
+        "elapsed": time.perf_counter() - start,
+        "seats": [
+            {
+                "strategy": strategy_names[seat],
+                "net_chips": table.results[f"seat{seat}"][0],
+                "hands_won": table.results[f"seat{seat}"][1],
+                "hands_played": table.results[f"seat{seat}"][2],
+                "rebuys": table.rebuys[f"seat{seat}"]
+            }
+            for seat in range(len(strategy_names))
+        ]
+    }
+
+# ===== Process Pool Runner =====
+
+def _merge(total: Dict[str, object], chunk: Dict[str, object]):
+    for key in ("hands", "actions", "invalid_actions", "stalled_hands"):
+        total[key] += chunk[key]
+    total["cpu_seconds"] += chunk["elapsed"]
+    for seat, result in zip(total["seats"], chunk["seats"]):
+        for key in ("net_chips", "hands_won", "hands_played", "rebuys"):
+            seat[key] += result[key]
+
+def _summary(total: Dict[str, object], started: float, big_blind: int) -> Dict[str, object]:
+    elapsed = time.perf_counter() - started
+    summary = {key: total[key] for key in ("hands", "actions", "invalid_actions", "stalled_hands")}
+    summary["elapsed"] = round(elapsed, 3)
+    summary["hands_per_sec"] = round(total["hands"] / elapsed, 1) if elapsed > 0 else 0.0
+    summary["seats"] = [
+        {
+            **seat,
+            "win_rate": round(seat["hands_won"] / seat["hands_played"], 4) if seat["hands_played"] else 0.0,
+            "bb_per_100": round(100 * seat["net_chips"] / big_blind / seat["hands_played"], 2) if seat["hands_played"] else 0.0
+        }
+        for seat in total["seats"]
+    ]
+    return summary
+
+def iter_simulation(
+    strategy_names: Sequence[str],
+    hands: int,
+    workers: Optional[int] = None,
+    chunk_size: int = 20_000,
+    seed: Optional[int] = None,
+    starting_stack: int = STARTING_STACK,
+    small_blind: int = 5
+) -> Iterator[Dict[str, object]]:
+    """Run hands across a process pool, yielding the running aggregate after each chunk"""
+    unknown = [name for name in strategy_names if name not in STRATEGIES]
+    if unknown:
+        raise ValueError(f"Unknown strategies: {', '.join(unknown)}")
+    if not 2 <= len(strategy_names) <= 10:
+        raise ValueError("Need 2 to 10 strategies")
+
+    rng = random.Random(seed)
+    chunks = [min(chunk_size, hands - done) for done in range(0, hands, chunk_size)]
+    total = {
+        "hands": 0, "actions": 0, "invalid_actions": 0, "stalled_hands": 0, "cpu_seconds": 0.0,
+        "seats": [
+            {"strategy": name, "net_chips": 0, "hands_won": 0, "hands_played": 0, "rebuys": 0}
+            for name in strategy_names
+        ]
+    }
+    started = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        futures = [
+            pool.submit(simulate_chunk, list(strategy_names), n, rng.getrandbits(64), starting_stack, small_blind)
+            for n in chunks
+        ]
+        for future in as_completed(futures):
+            _merge(total, future.result())
+            yield _summary(total, started, small_blind * 2)
+
+def run_simulation(strategy_names: Sequence[str], hands: int, **kwargs) -> Dict[str, object]:
+    """Run a full simulation and return the final aggregate"""
+    summary = {}
+    for summary in iter_simulation(strategy_names, hands, **kwargs):
+        pass
+    return summary
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Headless poker hand simulator")
+    parser.add_argument("--strategies", default="bot,call,tight,random",
+                        help=f"Comma separated seats, available: {', '.join(STRATEGIES)}")
+    parser.add_argument("--hands", type=int, default=100_000, help="Total hands to play")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--chunk", type=int, default=20_000, help="Hands per work unit")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for reproducible runs")
+    parser.add_argument("--json", action="store_true", help="Print each aggregate as a JSON line")
+    args = parser.parse_args()
+
+    for summary in iter_simulation(args.strategies.split(","), args.hands, args.workers, args.chunk, args.seed):
+        if args.json:
+            print(json.dumps(summary), flush=True)
+            continue
+        print(f"{summary['hands']:>10,} hands  {summary['hands_per_sec']:>10,.0f} hands/sec  "
+              f"stalled {summary['stalled_hands']}  invalid {summary['invalid_actions']}", flush=True)
+        for seat in summary["seats"]:
+            print(f"    {seat['strategy']:<8} net {seat['net_chips']:>+10}  "
+                  f"{seat['bb_per_100']:>+8.2f} bb/100  win {seat['win_rate']:.1%}  rebuys {seat['rebuys']}")
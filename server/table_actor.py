@@ -0,0 +1,140 @@
+"""
+Table Actor - serialized command processing for one table
+Every mutation of a table runs as a command from the actor's inbox, in
+arrival order, and each drained batch of commands produces one broadcast
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import asyncio
+import logging
+import time
+
+from poker_game import PokerTable
+
+logger = logging.getLogger(__name__)
+
+# Most commands handled before a broadcast, so a flood of commands still
+# produces regular updates
+MAX_BATCH = 64
+
+# A command gets the table and its arguments and returns (result, event);
+# the event (or None) goes into the batch's broadcast
+Command = Callable[..., Tuple[Any, Optional[Dict[str, Any]]]]
+
+class TableActor:
+    """Owns one table's inbox; callers await results through futures"""
+
+    __slots__ = (
+        "table", "inbox", "on_batch", "task", "changed", "waiting", "commands", "batches", "last_active"
+    )
+
+    def __init__(self, table: PokerTable, on_batch: Callable[[PokerTable, List[Dict[str, Any]]], None]):
+        self.table = table
+        self.inbox: asyncio.Queue = asyncio.Queue()
+        self.on_batch = on_batch  # Broadcasts the events of one drained batch
+        self.task: Optional[asyncio.Task] = None
+        self.changed = asyncio.Condition()  # Notified after every batch
+        self.waiting = 0  # Requests parked in wait_for_revision
+        self.commands = 0
+        self.batches = 0
+        self.last_active = time.monotonic()  # When the last batch ran
+
+    def start(self):
+        """Start processing the inbox if it is not running (needs a running event loop)"""
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self.run())
+
+    def stop(self, error: Optional[BaseException] = None):
+        """
+        Stop processing; queued commands are never run and their callers get
+        `error` (a RuntimeError by default) instead of waiting forever
+        """
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+        while not self.inbox.empty():
+            _, _, future = self.inbox.get_nowait()
+            if future is not None and not future.done():
+                future.set_exception(error or RuntimeError(f"Table {self.table.id} was closed"))
+
+    async def call(self, command: Command, *args) -> Any:
+        """Queue a command and wait for its result; exceptions it raises are re-raised here"""
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        self.inbox.put_nowait((command, args, future))
+        return await future
+
+    def send(self, command: Command, *args):
+        """Queue a command without waiting for it; errors are logged"""
+        self.start()
+        self.inbox.put_nowait((command, args, None))
+
+    def publish(self, event: Dict[str, Any]):
+        """Queue an event that changes nothing, keeping it in order with the commands"""
+        self.send(_publish, event)
+
+    async def wait_for_revision(self, revision: int, timeout: float) -> bool:
+        """Wait until the table's revision differs from `revision`; False if it timed out"""
+        if self.table.revision != revision:
+            return True
+
+        self.waiting += 1
+        try:
+            async with self.changed:
+                await asyncio.wait_for(
+                    self.changed.wait_for(lambda: self.table.revision != revision),
+                    timeout
+                )
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self.waiting -= 1
+
+    async def run(self):
+        """Drain the inbox in batches until stopped"""
+        while True:
+            batch = [await self.inbox.get()]
+            while len(batch) < MAX_BATCH:
+                try:
+                    batch.append(self.inbox.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+
+            events: List[Dict[str, Any]] = []
+            for item in batch:
+                self._execute(item, events)
+
+            self.batches += 1
+            self.last_active = time.monotonic()
+            if events:
+                try:
+                    self.on_batch(self.table, events)
+                except Exception:
+                    logger.exception(f"Broadcast failed for table {self.table.id}")
+
+            if self.waiting:
+                async with self.changed:
+                    self.changed.notify_all()
+
+    def _execute(self, item, events: List[Dict[str, Any]]):
+        command, args, future = item
+        self.commands += 1
+        if future is not None and future.cancelled():
+            return
+        try:
+            result, event = command(self.table, *args)
+        except Exception as e:
+            if future is not None:
+                future.set_exception(e)
+            else:
+                logger.exception(f"Command failed for table {self.table.id}")
+            return
+
+        if event is not None:
+            events.append(event)
+        if future is not None:
+            future.set_result(result)
+
+def _publish(table: PokerTable, event: Dict[str, Any]):
+    return None, event
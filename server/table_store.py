@@ -0,0 +1,213 @@
+"""
+Table Store - periodic snapshots of live tables for warm restarts
+Tables that changed since their last snapshot are written to SQLite (WAL
+mode) in one transaction; on startup recent tables are restored at once and
+the rest are rehydrated the first time they are requested
+"""
+
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import sqlite3
+import threading
+import time
+
+import orjson
+
+from lobby import table_summary
+from poker_game import ActionType, GamePhase, HandRecord, Player, PokerTable
+from seat_ring import SeatState
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tables (
+    table_id TEXT PRIMARY KEY,
+    revision INTEGER NOT NULL,
+    updated_at REAL NOT NULL,
+    summary BLOB NOT NULL,
+    data BLOB NOT NULL
+)
+"""
+
+# ===== Serialization =====
+
+def table_to_snapshot(table: PokerTable) -> Dict[str, Any]:
+    """Everything needed to resume a table, including the hand in progress"""
+    ring = table.seats
+    record = table.record
+    return {
+        "id": table.id,
+        "max_players": table.max_players,
+        "small_blind": table.small_blind,
+        "big_blind": table.big_blind,
+        "pot": table.pot,
+        "current_bet": table.current_bet,
+        "community_cards": table.community_cards,
+        "phase": table.phase,
+        "dealer_position": table.dealer_position,
+        "created_at": table.created_at.isoformat(),
+        "last_action": table.last_action,
+        "hand_number": table.hand_number,
+        "revision": table.revision,
+        "leaving": sorted(table.leaving),
+        "actions_taken": table.actions_taken,
+        "players": [
+            {
+                "id": p.id,
+                "name": p.name,
+                "chips": p.chips,
+                "current_bet": p.current_bet,
+                "total_bet": p.total_bet,
+                "cards": p.cards,
+                "folded": p.folded,
+                "is_bot": p.is_bot,
+                "all_in": p.all_in,
+                "time_bank": p.time_bank,
+                "timed_out": p.timed_out
+            }
+            for p in (table.players[pid] for pid in table.player_order)
+        ],
+        "seats": {
+            "state": [int(state) for state in ring.state],
+            "next": ring.next,
+            "prev": ring.prev,
+            "active_mask": ring.active_mask,
+            "can_act": ring.can_act,
+            "in_hand": ring.in_hand,
+            "owes": ring.owes,
+            "current": ring.current
+        },
+        "deck": {"cards": list(table.deck.cards), "position": table.deck.position},
+        "record": None if record is None else {
+            "hand_number": record.hand_number,
+            "started_at": record.started_at,
+            "dealer": record.dealer,
+            "seats": record.seats,
+            "actions": record.actions
+        }
+    }
+
+def table_from_snapshot(data: Dict[str, Any]) -> PokerTable:
+    """Rebuild a table from table_to_snapshot() output"""
+    table = PokerTable(data["id"], data["max_players"], data["small_blind"])
+    table.big_blind = data["big_blind"]
+    table.pot = data["pot"]
+    table.current_bet = data["current_bet"]
+    table.community_cards = data["community_cards"]
+    table.phase = GamePhase(data["phase"])
+    table.dealer_position = data["dealer_position"]
+    table.created_at = datetime.fromisoformat(data["created_at"])
+    table.hand_number = data["hand_number"]
+    table.revision = data["revision"]
+    table.leaving = set(data["leaving"])
+    table.actions_taken = data["actions_taken"]
+
+    last_action = data["last_action"]
+    if last_action is not None:
+        last_action["action"] = ActionType(last_action["action"])
+    table.last_action = last_action
+
+    for entry in data["players"]:
+        player = Player(entry["id"], entry["name"], entry["is_bot"])
+        for field in ("chips", "current_bet", "total_bet", "cards", "folded", "all_in", "time_bank", "timed_out"):
+            setattr(player, field, entry[field])
+        table.players[player.id] = player
+        table.player_order.append(player.id)
+
+    ring = table.seats
+    seats = data["seats"]
+    ring.state = [SeatState(state) for state in seats["state"]]
+    for field in ("next", "prev", "active_mask", "can_act", "in_hand", "owes", "current"):
+        setattr(ring, field, seats[field])
+
+    deck = data["deck"]
+    table.deck.cards = bytearray(deck["cards"])
+    table.deck.position = deck["position"]
+
+    record = data["record"]
+    if record is not None:
+        table.record = HandRecord(
+            table.id, record["hand_number"], record["started_at"], table.small_blind,
+            table.big_blind, record["dealer"], [tuple(seat) for seat in record["seats"]]
+        )
+        table.record.actions = [(seat, ActionType(action), amount) for seat, action, amount in record["actions"]]
+    return table
+
+# ===== Store =====
+
+class TableStore:
+    """SQLite store of table snapshots; writes happen on a worker thread"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute(SCHEMA)
+        self.lock = threading.Lock()  # One statement at a time on the shared connection
+        self.saved: Dict[str, int] = {}  # table_id -> revision last written
+        self.snapshots_written = 0
+
+    def collect(self, tables: Iterable[PokerTable]) -> List[Tuple[str, int, float, bytes, bytes]]:
+        """Encode the tables that changed since their last snapshot (cheap enough for the event loop)"""
+        now = time.time()
+        return [
+            (table.id, table.revision, now, orjson.dumps(table_summary(table)), orjson.dumps(table_to_snapshot(table)))
+            for table in tables
+            if self.saved.get(table.id) != table.revision
+        ]
+
+    def write(self, rows: List[Tuple[str, int, float, bytes, bytes]]):
+        """Upsert collected snapshots in one transaction"""
+        if not rows:
+            return
+        with self.lock:
+            self.db.execute("BEGIN")
+            try:
+                self.db.executemany(
+                    "INSERT OR REPLACE INTO tables (table_id, revision, updated_at, summary, data) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    rows
+                )
+                self.db.execute("COMMIT")
+            except Exception:
+                self.db.execute("ROLLBACK")
+                raise
+        for table_id, revision, _, _, _ in rows:
+            self.saved[table_id] = revision
+        self.snapshots_written += len(rows)
+
+    def index(self) -> List[Tuple[str, int, float, Dict[str, Any]]]:
+        """(table_id, revision, updated_at, summary) of every stored table"""
+        with self.lock:
+            rows = self.db.execute("SELECT table_id, revision, updated_at, summary FROM tables").fetchall()
+        return [(table_id, revision, updated_at, orjson.loads(summary)) for table_id, revision, updated_at, summary in rows]
+
+    def rows(self, table_ids: List[str]) -> List[Tuple[str, int, float, bytes, bytes]]:
+        """Stored rows as write() takes them, for copying tables between stores"""
+        with self.lock:
+            return [
+                row for table_id in table_ids
+                for row in self.db.execute(
+                    "SELECT table_id, revision, updated_at, summary, data FROM tables WHERE table_id = ?", (table_id,)
+                ).fetchall()
+            ]
+
+    def load(self, table_id: str) -> Optional[PokerTable]:
+        """Rehydrate one stored table"""
+        with self.lock:
+            row = self.db.execute("SELECT data FROM tables WHERE table_id = ?", (table_id,)).fetchone()
+        if row is None:
+            return None
+        table = table_from_snapshot(orjson.loads(row[0]))
+        self.saved[table.id] = table.revision
+        return table
+
+    def delete(self, table_ids: List[str]):
+        """Forget tables"""
+        with self.lock:
+            self.db.executemany("DELETE FROM tables WHERE table_id = ?", [(table_id,) for table_id in table_ids])
+        for table_id in table_ids:
+            self.saved.pop(table_id, None)
+
+    def close(self):
+        with self.lock:
+            self.db.close()
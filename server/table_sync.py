@@ -0,0 +1,222 @@
+"""
+Table Sync - versioned public table state, delta encoding and encoded state cache
+Each broadcast carries only what changed since the previous version, plus the
+hole cards of the players whose cards changed for them alone, and repeated
+reads of an unchanged table are served from pre-encoded JSON bytes. The latest
+broadcasts are kept, by sequence number, for clients resuming a session.
+Players get integer aliases, which MessagePack clients see instead of IDs.
+Spectators follow a second, coalesced feed that skips the versions in between.
+"""
+
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+import time
+
+import orjson
+
+from cards import cards_to_str
+from codec import Frames
+from poker_game import PokerTable
+
+# Player fields compared between versions ("id" identifies the player)
+PLAYER_FIELDS = ("name", "chips", "current_bet", "cards", "folded", "is_bot", "all_in", "time_bank")
+
+def diff_states(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Describe how to turn public state `old` into `new`
+
+    Changed top-level fields are copied as-is. Community cards are sent as
+    "community_cards_added" when the board only grew. Player changes go in
+    "players" (id -> changed fields), new players in "players_added" and
+    departed ones in "players_removed"; "player_order" is sent when seating changes.
+    """
+    delta: Dict[str, Any] = {}
+
+    for key, value in new.items():
+        if key in ("players", "community_cards"):
+            continue
+        if old.get(key) != value:
+            delta[key] = value
+
+    old_board = old.get("community_cards", [])
+    new_board = new["community_cards"]
+    if new_board != old_board:
+        if new_board[:len(old_board)] == old_board:
+            delta["community_cards_added"] = new_board[len(old_board):]
+        else:
+            delta["community_cards"] = new_board
+
+    old_players = {p["id"]: p for p in old.get("players", [])}
+    new_players = {p["id"]: p for p in new["players"]}
+    changed = {}
+    added = []
+    for pid, player in new_players.items():
+        previous = old_players.get(pid)
+        if previous is None:
+            added.append(player)
+            continue
+        fields = {f: player[f] for f in PLAYER_FIELDS if player[f] != previous[f]}
+        if fields:
+            changed[pid] = fields
+    removed = [pid for pid in old_players if pid not in new_players]
+
+    if changed:
+        delta["players"] = changed
+    if added:
+        delta["players_added"] = added
+    if removed:
+        delta["players_removed"] = removed
+    if list(old_players) != list(new_players):
+        delta["player_order"] = list(new_players)
+
+    return delta
+
+# A broadcast as sent: its sequence number and its frames
+SentEvent = Tuple[int, Frames]
+
+class TableSync:
+    """Tracks the last broadcast public state of one table and its version"""
+
+    __slots__ = (
+        "version", "state", "table_revision", "cache", "cache_revision", "hole_cards", "private",
+        "seq", "events", "aliases", "new_aliases", "spectator_state", "spectator_version"
+    )
+
+    def __init__(self, event_buffer: int = 64):
+        self.version = 0
+        self.state: Dict[str, Any] = {}
+        self.table_revision = -1  # PokerTable.revision that self.state was taken at
+        self.hole_cards: Dict[str, List[int]] = {}  # player_id -> cards as of self.version
+        self.private: Dict[str, Dict[str, Any]] = {}  # player_id -> overlay for the latest version
+        # Sequence numbers start at the clock in microseconds, so numbers a client
+        # kept from before a restart are never mistaken for this process's events
+        self.seq = time.time_ns() // 1000
+        self.events: Deque[SentEvent] = deque(maxlen=event_buffer)
+        # Never reused while the table is live, so replayed events keep their meaning
+        self.aliases: Dict[str, int] = {}  # player_id -> alias
+        self.new_aliases: Dict[str, int] = {}  # Aliases given out in the latest version
+        self.spectator_state: Dict[str, Any] = {}  # Public state as of the last spectator update
+        self.spectator_version = -1  # Version of spectator_state; -1 until the first spectator
+        self.cache: Dict[Optional[str], bytes] = {}  # viewer -> encoded to_dict()
+        self.cache_revision = -1  # PokerTable.revision the cache entries belong to
+
+    def update(self, table: PokerTable) -> Optional[Dict[str, Any]]:
+        """
+        Capture the table's public state and return the delta message fields,
+        or None if nothing changed since the last version
+
+        self.private then holds a {"cards": [...]} overlay for each player
+        whose hole cards changed in the new version, and self.new_aliases the
+        aliases of players seen for the first time.
+        """
+        if table.revision == self.table_revision:
+            return None
+        self.table_revision = table.revision
+
+        state = table.to_dict()
+        delta = diff_states(self.state, state)
+        if not delta:
+            return None
+
+        base_version = self.version
+        self.version += 1
+        self.state = state
+
+        hole_cards = self.hole_cards
+        aliases = self.aliases
+        self.private = {}
+        self.new_aliases = {}
+        for player_id, player in table.players.items():
+            if hole_cards.get(player_id, []) != player.cards:
+                hole_cards[player_id] = list(player.cards)
+                self.private[player_id] = {"cards": cards_to_str(player.cards)}
+            if player_id not in aliases:
+                aliases[player_id] = self.new_aliases[player_id] = len(aliases) + 1
+        if len(hole_cards) > len(table.players):
+            self.hole_cards = {pid: cards for pid, cards in hole_cards.items() if pid in table.players}
+        return {
+            "version": self.version,
+            "base_version": base_version,
+            "delta": delta
+        }
+
+    def next_seq(self) -> int:
+        """Number the next broadcast"""
+        self.seq += 1
+        return self.seq
+
+    def remember(self, seq: int, frames: Frames):
+        """Keep a sent broadcast for resuming clients, dropping the oldest"""
+        self.events.append((seq, frames))
+
+    def events_since(self, seq: int) -> Optional[List[SentEvent]]:
+        """
+        The broadcasts after `seq`, or None if they are no longer all buffered
+        (or `seq` is not from this table's stream) and the client needs a snapshot
+        """
+        if seq == self.seq:
+            return []
+        events = self.events
+        if seq > self.seq or not events or events[0][0] > seq + 1:
+            return None
+        return [event for event in events if event[0] > seq]
+
+    def spectator_update(self) -> Optional[Dict[str, Any]]:
+        """
+        The delta message fields from what spectators last got to the latest
+        version, or None if they are up to date; they then count as sent
+        """
+        if self.spectator_version < 0 or self.spectator_version == self.version:
+            return None
+        update = {
+            "version": self.version,
+            "base_version": self.spectator_version,
+            "delta": diff_states(self.spectator_state, self.state)
+        }
+        self.spectator_state = self.state
+        self.spectator_version = self.version
+        return update
+
+    def spectator_snapshot(self, table: PokerTable, catch_up: bool = False) -> Dict[str, Any]:
+        """
+        Public state message at the spectators' version, so the next coalesced
+        update applies to it; catch_up first moves them to the latest version
+        (for when no other spectator is waiting on an update)
+        """
+        self.update(table)
+        if catch_up or self.spectator_version < 0:
+            self.spectator_state = self.state
+            self.spectator_version = self.version
+        return {
+            "type": "snapshot",
+            "version": self.spectator_version,
+            "table_state": self.spectator_state
+        }
+
+    def encoded(self, table: PokerTable, viewing_player_id: Optional[str] = None) -> bytes:
+        """
+        table.to_dict(viewing_player_id) as JSON bytes, cached until the table changes
+
+        Viewers who are not seated see the public state, so the cache holds at
+        most one entry per seat plus one public entry.
+        """
+        if table.revision != self.cache_revision:
+            self.cache.clear()
+            self.cache_revision = table.revision
+
+        viewer = viewing_player_id if viewing_player_id in table.players else None
+        data = self.cache.get(viewer)
+        if data is None:
+            data = orjson.dumps(table.to_dict(viewing_player_id=viewer))
+            self.cache[viewer] = data
+        return data
+
+    def snapshot(self, table: PokerTable, viewing_player_id: Optional[str] = None) -> Dict[str, Any]:
+        """Full state message for a client that is starting out or has detected a gap"""
+        self.update(table)
+        return {
+            "type": "snapshot",
+            "version": self.version,
+            "seq": self.seq,
+            "table_state": table.to_dict(viewing_player_id=viewing_player_id)
+        }
@@ -0,0 +1,53 @@
+"""
+Shared test setup
+The server modules use flat imports from server/, and the tests never write
+hand history or table snapshots unless a test configures them.
+"""
+
+import os
+import random
+import sys
+
+# The servers expect to run from server/ (flat imports, static/ next to them)
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVER_DIR)
+os.chdir(SERVER_DIR)
+os.environ["HAND_HISTORY_DIR"] = ""
+os.environ["TABLE_STORE_PATH"] = ""
+
+import pytest
+
+from poker_game import ActionType, Player, PokerTable
+from shuffler import Shuffler
+
+def _make_table(players: int = 3, seed: str = "tests", history=None) -> PokerTable:
+    """A table with a seeded deck and `players` seated players (the first hand starts at two)"""
+    table = PokerTable("table-1", 6, 5)
+    table.shuffler = Shuffler(4, seed)
+    table.history = history
+    for i in range(players):
+        table.add_player(Player(f"p{i}", f"Player {i}"))
+    return table
+
+def _play(table: PokerTable, actions: int, seed: int = 0):
+    """Make `actions` random legal moves, calling when a random one is rejected"""
+    rng = random.Random(seed)
+    for _ in range(actions):
+        player_id = table.get_current_player_id()
+        if player_id is None:
+            return
+        action = rng.choice((ActionType.CHECK, ActionType.CALL, ActionType.CALL, ActionType.RAISE, ActionType.FOLD))
+        if not table.perform_action(player_id, action, table.current_bet + table.big_blind * rng.randint(1, 4)):
+            assert table.perform_action(player_id, ActionType.CALL)
+
+@pytest.fixture
+def make_table():
+    return _make_table
+
+@pytest.fixture
+def table() -> PokerTable:
+    return _make_table()
+
+@pytest.fixture
+def play():
+    return _play
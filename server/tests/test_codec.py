@@ -0,0 +1,73 @@
+import json
+
+import msgpack
+import pytest
+
+from codec import Encoding, Frames, alias_ids, decode_request, encode_message, pack_message, with_private
+
+MESSAGE = {
+    "type": "player_action",
+    "player_id": "alice",
+    "version": 3,
+    "delta": {
+        "current_player_id": "bob",
+        "player_order": ["alice", "bob", "carol"],
+        "players": {"bob": {"chips": 990, "id": "bob"}}
+    }
+}
+ALIASES = {"alice": 0, "bob": 1}
+
+def test_encode_message_is_compact_json():
+    text = encode_message({"a": 1, "b": "♠"})
+    assert text == '{"a":1,"b":"♠"}'
+
+def test_alias_ids_replaces_known_ids_only():
+    aliased = alias_ids(MESSAGE, ALIASES)
+    assert aliased["player_id"] == 0
+    assert aliased["delta"]["current_player_id"] == 1
+    assert aliased["delta"]["player_order"] == [0, 1, "carol"]
+    assert aliased["delta"]["players"] == {1: {"chips": 990, "id": 1}}
+    assert MESSAGE["player_id"] == "alice"  # The original is left alone
+
+def test_pack_message_sends_new_aliases():
+    data = msgpack.unpackb(pack_message(MESSAGE, ALIASES, {"bob": 1}), strict_map_key=False)
+    assert data["player_id"] == 0
+    assert data["aliases"] == {"bob": 1}
+
+@pytest.mark.parametrize("fields", [1, 14, 15, 16, 300])
+def test_with_private_msgpack_map_sizes(fields):
+    message = {f"k{i}": i for i in range(fields)}
+    overlay = msgpack.packb({"cards": ["A♠", "K♠"]})
+    spliced = msgpack.unpackb(with_private(msgpack.packb(message), overlay))
+    assert spliced == {**message, "private": {"cards": ["A♠", "K♠"]}}
+
+def test_with_private_json():
+    spliced = with_private(encode_message({"type": "x"}), encode_message({"cards": []}))
+    assert json.loads(spliced) == {"type": "x", "private": {"cards": []}}
+    assert with_private("{}", None) == "{}"
+
+def test_frames_encode_once_per_form():
+    frames = Frames(MESSAGE, full_message={"type": "full"}, aliases=ALIASES)
+    text, size = frames.shared(Encoding.JSON)
+    assert frames.shared(Encoding.JSON)[0] is text
+    assert size == len(text.encode())
+    assert json.loads(frames.shared(Encoding.JSON, full_state=True)[0]) == {"type": "full"}
+    data, _ = frames.shared(Encoding.MSGPACK)
+    assert msgpack.unpackb(data, strict_map_key=False)["player_id"] == 0
+    assert len(frames.encoded) == 3
+
+def test_frames_private_overlay_only_for_its_player():
+    frames = Frames({"type": "deal"}, private={"alice": {"cards": ["A♠", "K♠"]}})
+    assert json.loads(frames.frame(Encoding.JSON, False, "alice"))["private"] == {"cards": ["A♠", "K♠"]}
+    assert "private" not in json.loads(frames.frame(Encoding.JSON, False, "bob"))
+    assert msgpack.unpackb(frames.frame(Encoding.MSGPACK, False, "alice"))["private"] == {"cards": ["A♠", "K♠"]}
+
+def test_decode_request():
+    assert decode_request('{"type": "ping"}', None) == {"type": "ping"}
+    assert decode_request(None, msgpack.packb({"type": "ping"})) == {"type": "ping"}
+    assert decode_request("{not json", None) is None
+    assert decode_request(None, b"\xc1") is None
+
+def test_decode_request_rejects_deep_nesting():
+    assert decode_request("[" * 100000, None) is None
+    assert decode_request(None, b"\x91" * 100000) is None
@@ -0,0 +1,67 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from cards import card_from_str
+from equity import count_outcomes, estimate_equity, evaluate_batch
+from hand_evaluator import evaluate, evaluate7
+
+def cards(text: str):
+    return [card_from_str(c) for c in text.split()]
+
+def test_evaluate_batch_matches_evaluator():
+    rng = np.random.default_rng(3)
+    hands = np.argsort(rng.random((2000, 52)), axis=1)[:, :7]
+    expected = [evaluate7(*hand) for hand in hands.tolist()]
+    assert evaluate_batch(hands).tolist() == expected
+
+def test_evaluate_batch_five_cards():
+    hands = np.array([cards("2♥ 7♥ 9♥ J♥ K♥"), cards("A♠ 2♥ 3♦ 4♣ 5♠")])
+    assert evaluate_batch(hands).tolist() == [evaluate(hand) for hand in hands.tolist()]
+
+def test_count_outcomes():
+    assert count_outcomes(45, 1, 1) == 45 * 44 * 43 // 2
+    assert count_outcomes(46, 0, 2) == (46 * 45 // 2) * (44 * 43 // 2)
+
+def test_river_is_exact():
+    hole, board = cards("A♠ A♥"), cards("2♣ 7♦ J♥ 9♠ 4♣")
+    result = estimate_equity(hole, board)
+    assert result["exact"]
+    assert result["samples"] == count_outcomes(45, 0, 1)
+
+    # Brute force: every opponent hand against the set board
+    deck = [c for c in range(52) if c not in hole + board]
+    hero = evaluate(hole + board)
+    wins = ties = 0
+    for opponent in itertools.combinations(deck, 2):
+        villain = evaluate(list(opponent) + board)
+        wins += hero > villain
+        ties += hero == villain
+    assert result["win"] == pytest.approx(wins / result["samples"])
+    assert result["tie"] == pytest.approx(ties / result["samples"])
+
+def test_turn_exact_equity_is_a_probability():
+    result = estimate_equity(cards("K♠ Q♠"), cards("2♠ 7♠ J♥ 9♦"))
+    assert result["exact"]
+    assert 0 < result["equity"] < 1
+    assert result["win"] + result["tie"] <= 1
+
+def test_preflop_monte_carlo_is_seeded():
+    first = estimate_equity(cards("A♠ A♥"), iterations=10_000, time_budget=60.0, seed=1)
+    second = estimate_equity(cards("A♠ A♥"), iterations=10_000, time_budget=60.0, seed=1)
+    assert not first["exact"]
+    assert first["samples"] == 10_000
+    assert first["equity"] == second["equity"]
+    # Pocket aces win about 85% heads-up
+    assert first["equity"] == pytest.approx(0.85, abs=0.02)
+
+@pytest.mark.parametrize("hole, board, opponents", [
+    ("A♠", "", 1),
+    ("A♠ K♠", "2♣ 7♦", 1),
+    ("A♠ A♠", "", 1),
+    ("A♠ K♠", "", 0),
+])
+def test_rejects_bad_input(hole, board, opponents):
+    with pytest.raises(ValueError):
+        estimate_equity(cards(hole), cards(board) if board else [], opponents)
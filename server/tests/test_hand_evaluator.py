@@ -0,0 +1,68 @@
+import itertools
+import random
+
+import pytest
+
+from cards import card_from_str
+from hand_evaluator import (
+    FLUSH, FOUR_OF_A_KIND, FULL_HOUSE, HIGH_CARD, ONE_PAIR, STRAIGHT, STRAIGHT_FLUSH, THREE_OF_A_KIND,
+    TWO_PAIR, award_pots, best_hands, evaluate, evaluate7, hand_category, hand_name
+)
+
+def cards(text: str):
+    return [card_from_str(c) for c in text.split()]
+
+@pytest.mark.parametrize("hand, category", [
+    ("2♠ 7♥ 9♦ J♣ K♠", HIGH_CARD),
+    ("2♠ 2♥ 9♦ J♣ K♠", ONE_PAIR),
+    ("2♠ 2♥ 9♦ 9♣ K♠", TWO_PAIR),
+    ("2♠ 2♥ 2♦ J♣ K♠", THREE_OF_A_KIND),
+    ("A♠ 2♥ 3♦ 4♣ 5♠", STRAIGHT),
+    ("10♠ J♥ Q♦ K♣ A♠", STRAIGHT),
+    ("2♥ 7♥ 9♥ J♥ K♥", FLUSH),
+    ("2♠ 2♥ 2♦ K♣ K♠", FULL_HOUSE),
+    ("2♠ 2♥ 2♦ 2♣ K♠", FOUR_OF_A_KIND),
+    ("A♦ 2♦ 3♦ 4♦ 5♦", STRAIGHT_FLUSH),
+])
+def test_categories(hand, category):
+    assert hand_category(evaluate(cards(hand))) == category
+
+def test_names():
+    assert hand_name(evaluate(cards("2♠ 2♥ 2♦ K♣ K♠"))) == "Full House"
+
+def test_wheel_loses_to_six_high_straight():
+    assert evaluate(cards("A♠ 2♥ 3♦ 4♣ 5♠")) < evaluate(cards("2♥ 3♦ 4♣ 5♠ 6♠"))
+
+def test_kickers_break_ties():
+    assert evaluate(cards("A♠ A♥ K♦ 7♣ 3♠")) > evaluate(cards("A♦ A♣ Q♦ J♣ 9♠"))
+    assert evaluate(cards("A♠ A♥ K♦ 7♣ 3♠")) == evaluate(cards("A♦ A♣ K♠ 7♦ 3♥"))
+
+def test_seven_cards_use_best_five():
+    assert evaluate(cards("2♥ 7♥ 9♥ J♥ K♥ K♠ K♦")) == evaluate(cards("2♥ 7♥ 9♥ J♥ K♥"))
+
+def test_evaluate7_matches_best_subset():
+    rng = random.Random(7)
+    for _ in range(300):
+        hand = rng.sample(range(52), 7)
+        best = max(evaluate(subset) for subset in itertools.combinations(hand, 5))
+        assert evaluate7(*hand) == evaluate(hand) == best
+
+def test_evaluate_rejects_wrong_sizes():
+    with pytest.raises(ValueError):
+        evaluate(cards("2♠ 7♥ 9♦ J♣"))
+
+def test_award_pots_splits_side_pots():
+    # c is all-in for 50 with the best hand; a beats b for the side pot
+    contributions = {"a": 100, "b": 100, "c": 50, "d": 30}
+    strengths = {"a": 2, "b": 1, "c": 3}
+    payouts = award_pots(contributions, strengths, ["a", "b", "c", "d"])
+    assert payouts == {"a": 100, "b": 0, "c": 180}
+    assert sum(payouts.values()) == sum(contributions.values())
+
+def test_award_pots_gives_odd_chips_in_seat_order():
+    payouts = award_pots({"a": 5, "b": 5, "c": 1}, {"a": 1, "b": 1}, ["b", "a", "c"])
+    assert payouts == {"a": 5, "b": 6}
+
+def test_best_hands():
+    assert sorted(best_hands({"a": 3, "b": 5, "c": 5})) == ["b", "c"]
+    assert best_hands({}) == []
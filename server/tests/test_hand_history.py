@@ -0,0 +1,87 @@
+import os
+
+import pytest
+
+from hand_history import (
+    HandHistoryWriter, decode_record, encode_record, find_hand, iter_file, iter_hands, log_sequences, replay
+)
+from poker_game import GamePhase
+
+@pytest.fixture
+def records(make_table, play):
+    """Twenty finished hands from one table, with every player's stack when each hand ended"""
+    records = []
+    stacks = []
+
+    def history(record):
+        records.append(record)
+        stacks.append({pid: player.chips for pid, player in table.players.items()})
+
+    table = make_table(history=history)
+    while len(records) < 20:
+        play(table, 1, seed=len(records) * 1000 + table.actions_taken)
+    return list(zip(records, stacks))
+
+def fields(record):
+    return (
+        record.table_id, record.hand_number, record.started_at, record.small_blind, record.big_blind,
+        record.dealer, record.seats, record.cards, record.board, record.actions, [tuple(p) for p in record.payouts]
+    )
+
+def test_encode_decode_round_trip(records):
+    for record, _ in records:
+        frame = encode_record(record)
+        assert fields(decode_record(memoryview(frame)[8:])) == fields(record)
+
+def test_writer_rotates_and_reader_streams_in_order(tmp_path, records):
+    # The writer thread never wakes up on its own here, so flushing one hand at a time is safe
+    writer = HandHistoryWriter(str(tmp_path), max_file_size=1024, flush_interval=3600)
+    for record, _ in records:
+        writer.append(record)
+        writer.flush()
+    writer.close()
+    assert writer.stats()["hands_written"] == len(records)
+    assert len(log_sequences(str(tmp_path))) > 1
+
+    logged = list(iter_hands(str(tmp_path)))
+    assert [fields(r) for r in logged] == [fields(r) for r, _ in records]
+    assert list(iter_hands(str(tmp_path), "other-table")) == []
+    assert find_hand(str(tmp_path), "table-1", records[5][0].hand_number).hand_number == records[5][0].hand_number
+
+def test_writer_skips_only_the_hand_that_cannot_be_encoded(tmp_path, records):
+    bad = decode_record(memoryview(encode_record(records[1][0]))[8:])
+    bad.small_blind = -5
+    writer = HandHistoryWriter(str(tmp_path), flush_interval=3600)
+    for record in (records[0][0], bad, records[2][0]):
+        writer.append(record)
+    writer.close()
+    logged = list(iter_hands(str(tmp_path)))
+    assert [fields(r) for r in logged] == [fields(records[0][0]), fields(records[2][0])]
+    assert writer.stats()["hands_written"] == 2
+
+def test_reader_stops_at_torn_frame(tmp_path, records):
+    path = tmp_path / "hands-000001.log"
+    frames = [encode_record(record) for record, _ in records[:3]]
+    path.write_bytes(b"".join(frames)[:-5])
+    assert len(list(iter_file(str(path)))) == 2
+
+def test_new_writer_starts_a_new_file(tmp_path, records):
+    for _ in range(2):
+        writer = HandHistoryWriter(str(tmp_path))
+        writer.append(records[0][0])
+        writer.close()
+    assert log_sequences(str(tmp_path)) == [1, 2]
+    assert os.path.getsize(tmp_path / "hands-000002.log") > 0
+
+def test_replay_ends_with_the_recorded_stacks(records):
+    for record, stacks in records:
+        table = replay(record)
+        assert table.phase == GamePhase.SHOWDOWN
+        for player_id, _, _ in record.seats:
+            assert table.players[player_id].chips == stacks[player_id]
+
+def test_replay_stops_after_steps(records):
+    record = next(record for record, _ in records if len(record.actions) >= 3)
+    table = replay(record, 2)
+    assert table.actions_taken == 2
+    assert table.phase != GamePhase.SHOWDOWN or len(record.actions) == 2
@@ -0,0 +1,74 @@
+from seat_ring import SeatRing, SeatState
+
+def ring_with(seated, size: int = 6) -> SeatRing:
+    ring = SeatRing(size)
+    for seat in seated:
+        ring.sit(seat)
+    ring.deal_in(seated)
+    return ring
+
+def test_deal_in_links_dealt_seats():
+    ring = SeatRing(6)
+    for seat in (0, 2, 4, 5):
+        ring.sit(seat)
+    ring.deal_in([0, 2, 5])
+    assert ring.state[4] == SeatState.SITTING_OUT
+    assert ring.state[1] == SeatState.EMPTY
+    assert [ring.next[s] for s in (0, 2, 5)] == [2, 5, 0]
+    assert [ring.prev[s] for s in (0, 2, 5)] == [5, 0, 2]
+    assert ring.can_act == ring.in_hand == 3
+    assert ring.active_mask == 0b100101
+
+def test_round_ends_when_everyone_acted():
+    ring = ring_with([0, 1, 2])
+    ring.start_round(0)
+    assert ring.current == 1
+    ring.acted(1)
+    assert ring.advance() == 2
+    ring.acted(2)
+    assert ring.advance() == 0
+    ring.acted(0)
+    assert ring.advance() == -1
+    assert ring.current == -1
+
+def test_raise_reopens_the_round():
+    ring = ring_with([0, 1, 2])
+    ring.start_round(2)
+    ring.acted(0)
+    assert ring.advance() == 1
+    ring.reopen(1)
+    assert ring.owes == 0b101
+    assert ring.advance() == 2
+    ring.acted(2)
+    assert ring.advance() == 0
+    ring.acted(0)
+    assert ring.advance() == -1
+
+def test_turn_passes_on_from_folded_seat():
+    ring = ring_with([0, 1, 2, 3])
+    ring.start_round(3)
+    ring.fold(0)
+    assert ring.state[0] == SeatState.FOLDED
+    assert ring.advance() == 1
+    ring.all_in(1)
+    assert ring.advance() == 2
+    assert ring.can_act == 2
+    assert ring.in_hand == 3
+    assert ring.next[3] == 2 and ring.prev[2] == 3
+
+def test_first_active_after_skips_inactive_seats():
+    ring = ring_with([1, 4])
+    assert ring.first_active_after(1) == 4
+    assert ring.first_active_after(4) == 1
+    ring.fold(4)
+    assert ring.first_active_after(1) == 1
+    ring.clear()
+    assert ring.first_active_after(0) == -1
+
+def test_start_round_with_nobody_to_act():
+    ring = ring_with([0, 1])
+    ring.all_in(0)
+    ring.all_in(1)
+    ring.start_round(0)
+    assert ring.current == -1
+    assert ring.advance() == -1
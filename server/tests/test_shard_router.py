@@ -0,0 +1,124 @@
+"""
+The shard router in front of two real shard processes on temporary Unix sockets
+"""
+
+import glob
+
+import pytest
+from fastapi.testclient import TestClient
+
+import shard_router
+from lobby import MAX_LOBBY_PAGE
+from sharding import HashRing
+from table_store import TableStore
+
+@pytest.fixture(scope="module")
+def client(tmp_path_factory):
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(shard_router, "SHARDS", 2)
+        patch.setattr(shard_router, "SHARD_SOCKET_DIR", str(tmp_path_factory.mktemp("shards")))
+        with TestClient(shard_router.app) as client:
+            yield client
+    assert not any(process.is_alive() for process in shard_router.shard_processes)
+
+@pytest.fixture(scope="module")
+def table_ids(client):
+    """Four tables, created in turn on each shard, with 0 to 3 players"""
+    table_ids = []
+    for players in range(4):
+        response = client.post("/api/tables", params={"small_blind": 5 if players % 2 else 10})
+        assert response.status_code == 200
+        table_id = response.json()["table_id"]
+        for i in range(players):
+            assert client.post(f"/api/tables/{table_id}/join", params={"player_name": f"p{i}"}).status_code == 200
+        table_ids.append(table_id)
+    return table_ids
+
+def test_tables_are_created_on_both_shards(client, table_ids):
+    assert {shard_router.ring.owner(table_id) for table_id in table_ids} == {0, 1}
+    health = client.get("/health").json()
+    assert health["tables"] == 4
+    assert [shard["tables"] for shard in health["per_shard"]] == [2, 2]
+
+def test_table_requests_reach_the_owning_shard(client, table_ids):
+    for players, table_id in enumerate(table_ids):
+        state = client.get(f"/api/tables/{table_id}").json()
+        assert state["table_id"] == table_id
+        assert len(state["players"]) == players
+    assert client.get("/api/tables/no-such-table").status_code == 404
+
+def test_table_list_merges_the_shards(client, table_ids):
+    listed = client.get("/api/tables", params={"limit": 100}).json()
+    assert sorted(t["table_id"] for t in listed["tables"]) == sorted(table_ids)
+
+    pages, cursor = [], None
+    while True:
+        page = client.get("/api/tables", params={"limit": 1, **({"cursor": cursor} if cursor else {})}).json()
+        pages += page["tables"]
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+    assert pages == listed["tables"]
+
+def test_table_list_limit_is_bounded_like_a_shard(client):
+    assert client.get("/api/tables", params={"limit": MAX_LOBBY_PAGE + 1}).status_code == 422
+
+def test_find_seat_picks_the_fullest_open_table(client, table_ids):
+    seat = client.get("/api/lobby/find-seat").json()
+    assert seat["table_id"] == table_ids[3]
+    assert seat["players"] == 3
+    seat = client.get("/api/lobby/find-seat", params={"small_blind": 10}).json()
+    assert seat["table_id"] == table_ids[2]
+    assert client.get("/api/lobby/find-seat", params={"small_blind": 7}).status_code == 404
+
+def test_lobby_socket_aggregates_the_shards(client, table_ids):
+    with client.websocket_connect("/ws/lobby") as ws:
+        snapshot = ws.receive_json()
+        assert snapshot["type"] == "lobby_snapshot"
+        assert sorted(t["table_id"] for t in snapshot["tables"]) == sorted(table_ids)
+
+        client.post(f"/api/tables/{table_ids[0]}/join", params={"player_name": "late"})
+        update = ws.receive_json()
+        assert update["type"] == "lobby_update"
+        assert update["base_version"] == snapshot["version"]
+        assert (table_ids[0], 1) in [(t["table_id"], t["players"]) for t in update["updated"]]
+
+def test_table_socket_round_trip(client, table_ids):
+    table_id = table_ids[2]
+    player_id = client.get(f"/api/tables/{table_id}").json()["current_player_id"]
+    with client.websocket_connect(f"/ws/{table_id}/{player_id}") as ws:
+        types = [ws.receive_json()["type"] for _ in range(2)]
+        assert types == ["connected", "snapshot"]
+
+        ws.send_json({"type": "action", "request_id": "r1", "action": "call"})
+        replies = [ws.receive_json() for _ in range(2)]
+        assert {reply["type"] for reply in replies} == {"ack", "action_performed"}
+
+        ws.send_text("ping")
+        assert ws.receive_text() == "pong"
+
+def test_stored_tables_move_to_their_new_owner(tmp_path, monkeypatch, make_table):
+    path = str(tmp_path / "tables.db")
+    monkeypatch.setattr(shard_router, "TABLE_STORE_PATH", path)
+    old_ring, new_ring = HashRing(3), HashRing(2)
+    table_ids = [f"table-{i}" for i in range(20)]
+    for shard in range(3):
+        tables = []
+        for table_id in table_ids:
+            if old_ring.owner(table_id) == shard:
+                tables.append(make_table())
+                tables[-1].id = table_id
+        store = TableStore(shard_router.shard_store_path(shard))
+        store.write(store.collect(tables))
+        store.close()
+
+    shard_router.rebalance_table_stores(new_ring)
+    assert not glob.glob(shard_router.shard_store_path(2) + "*")
+    stored = []
+    for shard in range(2):
+        store = TableStore(shard_router.shard_store_path(shard))
+        ids = [table_id for table_id, _, _, _ in store.index()]
+        store.close()
+        assert all(new_ring.owner(table_id) == shard for table_id in ids)
+        stored += ids
+    assert sorted(stored) == sorted(table_ids)
@@ -0,0 +1,26 @@
+import uuid
+from collections import Counter
+
+from sharding import HashRing
+
+TABLE_IDS = [str(uuid.UUID(int=i * 7919 + 1)) for i in range(4000)]
+
+def test_single_shard_owns_everything():
+    ring = HashRing(1)
+    assert {ring.owner(table_id) for table_id in TABLE_IDS} == {0}
+
+def test_owner_is_stable_across_instances():
+    first, second = HashRing(4), HashRing(4)
+    assert [first.owner(t) for t in TABLE_IDS] == [second.owner(t) for t in TABLE_IDS]
+
+def test_tables_spread_over_shards():
+    ring = HashRing(4)
+    counts = Counter(ring.owner(table_id) for table_id in TABLE_IDS)
+    assert set(counts) == {0, 1, 2, 3}
+    assert min(counts.values()) > len(TABLE_IDS) / 4 * 0.7
+
+def test_adding_a_shard_only_moves_tables_to_it():
+    before, after = HashRing(4), HashRing(5)
+    moved = [t for t in TABLE_IDS if before.owner(t) != after.owner(t)]
+    assert all(after.owner(t) == 4 for t in moved)
+    assert len(moved) < len(TABLE_IDS) / 5 * 1.5
@@ -0,0 +1,66 @@
+import orjson
+import pytest
+
+from poker_game import ActionType
+from shuffler import Shuffler
+from table_store import TableStore, table_from_snapshot, table_to_snapshot
+
+def state(table):
+    """Everything a client could see, plus the hidden cards and the rest of the deck"""
+    return (
+        table.to_dict(),
+        [table.players[pid].cards for pid in table.player_order],
+        bytes(table.deck.cards), table.deck.position,
+        table.revision, table.actions_taken, sorted(table.leaving),
+        list(table.seats.state), table.seats.owes, table.seats.current
+    )
+
+@pytest.fixture
+def store(tmp_path):
+    store = TableStore(str(tmp_path / "tables.db"))
+    yield store
+    store.close()
+
+def test_snapshot_round_trip_mid_hand(table, play):
+    play(table, 7)
+    table.remove_player("p2")
+    restored = table_from_snapshot(orjson.loads(orjson.dumps(table_to_snapshot(table))))
+    assert state(restored) == state(table)
+
+def test_restored_table_plays_on_identically(make_table, play):
+    table = make_table()
+    play(table, 5)
+    restored = table_from_snapshot(orjson.loads(orjson.dumps(table_to_snapshot(table))))
+    hand = table.hand_number
+    for t in (table, restored):
+        t.shuffler = Shuffler(4, "next hand")
+        while t.hand_number == hand:
+            assert t.perform_action(t.get_current_player_id(), ActionType.CALL)
+    assert state(restored) == state(table)
+
+def test_store_writes_only_changed_tables(store, make_table, play):
+    first, second = make_table(), make_table()
+    second.id = "table-2"
+    store.write(store.collect([first, second]))
+    assert store.collect([first, second]) == []
+
+    play(first, 3)
+    rows = store.collect([first, second])
+    assert [row[0] for row in rows] == ["table-1"]
+    store.write(rows)
+    assert store.snapshots_written == 3
+
+def test_store_index_load_and_delete(store, table, play):
+    play(table, 4)
+    store.write(store.collect([table]))
+    [(table_id, revision, _, summary)] = store.index()
+    assert (table_id, revision) == (table.id, table.revision)
+    assert summary["players"] == 3
+
+    loaded = store.load(table.id)
+    assert state(loaded) == state(table)
+    assert store.collect([loaded]) == []
+
+    store.delete([table.id])
+    assert store.index() == []
+    assert store.load(table.id) is None
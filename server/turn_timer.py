@@ -0,0 +1,61 @@
+"""
+Turn Timer - one scheduler for every table's action deadline
+Deadlines go into a single heap served by one event loop timer, re-armed
+only when a new deadline is earlier than the armed one. Entries are never
+removed: a table whose turn moved on simply ignores its stale deadline, so
+scheduling costs one heap push per turn however many tables there are.
+"""
+
+from typing import Any, Callable, List, Optional, Tuple
+import asyncio
+import heapq
+import itertools
+import logging
+
+logger = logging.getLogger(__name__)
+
+class TurnTimers:
+    """Heap of (deadline, table_id, turn) entries on the event loop clock"""
+
+    __slots__ = ("heap", "sequence", "on_expired", "handle", "fired")
+
+    def __init__(self, on_expired: Callable[[str, Any], None]):
+        self.heap: List[Tuple[float, int, str, Any]] = []
+        self.sequence = itertools.count()  # Tie-breaker, so turns are never compared
+        self.on_expired = on_expired  # Gets (table_id, turn) for each deadline that passes
+        self.handle: Optional[asyncio.TimerHandle] = None
+        self.fired = 0
+
+    def __len__(self) -> int:
+        return len(self.heap)
+
+    def schedule(self, deadline: float, table_id: str, turn: Any):
+        """Call on_expired(table_id, turn) at `deadline` (loop.time()); needs a running event loop"""
+        heapq.heappush(self.heap, (deadline, next(self.sequence), table_id, turn))
+        if self.handle is None or deadline < self.handle.when():
+            self._arm()
+
+    def _arm(self):
+        if self.handle is not None:
+            self.handle.cancel()
+            self.handle = None
+        if self.heap:
+            self.handle = asyncio.get_running_loop().call_at(self.heap[0][0], self._fire)
+
+    def _fire(self):
+        self.handle = None
+        heap = self.heap
+        now = asyncio.get_running_loop().time()
+        while heap and heap[0][0] <= now:
+            _, _, table_id, turn = heapq.heappop(heap)
+            self.fired += 1
+            try:
+                self.on_expired(table_id, turn)
+            except Exception:
+                logger.exception(f"Turn timeout failed for table {table_id}")
+        self._arm()
+
+    def stop(self):
+        if self.handle is not None:
+            self.handle.cancel()
+            self.handle = None